@@ -0,0 +1,36 @@
+"""
+Benchmark: adapter access on the DRACOON main wrapper
+
+Compares reading a (cached) adapter property with building a new adapter per access
+(behaviour prior to adapter caching), e.g. dracoon.nodes in a hot loop.
+
+Usage: python benchmarks/adapters.py [calls]
+
+"""
+import sys
+import timeit
+from datetime import datetime
+
+from dracoon import DRACOON
+from dracoon.client import DRACOONConnection
+from dracoon.nodes import DRACOONNodes
+
+CALLS = 100000
+
+
+def main(calls: int = CALLS):
+    dracoon = DRACOON(base_url='https://dracoon.example.com')
+    # fake connection – no requests are sent
+    dracoon.client.connection = DRACOONConnection(datetime.now(), 'access_token', 28800, 'refresh_token')
+
+    cached = min(timeit.repeat(lambda: dracoon.nodes, number=calls, repeat=5))
+    uncached = min(timeit.repeat(lambda: DRACOONNodes(dracoon.client), number=calls, repeat=5))
+
+    print(f'{calls} adapter accesses')
+    print(f'new adapter per access: {uncached:.3f} s ({uncached / calls * 1e6:.2f} µs per call)')
+    print(f'cached adapter:         {cached:.3f} s ({cached / calls * 1e6:.2f} µs per call)')
+    print(f'saving per call:        {(uncached - cached) / calls * 1e6:.2f} µs')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CALLS)
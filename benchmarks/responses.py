@@ -0,0 +1,76 @@
+"""
+Benchmark: parsing of paged list responses (ResponseMode)
+
+Compares full validation (pydantic models), model_construct without validation
+and raw dicts on 500 item pages of nodes (NodeList) and users (UserList).
+Baseline: validation from decoded dicts (model(**res.json())) and from bytes (model_validate_json),
+JSON backends: json and orjson (if installed, used by loads_json).
+
+Usage: python benchmarks/responses.py [calls]
+
+"""
+import json
+import sys
+import timeit
+
+import httpx
+
+from dracoon.client import DRACOONClient, orjson
+from dracoon.client.models import ResponseMode
+from dracoon.nodes.responses import NodeList
+from dracoon.user.responses import UserList
+
+CALLS = 200
+PAGE_SIZE = 500
+
+
+def make_user_info(user_id: int) -> dict:
+    return { "id": user_id, "userType": "internal", "avatarUuid": "8f4b1c3e-2d0a-4c7e-9b1a-5e6f7a8b9c0d",
+             "userName": f"user{user_id}", "firstName": "Test", "lastName": f"User {user_id}", "email": f"user{user_id}@dracoon.example.com" }
+
+def make_node_page() -> bytes:
+    items = [{ "id": i, "type": "file", "name": f"file_{i}.pdf", "parentId": 1, "parentPath": "/room/folder/",
+               "createdAt": "2023-10-01T12:00:00.000Z", "updatedAt": "2023-10-02T08:30:00.000Z",
+               "timestampCreation": "2023-09-30T10:00:00.000Z", "timestampModification": "2023-09-30T10:00:00.000Z",
+               "createdBy": make_user_info(i), "updatedBy": make_user_info(i + 1), "size": 1024 * i, "classification": 2,
+               "hash": "d41d8cd98f00b204e9800998ecf8427e", "mediaType": "application/pdf", "isEncrypted": False,
+               "permissions": { "manage": True, "read": True, "create": True, "change": True, "delete": True,
+                                "manageDownloadShare": True, "manageUploadShare": True, "readRecycleBin": True,
+                                "restoreRecycleBin": True, "deleteRecycleBin": True },
+               "cntComments": 0, "cntDownloadShares": 0, "cntUploadShares": 0, "isFavorite": False, "branchVersion": 1 }
+             for i in range(PAGE_SIZE)]
+    return json.dumps({ "range": { "offset": 0, "limit": PAGE_SIZE, "total": 10000 }, "items": items }).encode()
+
+def make_user_page() -> bytes:
+    items = [{ "id": i, "userName": f"user{i}", "firstName": "Test", "lastName": f"User {i}", "isLocked": False,
+               "avatarUuid": "8f4b1c3e-2d0a-4c7e-9b1a-5e6f7a8b9c0d", "createdAt": "2023-10-01T12:00:00.000Z",
+               "lastLoginSuccessAt": "2023-10-05T07:45:00.000Z", "isEncryptionEnabled": True, "email": f"user{i}@dracoon.example.com",
+               "userRoles": { "items": [{ "id": 1, "name": "CONFIG_MANAGER", "description": "Manages global configuration" }] } }
+             for i in range(PAGE_SIZE)]
+    return json.dumps({ "range": { "offset": 0, "limit": PAGE_SIZE, "total": 10000 }, "items": items }).encode()
+
+
+def main(calls: int = CALLS):
+    client = DRACOONClient(base_url='https://dracoon.example.com')
+
+    for name, model, content in (('NodeList', NodeList, make_node_page()), ('UserList', UserList, make_user_page())):
+        print(f'{name}: {calls} pages with {PAGE_SIZE} items ({len(content) / 1024:.0f} KiB)')
+        # new response per parse (decoded JSON is cached on the response)
+        elapsed = min(timeit.repeat(lambda: model(**httpx.Response(200, content=content).json()), number=calls, repeat=3))
+        print(f'  {"res.json":<10} {elapsed / calls * 1e3:7.2f} ms per page (baseline)')
+        elapsed = min(timeit.repeat(lambda: model.model_validate_json(httpx.Response(200, content=content).content), number=calls, repeat=3))
+        print(f'  {"json bytes":<10} {elapsed / calls * 1e3:7.2f} ms per page (model_validate_json)')
+        for response_mode in ResponseMode:
+            elapsed = min(timeit.repeat(lambda: client.parse_response(res=httpx.Response(200, content=content), model=model, response_mode=response_mode),
+                                        number=calls, repeat=3))
+            print(f'  {response_mode.value:<10} {elapsed / calls * 1e3:7.2f} ms per page')
+        
+        elapsed = min(timeit.repeat(lambda: json.loads(content), number=calls, repeat=3))
+        print(f'  {"json":<10} {elapsed / calls * 1e3:7.2f} ms per page (decoding only)')
+        if orjson is not None:
+            elapsed = min(timeit.repeat(lambda: orjson.loads(content), number=calls, repeat=3))
+            print(f'  {"orjson":<10} {elapsed / calls * 1e3:7.2f} ms per page (decoding only)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CALLS)
@@ -19,31 +19,33 @@ All requests with bodies use generic params variable to pass JSON body
 import logging
 import asyncio
 from pathlib import Path
-from typing import Any, Generator, List
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Generator, Iterable, List, Union
 from datetime import datetime
 from dracoon.branding import DRACOONBranding
-from dracoon.client.models import ProxyConfig
+from dracoon.client.models import ProxyConfig, ResponseMode, TransportConfig
 from dracoon.config import DRACOONConfig
 from dracoon.config.responses import GeneralSettingsInfo, InfrastructureProperties, SystemDefaults
-from dracoon.nodes.models import Callback
-from dracoon.nodes.responses import S3FileUploadStatus
+from dracoon.nodes.models import Callback, NodeCache
+from dracoon.nodes.responses import CreateFileUploadResponse, S3FileUploadStatus
 from dracoon.public.responses import AuthADInfo, AuthOIDCInfo, SystemInfo
 from dracoon.roles import DRACOONRoles
 from dracoon.user.models import UserAccount
 
 from .crypto.models import PlainUserKeyPairContainer
-from .downloads import DRACOONDownloads
+from .downloads import MAX_PARALLEL_SEGMENTS, DRACOONDownloads
 from .public import DRACOONPublic
-from .client import DRACOONClient, DRACOONConnection, OAuth2ConnectionType
+from .client import MAX_CONCURRENT_REQUESTS, DRACOONClient, DRACOONConnection, OAuth2ConnectionType, bulk_process
+from .client.metrics import MetricsSink
+from .client.models import BulkResult
 from .eventlog import DRACOONEvents
-from .nodes import CHUNK_SIZE, MIN_CHUNK_SIZE, DRACOONNodes
+from .nodes import CHUNK_SIZE, MAX_PARALLEL_PARTS, MIN_CHUNK_SIZE, NODE_CACHE_SIZE, NODE_CACHE_TTL, DRACOONNodes, get_node_path
 from .shares import DRACOONShares
 from .user import DRACOONUser
 from .users import DRACOONUsers
 from .groups import DRACOONGroups
 from .settings import DRACOONSettings
 from .reports import DRACOONReports
-from .crypto import decrypt_private_key
+from .crypto import clear_key_cache, decrypt_private_key
 from .logger import create_logger
 from .errors import (CryptoMissingFileKeyError, CryptoMissingKeypairError, DRACOONCryptoError,
                      HTTPNotFoundError, InvalidArgumentError, InvalidFileError, InvalidPathError, ClientDisconnectedError)
@@ -55,70 +57,96 @@ class DRACOON:
 
     def __init__(self, base_url: str, client_id: str = 'dracoon_legacy_scripting', client_secret: str = '', redirect_uri: str = None,
                  log_file: str = 'dracoon.log', log_level = logging.INFO, log_stream: bool = False, raise_on_err: bool = False, 
-                 proxy_config: ProxyConfig = None, log_file_out: bool = False):
+                 proxy_config: ProxyConfig = None, log_file_out: bool = False, rate_limit: float = None, 
+                 transport_config: TransportConfig = None, metrics: MetricsSink = None, response_mode: ResponseMode = ResponseMode.validate):
         """ intialize with instance information: base DRACOON url and OAuth app client credentials """
         self.client = DRACOONClient(base_url=base_url, client_id=client_id, client_secret=client_secret, raise_on_err=raise_on_err, 
-                                    proxy_config=proxy_config, redirect_uri=redirect_uri)
+                                    proxy_config=proxy_config, redirect_uri=redirect_uri, rate_limit=rate_limit, 
+                                    transport_config=transport_config, metrics=metrics, response_mode=response_mode)
         self.logger = create_logger(log_file=log_file, log_level=log_level, log_stream=log_stream, log_file_out=log_file_out)
         self.logger.info("Created DRACOON client.")
         self.plain_keypair = None
         self.user_info =  None
+        # adapters are shared per connection (see get_adapter())
+        self.adapters = {}
+        self.adapters_connection = None
+        # path to node cache of the nodes adapter – kept when adapters are rebuilt (token refresh)
+        self.node_cache = NodeCache(max_size=NODE_CACHE_SIZE, ttl=NODE_CACHE_TTL)
+        
+    def get_adapter(self, adapter_type: type) -> Any:
+        """ get a (cached) adapter – adapters are rebuilt once the client (re)connects """
+        if self.client.connection is not self.adapters_connection:
+            self.adapters = {}
+            self.adapters_connection = self.client.connection
+        
+        adapter = self.adapters.get(adapter_type)
+        
+        if adapter is None and adapter_type is DRACOONNodes:
+            adapter = DRACOONNodes(self.client, node_cache=self.node_cache)
+            self.adapters[adapter_type] = adapter
+        elif adapter is None:
+            adapter = adapter_type(self.client)
+            self.adapters[adapter_type] = adapter
+        
+        return adapter
         
     @property
     def config(self) -> DRACOONConfig:
-        return DRACOONConfig(self.client)
+        return self.get_adapter(DRACOONConfig)
   
     @property 
     def nodes(self) -> DRACOONNodes:
-        return DRACOONNodes(self.client)
+        return self.get_adapter(DRACOONNodes)
     
     @property  
     def public(self) -> DRACOONPublic:
-        return DRACOONPublic(self.client)
+        return self.get_adapter(DRACOONPublic)
     
     @property 
     def user(self) -> DRACOONUser:
-        return DRACOONUser(self.client)
+        return self.get_adapter(DRACOONUser)
     
     @property 
     def reports(self) -> DRACOONReports:
-        return DRACOONReports(self.client)
+        return self.get_adapter(DRACOONReports)
     
     @property
     def roles(self) -> DRACOONRoles:
-        return DRACOONRoles(self.client)
+        return self.get_adapter(DRACOONRoles)
     
     @property 
     def settings(self) -> DRACOONSettings:
-        return DRACOONSettings(self.client)
+        return self.get_adapter(DRACOONSettings)
     
     @property
     def users(self) -> DRACOONUsers:
-       return DRACOONUsers(self.client) 
+        return self.get_adapter(DRACOONUsers)
    
     @property 
     def groups(self) -> DRACOONGroups:
-        return DRACOONGroups(self.client)
+        return self.get_adapter(DRACOONGroups)
     
     @property 
     def eventlog(self) -> DRACOONEvents:
-        return DRACOONEvents(self.client)
+        return self.get_adapter(DRACOONEvents)
     
     @property
     def shares(self) -> DRACOONShares:
-       return DRACOONShares(self.client) 
+        return self.get_adapter(DRACOONShares)
    
     @property
     def downloads(self) -> DRACOONDownloads:
-       return DRACOONDownloads(self.client)
+        return self.get_adapter(DRACOONDownloads)
 
     @property
     def branding(self) -> DRACOONBranding:
-       return DRACOONBranding(self.client) 
+        return self.get_adapter(DRACOONBranding)
    
     async def connect(self, connection_type: OAuth2ConnectionType = OAuth2ConnectionType.auth_code, username: str = None, 
                       password: str = None, auth_code: str = None, refresh_token: str = None, redirect_uri: str = None, full_info: bool = True) -> DRACOONConnection:
         """ establishes a connection required for all adapters """
+        # cached nodes may belong to another user
+        self.node_cache.clear()
         self.connection = await self.client.connect(connection_type=connection_type, username=username, password=password, 
                                                auth_code=auth_code, refresh_token=refresh_token, redirect_uri=redirect_uri)
 
@@ -152,8 +180,13 @@ class DRACOON:
         return self.connection
         
     async def logout(self, revoke_refresh_token: bool = False) -> None:
-        """ closes the httpx client and revokes tokens """
-        await self.client.logout(revoke_refresh_token=revoke_refresh_token)
+        """ closes the httpx client and revokes tokens – the plain keypair, cached (deserialized) keys and nodes are dropped """
+        try:
+            await self.client.logout(revoke_refresh_token=revoke_refresh_token)
+        finally:
+            self.plain_keypair = None
+            clear_key_cache()
+            self.node_cache.clear()
         self.logger.info("Revoked token(s).")
 
     async def test_connection(self) -> bool:
@@ -186,6 +219,10 @@ class DRACOON:
         except TypeError:
             raise DRACOONCryptoError(message="Encryption password must not be empty")
 
+        # drop deserialized keys of a replaced keypair
+        if self.plain_keypair and self.plain_keypair != plain_keypair:
+            clear_key_cache()
+
         self.plain_keypair = plain_keypair
 
         self.logger.info("Retrieved user keypair.")
@@ -197,9 +234,12 @@ class DRACOON:
                      modification_date: str = None, creation_date: str = None, 
                      raise_on_err: bool = False, callback_fn: Callback  = None,
                      target_parent_id: int = None,
-                     chunksize: int = CHUNK_SIZE
+                     chunksize: int = CHUNK_SIZE, max_parallel_parts: int = MAX_PARALLEL_PARTS, 
+                     pipelined: bool = False, journal_path: str = None
                      ) -> S3FileUploadStatus:  
-        """ upload a file to a target """
+        """ upload a file to a target (max_parallel_parts: concurrent part uploads for S3 direct upload) """
+        """ pipelined: encrypt on a dedicated thread while uploading (S3 direct upload, encrypted) """
+        """ journal_path: resumable upload – progress is saved to the journal and resumed on restart (S3 direct upload, unencrypted) """
         if not self.client.connection:
             self.logger.error("DRACOON client not connected: Upload failed.")
             err = ClientDisconnectedError(message="DRACOON client not connected.")
@@ -257,10 +297,22 @@ class DRACOON:
             if chunksize < MIN_CHUNK_SIZE: chunksize = MIN_CHUNK_SIZE
 
         self.logger.debug("Using S3 storage: %s", use_s3_storage)
+        
+        # resume upload channel from journal
+        journal = None
+        use_journal = journal_path is not None and not is_encrypted and use_s3_storage
+        
+        if use_journal:
+            journal = await self.nodes.check_upload_journal(journal_path=journal_path, file_path=file_path, parent_id=target_id, 
+                                                            file_name=file_name, chunksize=chunksize)
             
-        upload_channel_payload = self.nodes.make_upload_channel(parent_id=target_id, name=file_name, direct_s3_upload=use_s3_storage, 
-                                                                modification_date=modification_date, creation_date=creation_date)
-        upload_channel = await self.nodes.create_upload_channel(upload_channel=upload_channel_payload, raise_on_err=raise_on_err)
+        if journal is not None:
+            upload_channel = CreateFileUploadResponse(uploadUrl=journal.uploadUrl, uploadId=journal.uploadId, token=journal.token)
+            self.logger.info("Resuming upload.")
+        else:
+            upload_channel_payload = self.nodes.make_upload_channel(parent_id=target_id, name=file_name, direct_s3_upload=use_s3_storage, 
+                                                                    modification_date=modification_date, creation_date=creation_date)
+            upload_channel = await self.nodes.create_upload_channel(upload_channel=upload_channel_payload, raise_on_err=raise_on_err)
     
 
         self.logger.debug("Created upload channel: %s", upload_channel.uploadId)
@@ -273,7 +325,8 @@ class DRACOON:
         elif is_encrypted and self.check_keypair() and use_s3_storage:
             upload = await self.nodes.upload_s3_encrypted(file_path=file_path, upload_channel=upload_channel, plain_keypair=self.plain_keypair, 
                                                           resolution_strategy=resolution_strategy, file_name=file_name,
-                                                          raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize)
+                                                          raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize, 
+                                                          pipelined=pipelined, max_parallel_parts=max_parallel_parts)
         elif is_encrypted and not self.check_keypair():
             self.logger.critical("Upload failed: Keypair not unlocked.")
             raise CryptoMissingKeypairError('DRACOON crypto upload requires unlocked keypair. Please unlock keypair first.')
@@ -282,18 +335,27 @@ class DRACOON:
             upload = await self.nodes.upload_unencrypted(file_path=file_path, upload_channel=upload_channel, file_name=file_name,
                                                          resolution_strategy=resolution_strategy,  
                                                          raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize)
+        elif use_journal:
+            upload = await self.nodes.upload_s3_resumable(file_path=file_path, upload_channel=upload_channel, journal_path=journal_path, 
+                                                          file_name=file_name, resolution_strategy=resolution_strategy, 
+                                                          raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize, 
+                                                          max_parallel_parts=max_parallel_parts, parent_id=target_id)
         elif not is_encrypted and use_s3_storage:
             upload = await self.nodes.upload_s3_unencrypted(file_path=file_path, upload_channel=upload_channel, file_name=file_name,
                                                           resolution_strategy=resolution_strategy,
-                                                            raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize)
+                                                            raise_on_err=raise_on_err, callback_fn=callback_fn, chunksize=chunksize, 
+                                                            max_parallel_parts=max_parallel_parts)
 
+        # uploaded file (e.g. overwritten) is resolved again
+        self.nodes.node_cache.invalidate(path=get_node_path(node_info) + '/' + file_name)
         self.logger.info("Upload completed.")
         
         return upload
 
     async def download(self, target_path: str, file_path: str = None, raise_on_err: bool = False, 
-                       callback_fn: Callback  = None, file_name: str = None, source_node_id: int = None, chunksize: int = CHUNK_SIZE):
-        """ download a file to a target """
+                       callback_fn: Callback  = None, file_name: str = None, source_node_id: int = None, chunksize: int = CHUNK_SIZE, 
+                       max_parallel_segments: int = MAX_PARALLEL_SEGMENTS):
+        """ download a file to a target (max_parallel_segments: concurrent range requests, unencrypted only) """
 
         if not self.client.connection:
             await self.client.disconnect()
@@ -335,7 +397,8 @@ class DRACOON:
         if not is_encrypted:
             await self.downloads.download_unencrypted(download_url=download_url, target_path=target_path, node_info=node_info, 
                                                       raise_on_err=raise_on_err, 
-                                                      callback_fn=callback_fn, file_name=file_name, chunksize=chunksize)
+                                                      callback_fn=callback_fn, file_name=file_name, chunksize=chunksize, 
+                                                      max_parallel_segments=max_parallel_segments)
         elif is_encrypted and self.check_keypair():
             try:
                 file_key = await self.nodes.get_user_file_key(node_id, raise_on_err=True)
@@ -359,5 +422,25 @@ class DRACOON:
         helper method which returns a generator for a list 
         of couroutines 
         utility to process multiple requests async
+        for steady throughput use bulk_process (each batch waits for its slowest request) 
         """ 
         return (coro_list[i:i + batch_size]  for i in range(0, len(coro_list), batch_size))
+
+    async def bulk_process(self, items: Union[Iterable[Any], AsyncIterable[Any]], fn: Callable[[Any], Awaitable[Any]] = None, 
+                           max_concurrency: int = MAX_CONCURRENT_REQUESTS, callback_fn: Callable[..., Any] = None) -> AsyncIterator[BulkResult]:
+        """ 
+        process (async) iterable of coroutines or work items (passed to fn) with max. max_concurrency requests at a time 
+        yields a BulkResult per item as soon as it is finished – errors are collected per item 
+        """
+        processed = 0
+        failed = 0
+        
+        async for result in bulk_process(items=items, fn=fn, max_concurrency=max_concurrency, callback_fn=callback_fn):
+            processed += 1
+            if not result.ok:
+                failed += 1
+                self.logger.error("Bulk process: item %s failed.", result.index)
+                self.logger.debug(result.error)
+            yield result
+        
+        self.logger.info("Bulk process finished: %s items (%s failed).", processed, failed)
@@ -9,16 +9,32 @@ The client implements all login and logout procedures and is part of every API a
 """
 
 import base64 
+import codecs
+import importlib.util
 import asyncio
+import json
 import logging
+import re
+import time
+import types
 
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
 
 import httpx
+from pydantic import BaseModel
 from tenacity import retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from dracoon.client.models import DRACOONConnection, OAuth2ConnectionType, ProxyConfig, RetryConfig
-from dracoon.errors import (HTTPTooManyRequestsError, MissingCredentialsError, HTTPBadRequestError, HTTPUnauthorizedError, 
+# optional fast JSON backend (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from dracoon.client.metrics import THROTTLED, TOKEN_REFRESHES, MetricsSink, get_endpoint, make_event_hooks, record_retry
+from dracoon.client.models import BulkResult, DRACOONConnection, OAuth2ConnectionType, ProxyConfig, ResponseMode, RetryConfig, TransportConfig
+from dracoon.errors import (HTTPTooManyRequestsError, InvalidClientError, MissingCredentialsError, HTTPBadRequestError, HTTPUnauthorizedError, 
                             HTTPPaymentRequiredError, HTTPForbiddenError, HTTPNotFoundError, HTTPConflictError, HTTPPreconditionsFailedError,
                             HTTPUnknownError, HTTPServerError, ConnectionError)
 
@@ -28,9 +44,468 @@ DEFAULT_TIMEOUT_CONFIG = httpx.Timeout(10, connect=30, read=30)
 RETRY_CONFIG_BASE = RetryConfig(retry=retry_if_exception_type((HTTPTooManyRequestsError, HTTPServerError, ConnectionError)),
                            stop=stop_after_attempt(5),
                            wait=wait_exponential(multiplier=1.2, min=5, max=15),
-                           reraise=True
+                           reraise=True,
+                           before_sleep=record_retry
                            )
 RETRY_CONFIG = RETRY_CONFIG_BASE.model_dump()
+# concurrent page requests in iter_pages (1: sequential)
+MAX_PARALLEL_PAGES = 1
+# concurrent requests in bulk_process
+MAX_CONCURRENT_REQUESTS = 5
+# access token is refreshed ahead of expiry (share of access token validity)
+TOKEN_REFRESH_RATIO = 0.9
+# rate limiter (AIMD): rate is halved on 429 (once per decrease window) and increased by a share of the max. rate per interval 
+RATE_DECREASE_FACTOR = 0.5
+RATE_INCREASE_RATIO = 0.05
+RATE_INCREASE_INTERVAL = 1.0
+MIN_RATE_RATIO = 0.05
+# transparent retries of throttled requests with replayable body
+RATE_LIMIT_RETRIES = 3
+# fields per model class (ResponseMode.construct): keys, defaults, nested models
+MODEL_FIELDS: Dict[Type[BaseModel], Tuple[frozenset, Dict[str, Any], List[Tuple[str, Type[BaseModel], bool]]]] = {}
+# BaseModel slots (set without BaseModel.__setattr__)
+set_model_fields_set = BaseModel.__dict__['__pydantic_fields_set__'].__set__
+set_model_extra = BaseModel.__dict__['__pydantic_extra__'].__set__
+set_model_private = BaseModel.__dict__['__pydantic_private__'].__set__
+# scanning a streamed JSON array: whitespace, end of a scalar item, end of a string (or escape), structure of nested items
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_SCALAR_END = re.compile(r'[ \t\n\r,\]]')
+JSON_STRING_END = re.compile(r'["\\]')
+JSON_STRUCTURE = re.compile(r'[\[\]{}"]')
+
+
+def loads_json(content: bytes) -> Any:
+    """ decode JSON (bytes) – uses orjson if installed """
+    """ note: validating decoded dicts is faster than model_validate_json (pydantic 2.4) """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """ 
+    decode a JSON array incrementally from byte chunks (e.g. res.aiter_bytes()) and yield one item at a time 
+    only the current (incomplete) item is buffered – items split by chunks are scanned once (nesting, strings) and decoded when complete 
+    raises ValueError on invalid or incomplete arrays (items separated by exactly one comma, only whitespace after the array) 
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    # expected: array start, first item (or end), item, item separator (or end), item in progress, nothing (end of array)
+    expected = 'start'
+    item_start = depth = 0
+    in_string = False
+    
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        
+        while True:
+            if expected == 'scan':
+                if in_string:
+                    match = JSON_STRING_END.search(buffer, pos)
+                    if not match:
+                        pos = len(buffer)
+                        break
+                    if match.group() == '\\':
+                        # escaped character is skipped
+                        if match.end() >= len(buffer):
+                            pos = match.start()
+                            break
+                        pos = match.end() + 1
+                        continue
+                    in_string = False
+                    pos = match.end()
+                elif depth:
+                    match = JSON_STRUCTURE.search(buffer, pos)
+                    if not match:
+                        pos = len(buffer)
+                        break
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in '[{':
+                        depth += 1
+                    else:
+                        depth -= 1
+                    pos = match.end()
+                else:
+                    # scalars end before the next separator – otherwise the item might be incomplete (e.g. numbers)
+                    match = JSON_SCALAR_END.search(buffer, pos)
+                    if not match:
+                        pos = len(buffer)
+                        break
+                    pos = match.start()
+                
+                if depth or in_string:
+                    continue
+                
+                yield json.loads(buffer[item_start:pos])
+                expected = 'next'
+                continue
+            
+            pos = JSON_WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            
+            if expected == 'end':
+                raise ValueError('Unexpected data after JSON array.')
+            if expected == 'start':
+                if char != '[':
+                    raise ValueError('Expected JSON array.')
+                expected = 'first'
+                pos += 1
+            elif expected == 'next':
+                if char not in ',]':
+                    raise ValueError('Expected , or ] in JSON array.')
+                expected = 'item' if char == ',' else 'end'
+                pos += 1
+            elif char == ']' and expected == 'first':
+                expected = 'end'
+                pos += 1
+            elif char in ',]':
+                raise ValueError('Expected item in JSON array.')
+            else:
+                # complete items are decoded directly (one attempt per item, no re-parsing per chunk)
+                # (scalars must be followed by a separator – otherwise the item might be incomplete, e.g. 1.5 split after 1)
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    end = len(buffer)
+                if end < len(buffer) and (char in '"[{' or JSON_SCALAR_END.match(buffer, end)):
+                    yield item
+                    expected = 'next'
+                    pos = end
+                    continue
+                
+                # item split by chunks: strings and nested items are scanned from the first character
+                expected = 'scan'
+                item_start = pos
+                in_string = char == '"'
+                depth = 1 if char in '[{' else 0
+                if in_string or depth:
+                    pos += 1
+        
+        # keep the item in progress only
+        keep = item_start if expected == 'scan' else pos
+        buffer = buffer[keep:]
+        pos -= keep
+        item_start = 0
+    
+    if expected != 'end':
+        raise ValueError('Incomplete JSON array.')
+
+def get_nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """ model contained in a field annotation (e.g. Optional[UserInfo], List[Node]) and if it is a list """
+    origin = get_origin(annotation)
+    if origin in (Union, getattr(types, 'UnionType', Union)):
+        for arg in get_args(annotation):
+            model, is_list = get_nested_model(arg)
+            if model:
+                return model, is_list
+    elif origin is list:
+        model, _ = get_nested_model(get_args(annotation)[0])
+        return model, model is not None
+    elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+def get_model_fields(model: Type[BaseModel]) -> Tuple[frozenset, Dict[str, Any], List[Tuple[str, Type[BaseModel], bool]]]:
+    """ field names, defaults and nested models of a model (cached) """
+    if model not in MODEL_FIELDS:
+        defaults = {}
+        nested = []
+        for name, field in model.model_fields.items():
+            if not field.is_required():
+                defaults[name] = field.get_default(call_default_factory=True)
+            nested_model, is_list = get_nested_model(field.annotation)
+            if nested_model:
+                nested.append((name, nested_model, is_list))
+        MODEL_FIELDS[model] = (frozenset(model.model_fields), defaults, nested)
+    return MODEL_FIELDS[model]
+
+def construct_model(model: Type[BaseModel], data: Any) -> Any:
+    """ 
+    build model and nested models from (JSON) data without validation (as model_construct) 
+    values are not parsed (e.g. datetimes and enums remain str), unknown keys are ignored 
+    """
+    if not isinstance(data, dict):
+        return data
+    
+    names, defaults, nested = get_model_fields(model)
+    values = {**defaults, **data}
+    fields_set = data.keys() & names
+    if len(fields_set) < len(data):
+        values = { name: value for name, value in values.items() if name in names }
+    
+    for name, nested_model, is_list in nested:
+        value = values.get(name)
+        if value is not None:
+            values[name] = [construct_model(nested_model, item) for item in value] if is_list else construct_model(nested_model, value)
+    
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', values)
+    set_model_fields_set(instance, fields_set)
+    set_model_extra(instance, None)
+    set_model_private(instance, None)
+    return instance
+
+def get_page_items(page: Any) -> List[Any]:
+    """ items of a page (model or dict – see ResponseMode) """
+    return page['items'] if isinstance(page, dict) else page.items
+
+def get_page_total(page: Any) -> int:
+    """ total of a page range (model or dict – see ResponseMode) """
+    return page['range']['total'] if isinstance(page, dict) else page.range.total
+
+
+async def iter_pages(get_page: Callable[..., Awaitable[Any]], offset: int = 0, max_parallel_pages: int = MAX_PARALLEL_PAGES, 
+                     ordered: bool = True, **kwargs) -> AsyncIterator[Any]:
+    """ 
+    iterate all items of a paged list (e.g. DRACOONUsers.get_users) – pages are requested lazily 
+    get_page is called with offset and kwargs, the range (total) of each page marks the end 
+    max_parallel_pages > 1: after the first page, remaining pages are prefetched concurrently (range.total) 
+    ordered: items are yielded in offset order (otherwise per page as they arrive) 
+    """
+    page = await get_page(offset=offset, **kwargs)
+    
+    for item in get_page_items(page):
+        yield item
+    
+    page_size = len(get_page_items(page))
+    offset += page_size
+    
+    if not page_size or offset >= get_page_total(page):
+        return
+    
+    if max_parallel_pages <= 1:
+        while True:
+            page = await get_page(offset=offset, **kwargs)
+            
+            for item in get_page_items(page):
+                yield item
+            
+            offset += len(get_page_items(page))
+            if not get_page_items(page) or offset >= get_page_total(page):
+                break
+        return
+    
+    offsets = iter(range(offset, get_page_total(page), page_size))
+    next_offset = offset
+    # requested and received (not yet yielded) pages are bound by max_parallel_pages
+    tasks = {}
+    pages = {}
+    
+    try:
+        while True:
+            while len(tasks) + len(pages) < max_parallel_pages:
+                page_offset = next(offsets, None)
+                if page_offset is None:
+                    break
+                tasks[asyncio.ensure_future(get_page(offset=page_offset, **kwargs))] = page_offset
+            
+            if not tasks:
+                break
+            
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            # retrieve all errors of the done pages to raise the first one
+            errors = [task.exception() for task in done if task.exception() is not None]
+            for task in done:
+                page_offset = tasks.pop(task)
+                if task.exception() is None:
+                    pages[page_offset] = task.result()
+            if errors:
+                raise errors[0]
+            
+            if ordered:
+                while next_offset in pages:
+                    for item in get_page_items(pages.pop(next_offset)):
+                        yield item
+                    next_offset += page_size
+            else:
+                for page_offset in list(pages):
+                    for item in get_page_items(pages.pop(page_offset)):
+                        yield item
+    finally:
+        # cancel remaining pages and wait for them to finish
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def bulk_process(items: Union[Iterable[Any], AsyncIterable[Any]], fn: Callable[[Any], Awaitable[Any]] = None, 
+                       max_concurrency: int = MAX_CONCURRENT_REQUESTS, callback_fn: Callable[..., Any] = None) -> AsyncIterator[BulkResult]:
+    """ 
+    process work items with bounded concurrency – results are yielded as each request finishes (not in source order) 
+    items: (async) iterable of awaitables (e.g. coroutines) or of work items passed to fn – items are consumed lazily 
+    errors are collected per item (BulkResult.error) and do not abort processing 
+    callback_fn: progress callback called with 1 and total (None if items has no length) per finished item 
+    """
+    total = len(items) if hasattr(items, '__len__') else None
+    source = items.__aiter__() if hasattr(items, '__aiter__') else iter(items)
+    # running requests (task: source index and item)
+    tasks = {}
+    count = 0
+    exhausted = False
+    
+    async def run(item: Any) -> Any:
+        return await (fn(item) if fn else item)
+    
+    try:
+        while True:
+            while not exhausted and len(tasks) < max_concurrency:
+                try:
+                    item = await source.__anext__() if hasattr(source, '__anext__') else next(source)
+                except (StopIteration, StopAsyncIteration):
+                    exhausted = True
+                    break
+                tasks[asyncio.ensure_future(run(item))] = (count, item)
+                count += 1
+            
+            if not tasks:
+                break
+            
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, item = tasks.pop(task)
+                if task.exception() is not None:
+                    result = BulkResult(index=index, item=item, error=task.exception())
+                else:
+                    result = BulkResult(index=index, item=item, result=task.result())
+                if callback_fn: callback_fn(1, total)
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def parse_retry_after(retry_after: str) -> float:
+    """ parse Retry-After header (seconds or HTTP date) – returns seconds to wait (None if invalid) """
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(tz=retry_at.tzinfo)).total_seconds())
+
+
+class RateLimiter:
+    """ 
+    token bucket rate limiter (requests per second) shared by all httpx clients 
+    the rate is adapted (AIMD): decreased on 429 (and paused for Retry-After), slowly increased again on success 
+    429 responses within a decrease window (Retry-After or time to refill the bucket) decrease the rate only once 
+    """
+    
+    def __init__(self, rate: float, burst: int = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate * MIN_RATE_RATIO
+        self.capacity = burst if burst else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.decreased_until = 0.0
+        self.increased_at = self.updated_at
+        # created on first use – requires running event loop
+        self.lock: asyncio.Lock = None
+        self.logger = logging.getLogger('dracoon.client')
+    
+    def refill(self, now: float) -> None:
+        """ add tokens for elapsed time """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self) -> None:
+        """ wait for a token (and until Retry-After passed) """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                
+                self.refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def on_success(self) -> None:
+        """ additive increase – by RATE_INCREASE_RATIO of the max. rate per RATE_INCREASE_INTERVAL (not per response) """
+        now = time.monotonic()
+        if now < self.decreased_until or self.rate >= self.max_rate:
+            self.increased_at = now
+            return
+        
+        # idle time counts as one interval at most
+        elapsed = min(now - self.increased_at, RATE_INCREASE_INTERVAL)
+        self.refill(now)
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_INCREASE_RATIO * elapsed / RATE_INCREASE_INTERVAL)
+        self.increased_at = now
+    
+    def on_throttled(self, retry_after: float = None) -> None:
+        """ multiplicative decrease (once per decrease window) – pause all requests for Retry-After """
+        now = time.monotonic()
+        self.refill(now)
+        self.tokens = 0
+        
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        
+        # responses to requests sent before the decrease
+        if now < self.decreased_until:
+            return
+        
+        self.rate = max(self.min_rate, self.rate * RATE_DECREASE_FACTOR)
+        self.decreased_until = max(self.blocked_until, now + self.capacity / self.rate)
+        
+        self.logger.warning("Rate limited (429) – rate: %.2f requests/s, retry after: %s s", self.rate, retry_after)
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """ httpx transport applying a (shared) rate limiter to all requests """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, rate_limiter: RateLimiter, metrics: MetricsSink = None, client: str = None):
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+        # retried 429 responses are not seen by event hooks (see metrics)
+        self.metrics = metrics
+        self.client = client
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # streamed request bodies (e.g. uploads from a generator) cannot be sent twice
+        retries = RATE_LIMIT_RETRIES if isinstance(request.stream, httpx.ByteStream) else 0
+        
+        while True:
+            await self.rate_limiter.acquire()
+            response = await self.transport.handle_async_request(request)
+            
+            if response.status_code != 429:
+                self.rate_limiter.on_success()
+                return response
+            
+            self.rate_limiter.on_throttled(retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            
+            if retries <= 0:
+                return response
+            
+            retries -= 1
+            await response.aclose()
+            
+            if self.metrics:
+                self.metrics.increment(THROTTLED, client=self.client, method=request.method, endpoint=get_endpoint(request.url, self.client))
+    
+    async def aclose(self) -> None:
+        await self.transport.aclose()
 
 
 class DRACOONClient:
@@ -45,32 +520,103 @@ class DRACOONClient:
     }
 
     def __init__(self, base_url: str, client_id: str = 'dracoon_legacy_scripting', client_secret: str = '', redirect_uri: str = None,
-                 raise_on_err: bool = False, proxy_config: ProxyConfig = None):
+                 raise_on_err: bool = False, proxy_config: ProxyConfig = None, rate_limit: float = None, 
+                 transport_config: TransportConfig = None, metrics: MetricsSink = None, response_mode: ResponseMode = ResponseMode.validate):
         """ client is initialized with DRACOON instance details (url and OAuth client credentials) """
+        """ rate_limit: max. requests per second (shared by all clients, adapted on 429) """
+        """ transport_config: connection pools (API, uploads, downloads), keep-alive and HTTP/2 """
+        """ metrics: sink for request latency, retries, 429 responses, transferred bytes and token refreshes (e.g. PrometheusMetrics) """
+        """ response_mode: default parsing of paged list responses (see ResponseMode) – can be set per call """
+        
+        self.logger = logging.getLogger('dracoon.client')
         
-        # custom transport for retries on connection errors
-        DEFAULT_HTTPX_TRANSPORT = httpx.AsyncHTTPTransport(retries=5)
+        if transport_config is None:
+            transport_config = TransportConfig()
+        self.transport_config = transport_config
+        
+        self.metrics = metrics
+        self.response_mode = response_mode
+        self.rate_limiter: RateLimiter = None
+        if rate_limit:
+            self.rate_limiter = RateLimiter(rate=rate_limit)
         
         self.base_url = base_url
         self.client_id = client_id
         self.client_secret = client_secret
-        self.http = httpx.AsyncClient(headers=self.headers, timeout=DEFAULT_TIMEOUT_CONFIG, proxies=proxy_config, transport=DEFAULT_HTTPX_TRANSPORT)
-        self.uploader = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT_CONFIG, proxies=proxy_config, transport=DEFAULT_HTTPX_TRANSPORT)
-        self.downloader = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT_CONFIG, proxies=proxy_config, transport=DEFAULT_HTTPX_TRANSPORT)
+        # proxies are mounted as transports (connection pool and rate limiter apply to proxied requests)
+        self.proxy_config = proxy_config
+        self.http = httpx.AsyncClient(headers=self.headers, timeout=DEFAULT_TIMEOUT_CONFIG, 
+                                      transport=self.make_transport(max_connections=transport_config.max_connections, http2=transport_config.http2),
+                                      mounts=self.make_proxy_mounts(max_connections=transport_config.max_connections, http2=transport_config.http2),
+                                      event_hooks=make_event_hooks(metrics=metrics, client='api') if metrics else None)
+        self.uploader = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT_CONFIG, 
+                                          transport=self.make_transport(max_connections=transport_config.upload_max_connections, client='upload'),
+                                          mounts=self.make_proxy_mounts(max_connections=transport_config.upload_max_connections, client='upload'),
+                                          event_hooks=make_event_hooks(metrics=metrics, client='upload') if metrics else None)
+        self.downloader = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT_CONFIG, 
+                                            transport=self.make_transport(max_connections=transport_config.download_max_connections, client='download'),
+                                            mounts=self.make_proxy_mounts(max_connections=transport_config.download_max_connections, client='download'),
+                                            event_hooks=make_event_hooks(metrics=metrics, client='download') if metrics else None)
         self.connected = False
         if redirect_uri:
             self.redirect_uri = redirect_uri
         else:
             self.redirect_uri = f"{self.base_url}/oauth/callback"
         self.connection: DRACOONConnection = None
+        # single-flight token refresh (created on first refresh – requires running event loop)
+        self.refresh_lock: asyncio.Lock = None
         self.raise_on_err = raise_on_err
-        self.logger = logging.getLogger('dracoon.client')
         self.logger.info("DRACOON client created.")
         self.logger.debug(f"DRACOON client config: {self.base_url} // {self.client_id}")
 
+    def make_transport(self, max_connections: int, http2: bool = False, client: str = 'api', proxy: str = None) -> httpx.AsyncBaseTransport:
+        """ transport with own connection pool (see TransportConfig) and retries on connection errors – optionally via a proxy (url) """
+        limits = httpx.Limits(max_connections=max_connections, 
+                              max_keepalive_connections=self.transport_config.max_keepalive_connections, 
+                              keepalive_expiry=self.transport_config.keepalive_expiry)
+        if http2 and importlib.util.find_spec('h2') is None:
+            self.logger.critical("HTTP/2 requires h2 (pip install httpx[http2]).")
+            raise InvalidClientError(message='HTTP/2 requires h2 (pip install httpx[http2]).')
+        
+        transport = httpx.AsyncHTTPTransport(retries=5, limits=limits, http2=http2, proxy=httpx.Proxy(proxy) if proxy else None)
+        
+        # all clients share the rate limiter
+        if self.rate_limiter:
+            transport = RateLimitedTransport(transport=transport, rate_limiter=self.rate_limiter, metrics=self.metrics, client=client)
+        
+        return transport
+    
+    def make_proxy_mounts(self, max_connections: int, http2: bool = False, client: str = 'api') -> Optional[Dict[str, Optional[httpx.AsyncBaseTransport]]]:
+        """ proxy transports per URL pattern (ProxyConfig: single proxy url or dict as in httpx proxies) – None without proxy config """
+        if not self.proxy_config:
+            return None
+        
+        proxies = { 'all://': self.proxy_config } if isinstance(self.proxy_config, str) else self.proxy_config
+        # patterns without proxy (None) use the default transport
+        return { pattern: self.make_transport(max_connections=max_connections, http2=http2, client=client, proxy=proxy) if proxy else None 
+                for pattern, proxy in proxies.items() }
+
+    def parse_response(self, res: httpx.Response, model: Type[BaseModel], response_mode: ResponseMode = None) -> Any:
+        """ parse JSON response as model – response_mode defaults to the client response mode """
+        if response_mode is None:
+            response_mode = self.response_mode
+        
+        # response bytes are decoded once (no text decoding as in res.json())
+        data = loads_json(res.content)
+        
+        if response_mode == ResponseMode.raw:
+            return data
+        if response_mode == ResponseMode.construct:
+            return construct_model(model, data)
+        return model.model_validate(data)
+
     def __del__(self):
         """ on client destroy terminate async clients """
 
+        # client creation failed (e.g. invalid transport config)
+        if not hasattr(self, 'downloader'):
+            return
+
         # handle asyncio runtime
         try:
             loop = asyncio.get_event_loop()
@@ -161,37 +707,63 @@ class DRACOONClient:
             self.logger.debug("Access token valid: %s", self.connection.access_token_validity)
 
 
-        # TODO: refactor to own _method
         if connection_type == OAuth2ConnectionType.refresh_token:
             
             # only use connection refresh token if no token is provided
             if self.connection and refresh_token is None:
-                refresh_token = self.connection.refresh_token
+                current_connection = self.connection
+                
+                # single flight: concurrent refreshes wait for the first one and reuse its token
+                async with self.get_refresh_lock():
+                    if self.connection is not current_connection and await self.check_access_token():
+                        self.logger.debug("Access token already refreshed.")
+                        return self.connection
+                    
+                    await self.refresh_access_token(refresh_token=self.connection.refresh_token)
             # raise if no connection and no token provided
-            if refresh_token is None:
+            elif refresh_token is None:
                 await self.disconnect()
                 raise MissingCredentialsError(message='Missing refresh token.')
+            else:
+                await self.refresh_access_token(refresh_token=refresh_token)
 
-            data = {'grant_type': 'refresh_token', 'refresh_token': refresh_token, 'client_id': self.client_id, 'client_secret': self.client_secret}
+        self.connected = True
+        self.http.headers["Authorization"] = "Bearer " + self.connection.access_token
+  
+        return self.connection
 
-            try:
-                res = await self.http.post(url=token_url, data=data)
-                res.raise_for_status()
-            except httpx.RequestError as e:
-                await self.handle_connection_error(e)
+    def get_refresh_lock(self) -> asyncio.Lock:
+        """ lock to guard the access token refresh """
+        if self.refresh_lock is None:
+            self.refresh_lock = asyncio.Lock()
+        return self.refresh_lock
 
-            except httpx.HTTPStatusError as e:
-                self.logger.debug("Login error: %s", e.response.text)
-                self.logger.error("Refresh token authentication failed.")
-                await self.handle_http_error(e, True)
+    async def refresh_access_token(self, refresh_token: str) -> DRACOONConnection:
+        """ get a new access token with given refresh token (OAuth2 refresh token flow) """
+        token_url = self.base_url + '/oauth/token'
+        now = datetime.now()
+        
+        data = {'grant_type': 'refresh_token', 'refresh_token': refresh_token, 'client_id': self.client_id, 'client_secret': self.client_secret}
 
+        try:
+            res = await self.http.post(url=token_url, data=data)
+            res.raise_for_status()
+        except httpx.RequestError as e:
+            await self.handle_connection_error(e)
 
-            self.connection = DRACOONConnection(now, res.json()["access_token"], res.json()["expires_in"],
-                                         res.json()["refresh_token"])
+        except httpx.HTTPStatusError as e:
+            self.logger.debug("Login error: %s", e.response.text)
+            self.logger.error("Refresh token authentication failed.")
+            await self.handle_http_error(e, True)
 
+        self.connection = DRACOONConnection(now, res.json()["access_token"], res.json()["expires_in"],
+                                     res.json()["refresh_token"])
         self.connected = True
         self.http.headers["Authorization"] = "Bearer " + self.connection.access_token
-  
+        
+        if self.metrics:
+            self.metrics.increment(TOKEN_REFRESHES)
+        self.logger.info("Refreshed access token.")
         return self.connection
 
     async def disconnect(self):
@@ -232,10 +804,12 @@ class DRACOONClient:
 
     async def check_access_token(self, test: bool = False):
         """ check access token validity (based on connection time and token validity) """
+        """ the token is considered expired once TOKEN_REFRESH_RATIO of its validity passed (refresh ahead of expiry) """
 
         if not test and self.connection:
             now = datetime.now()
-            return (now - self.connection.connected_at).seconds < self.connection.access_token_validity
+            elapsed = (now - self.connection.connected_at).total_seconds()
+            return elapsed < self.connection.access_token_validity * TOKEN_REFRESH_RATIO
         elif test and self.connection:
             return await self.test_connection()
         else:
@@ -0,0 +1,194 @@
+"""
+Instrumentation of DRACOONClient (httpx event hooks, tenacity before_sleep)
+Metrics are recorded in a pluggable sink (see MetricsSink) – PrometheusMetrics
+keeps them in memory and exports them in Prometheus text format
+
+"""
+
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Protocol, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from tenacity import RetryCallState
+
+# metric names
+REQUEST_DURATION = 'dracoon_request_duration_seconds'
+RETRIES = 'dracoon_retries_total'
+THROTTLED = 'dracoon_throttled_total'
+BYTES_UPLOADED = 'dracoon_bytes_uploaded_total'
+BYTES_DOWNLOADED = 'dracoon_bytes_downloaded_total'
+TOKEN_REFRESHES = 'dracoon_token_refreshes_total'
+
+METRIC_HELP = {
+    REQUEST_DURATION: 'Time until response headers are received per endpoint.',
+    RETRIES: 'Retried API calls (tenacity).',
+    THROTTLED: 'Responses with HTTP 429 Too Many Requests.',
+    BYTES_UPLOADED: 'Bytes sent in request bodies.',
+    BYTES_DOWNLOADED: 'Bytes received in response bodies.',
+    TOKEN_REFRESHES: 'Access token refreshes (OAuth2 refresh token flow).'
+}
+
+# Prometheus default buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# path segments replaced in endpoint labels (ids and tokens, e.g. access keys)
+ID_SEGMENT = re.compile(r'^\d+$')
+TOKEN_SEGMENT = re.compile(r'^[\w-]{20,}$')
+REQUEST_STARTED = 'dracoon_request_started'
+
+
+class MetricsSink(Protocol):
+    """ metrics sink signature – example see PrometheusMetrics """
+    def increment(self, name: str, value: float = 1, **labels: str) -> Any:
+        ...
+
+    def observe(self, name: str, value: float, **labels: str) -> Any:
+        ...
+
+
+class PrometheusMetrics:
+    """ in-memory metrics sink (counters and histograms) with Prometheus text export """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        # per label set: observations per bucket (last: +Inf), sum
+        self.histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], List[float]]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if key not in series:
+            series[key] = [0] * (len(self.buckets) + 2)
+
+        observations = series[key]
+        bucket = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        observations[bucket] += 1
+        observations[-1] += value
+
+    def get_count(self, name: str, **labels: str) -> float:
+        """ sum of a counter (or number of observations of a histogram) for all series matching given labels """
+        labels = set(labels.items())
+        if name in self.histograms:
+            return sum(sum(observations[:-1]) for key, observations in self.histograms[name].items() if labels <= set(key))
+        return sum(value for key, value in self.counters.get(name, {}).items() if labels <= set(key))
+
+    def export(self) -> str:
+        """ all metrics in Prometheus text exposition format """
+        lines = []
+
+        for name, series in self.counters.items():
+            lines.extend(metric_header(name=name, metric_type='counter'))
+            for key, value in series.items():
+                lines.append(f'{name}{format_labels(key)} {format_value(value)}')
+
+        for name, series in self.histograms.items():
+            lines.extend(metric_header(name=name, metric_type='histogram'))
+            for key, observations in series.items():
+                count = 0
+                for bound, observed in zip(self.buckets + (float('inf'),), observations):
+                    count += observed
+                    le = '+Inf' if bound == float('inf') else format_value(bound)
+                    lines.append(f'{name}_bucket{format_labels(key + (("le", le),))} {format_value(count)}')
+                lines.append(f'{name}_sum{format_labels(key)} {format_value(observations[-1])}')
+                lines.append(f'{name}_count{format_labels(key)} {format_value(count)}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def metric_header(name: str, metric_type: str) -> List[str]:
+    """ HELP and TYPE lines of a metric """
+    help_text = METRIC_HELP.get(name)
+    header = [f'# HELP {name} {help_text}'] if help_text else []
+    return header + [f'# TYPE {name} {metric_type}']
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """ Prometheus label set – values are escaped """
+    if not labels:
+        return ''
+    escaped = (key + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"' for key, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+def format_value(value: float) -> str:
+    """ integers without decimals """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def get_endpoint(url: httpx.URL, client: str) -> str:
+    """ endpoint label: path with ids / tokens replaced (API) or host (up- and downloads, e.g. S3) """
+    if client != 'api':
+        return url.host
+    segments = ['{id}' if ID_SEGMENT.match(segment) else '{token}' if TOKEN_SEGMENT.match(segment) else segment
+                for segment in url.path.split('/')]
+    return '/'.join(segments)
+
+
+class CountingStream(httpx.AsyncByteStream):
+    """ async byte stream counting transferred bytes """
+
+    def __init__(self, stream: Any, on_bytes: Callable[[int], None]):
+        self.stream = stream
+        self.on_bytes = on_bytes
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.on_bytes(len(chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self.stream, 'aclose'):
+            await self.stream.aclose()
+
+
+def make_event_hooks(metrics: MetricsSink, client: str) -> Dict[str, List[Callable[..., Any]]]:
+    """
+    httpx event hooks recording latency, 429 responses and transferred bytes of a client (api, upload, download)
+    latency is measured until response headers are received (streamed bodies are counted while read)
+    """
+
+    def count_uploaded(size: int) -> None:
+        metrics.increment(BYTES_UPLOADED, size, client=client)
+
+    def count_downloaded(size: int) -> None:
+        metrics.increment(BYTES_DOWNLOADED, size, client=client)
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions[REQUEST_STARTED] = time.perf_counter()
+        # byte streams may be resent (see RateLimitedTransport) and have a known length
+        if isinstance(request.stream, httpx.ByteStream):
+            size = int(request.headers.get('Content-Length', 0))
+            if size:
+                count_uploaded(size)
+        else:
+            request.stream = CountingStream(stream=request.stream, on_bytes=count_uploaded)
+
+    async def on_response(response: httpx.Response) -> None:
+        request = response.request
+        labels = { "client": client, "method": request.method, "endpoint": get_endpoint(request.url, client) }
+
+        started = request.extensions.get(REQUEST_STARTED)
+        if started is not None:
+            metrics.observe(REQUEST_DURATION, time.perf_counter() - started, status=str(response.status_code), **labels)
+        if response.status_code == 429:
+            metrics.increment(THROTTLED, **labels)
+
+        response.stream = CountingStream(stream=response.stream, on_bytes=count_downloaded)
+
+    return { "request": [on_request], "response": [on_response] }
+
+
+def record_retry(retry_state: RetryCallState) -> None:
+    """ tenacity before_sleep: count retries of adapter methods in the sink of their client (if any) """
+    adapter = retry_state.args[0] if retry_state.args else None
+    metrics = getattr(getattr(adapter, 'dracoon', None), 'metrics', None)
+    if metrics is None:
+        return
+
+    error = retry_state.outcome.exception() if retry_state.outcome else None
+    metrics.increment(RETRIES, operation=retry_state.fn.__qualname__ if retry_state.fn else '',
+                      reason=type(error).__name__ if error else '')
@@ -35,6 +35,26 @@ class OAuth2ConnectionType(Enum):
     auth_code = 2
     refresh_token = 3
 
+class ResponseMode(Enum):
+    """ parsing of (paged) list responses """
+    """ validate: pydantic models (default), construct: models built without validation (values not parsed, e.g. datetimes as str), raw: dicts """
+    validate = 'validate'
+    construct = 'construct'
+    raw = 'raw'
+
+@dataclass
+class BulkResult:
+    """ result of a single work item processed by bulk_process """
+    """ index: position of the item in the source, error: exception raised by the request (None on success) """
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 @dataclass
 class DRACOONConnection:
     """ DRACOON connection with tokens and validity """
@@ -43,8 +63,20 @@ class DRACOONConnection:
     access_token_validity: int
     refresh_token: str
     
+class TransportConfig(BaseModel):
+    """ connection pool and protocol settings of the httpx clients (defaults as in httpx) """
+    """ API requests (http) use max_connections, up- and downloads have separate pools """
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    upload_max_connections: Optional[int] = 100
+    download_max_connections: Optional[int] = 100
+    # HTTP/2 for API requests – requires h2 (pip install httpx[http2])
+    http2: bool = False
+    
 class RetryConfig(BaseModel):
     retry: Any
     stop: Any
     wait: Any
-    reraise: bool
\ No newline at end of file
+    reraise: bool
+    before_sleep: Any = None
\ No newline at end of file
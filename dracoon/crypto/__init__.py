@@ -21,7 +21,8 @@ Encryption:
 import os
 import base64
 import logging 
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Tuple
 
 from pydantic import validate_arguments
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
@@ -36,14 +37,47 @@ from .models import (FileKey, FileKeyVersion, PlainFileKey, PlainFileKeyVersion,
 
 logger = logging.getLogger('dracoon.crypto')
 
+
+# deserialized RSA keys are cached by PEM (see load_private_key, load_public_key)
+# the cache is process-wide (shared by all DRACOON instances) – it is cleared on DRACOON.logout() or with clear_key_cache()
+PRIVATE_KEY_CACHE_SIZE = 4
+PUBLIC_KEY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=PRIVATE_KEY_CACHE_SIZE)
+def load_private_key_pem(private_key_pem: str) -> rsa.RSAPrivateKey:
+    """ deserialize a plain PEM private key (cached) """
+    return serialization.load_pem_private_key(data=private_key_pem.encode('ascii'), password=None)
+
+
+@lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)
+def load_public_key_pem(public_key_pem: str) -> rsa.RSAPublicKey:
+    """ deserialize a PEM public key (cached) """
+    return serialization.load_pem_public_key(public_key_pem.encode('ascii'))
+
+
+def load_private_key(keypair: PlainUserKeyPairContainer) -> rsa.RSAPrivateKey:
+    """ load the private key of a plain user keypair (deserialized once per PEM) """
+    return load_private_key_pem(keypair.privateKeyContainer.privateKey)
+
+
+def load_public_key(public_key: PublicKeyContainer) -> rsa.RSAPublicKey:
+    """ load the public key of a public key container (deserialized once per PEM) """
+    return load_public_key_pem(public_key.publicKey)
+
+
+def clear_key_cache() -> None:
+    """ remove all deserialized keys (and plain private key PEMs) from cache – e.g. on logout or if the user keypair is replaced """
+    load_private_key_pem.cache_clear()
+    load_public_key_pem.cache_clear()
+
+
 @validate_arguments
 def encrypt_private_key(secret: str, plain_key: PlainUserKeyPairContainer) -> UserKeyPairContainer:
     """ encrypt a private key (requires a plain user keypair container: create_plain_user_keypair()) """
     logger.info("Encrypting private key - version: %s", plain_key.privateKeyContainer.version)
     # load plain private key
-    private_key_pem = plain_key.privateKeyContainer.privateKey
-    private_key: rsa.RSAPrivateKeyWithSerialization = serialization.load_pem_private_key(
-        data=private_key_pem.encode('ascii'), password=None)
+    private_key = load_private_key(plain_key)
 
     # serialize key with passphrase (secret)
     encrypted_private_key = private_key.private_bytes(encoding=serialization.Encoding.PEM,
@@ -175,8 +209,7 @@ def encrypt_file_key_public(plain_file_key: PlainFileKey, public_key: PublicKeyC
 
     logger.info("Creating file key with public key: %s", public_key.version)
 
-    public_key_pem = serialization.load_pem_public_key(
-        public_key.publicKey.encode('ascii'))
+    public_key_pem = load_public_key(public_key)
         
     # check correct version
     file_key_version = get_file_key_version_public(public_key)
@@ -211,9 +244,7 @@ def encrypt_file_key(plain_file_key: PlainFileKey, keypair: PlainUserKeyPairCont
 
     logger.info("Encrypting file key: %s", keypair.privateKeyContainer.version)
 
-    private_key_pem = keypair.privateKeyContainer.privateKey
-    private_key: rsa.RSAPrivateKeyWithSerialization = serialization.load_pem_private_key(
-        data=private_key_pem.encode('ascii'), password=None)
+    private_key = load_private_key(keypair)
     public_key = private_key.public_key()
 
     # check correct version
@@ -248,9 +279,7 @@ def decrypt_file_key(file_key: FileKey, keypair: PlainUserKeyPairContainer) -> P
     logger.info("Decrypting file key: %s", keypair.privateKeyContainer.version)
 
     key = base64.b64decode(file_key.key)
-    private_key_pem = keypair.privateKeyContainer.privateKey
-    private_key: rsa.RSAPrivateKeyWithSerialization = serialization.load_pem_private_key(
-        data=private_key_pem.encode('ascii'), password=None)
+    private_key = load_private_key(keypair)
 
     file_key_version = get_file_key_version(keypair)
 
@@ -277,6 +306,16 @@ def decrypt_file_key(file_key: FileKey, keypair: PlainUserKeyPairContainer) -> P
         raise FileKeyEncryptionError(message='Could not encrypt file key')
 
 
+def encrypt_file_keys_public(items: List[Tuple[PlainFileKey, PublicKeyContainer]]) -> List[FileKey]:
+    """ encrypt a batch of file keys with given public keys (e.g. in a process pool) """
+    return [encrypt_file_key_public(plain_file_key=plain_file_key, public_key=public_key) for plain_file_key, public_key in items]
+
+
+def decrypt_file_keys(file_keys: List[FileKey], keypair: PlainUserKeyPairContainer) -> List[PlainFileKey]:
+    """ decrypt a batch of file keys with given plain user keypair (e.g. in a process pool) """
+    return [decrypt_file_key(file_key=file_key, keypair=keypair) for file_key in file_keys]
+
+
 def decrypt_bytes(enc_data: bytes, plain_file_key: PlainFileKey) -> bytes:
     """ decrypt bytes with given plain file key (on the fly) """
     logger.info("Decrypting bytes with version: %s", plain_file_key.version)
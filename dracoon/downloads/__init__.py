@@ -11,14 +11,18 @@ https://support.dracoon.com/hc/de/articles/115005512089
 """
 import os
 from pathlib import Path
+import asyncio
 import logging
+import queue
 import random
 import string
+import threading
+from typing import Callable
 
 import httpx
 from cryptography.exceptions import InvalidTag
 
-from dracoon.nodes import CHUNK_SIZE
+from dracoon.nodes import CHUNK_SIZE, PIPELINE_QUEUE_SIZE
 from dracoon.nodes.models import Callback, Node, NodeType
 from dracoon.client import DRACOONClient
 from dracoon.crypto import FileDecryptionCipher, decrypt_file_key
@@ -26,6 +30,9 @@ from dracoon.crypto.models import FileKey, PlainUserKeyPairContainer
 from dracoon.errors import (DRACOONCryptoError, InvalidClientError, ClientDisconnectedError, InvalidFileError, 
                             FileConflictError, InvalidPathError)
 
+# parallel range requests for segmented downloads (1: single stream)
+MAX_PARALLEL_SEGMENTS = 1
+
 
 class DRACOONDownloads:
 
@@ -62,11 +69,102 @@ class DRACOONDownloads:
 
         return file.exists() and file.is_file()
 
+    def write_at(self, fd: int, data: bytes, offset: int) -> None:
+        """ write bytes to a file descriptor at given offset """
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    
+    async def download_segment(self, download_url: str, fd: int, start: int, end: int, chunksize: int = CHUNK_SIZE, 
+                               callback_fn: Callback = None) -> None:
+        """ download a byte range (HTTP Range request) and write it at its offset """
+        headers = { "Range": f'bytes={start}-{end}' }
+        
+        async with self.dracoon.downloader.stream(method='GET', url=download_url, headers=headers) as res:
+            res.raise_for_status()
+            if res.status_code != 206:
+                raise httpx.HTTPStatusError(f'Range {start}-{end} not supported.', request=res.request, response=res)
+            
+            offset = start
+            async for chunk in res.aiter_bytes(chunksize):
+                self.write_at(fd=fd, data=chunk, offset=offset)
+                offset += len(chunk)
+                if callback_fn: callback_fn(len(chunk))
+                
+        self.logger.debug("Downloaded range %s-%s", start, end)
+    
+    async def download_segments(self, download_url: str, file_path: str, size: int, chunksize: int = CHUNK_SIZE, 
+                                max_parallel_segments: int = MAX_PARALLEL_SEGMENTS, callback_fn: Callback = None) -> None:
+        """ 
+        download a file in byte ranges (segments of chunksize) into a preallocated file 
+        up to max_parallel_segments range requests are in flight, each segment is written at its offset 
+        the first request probes for range support – if the server ignores the range, the file is downloaded as a single stream 
+        """
+        segments = [(start, min(start + chunksize, size) - 1) for start in range(0, size, chunksize)]
+        
+        async def download_remaining(fd: int) -> None:
+            pending = set()
+            try:
+                for start, end in segments[1:]:
+                    pending.add(asyncio.create_task(self.download_segment(download_url=download_url, fd=fd, start=start, end=end, 
+                                                                          chunksize=chunksize, callback_fn=callback_fn)))
+                    # first segment is in flight as well
+                    if len(pending) >= max_parallel_segments - 1:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done: task.result()
+                if pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                    for task in done: task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+        
+        with open(file_path, 'wb') as file_out:
+            # preallocate file
+            file_out.truncate(size)
+            fd = file_out.fileno()
+            remaining = None
+            
+            start, end = segments[0]
+            headers = { "Range": f'bytes={start}-{end}' }
+            
+            try:
+                async with self.dracoon.downloader.stream(method='GET', url=download_url, headers=headers) as res:
+                    res.raise_for_status()
+                    
+                    # range ignored: single stream
+                    if res.status_code != 206:
+                        self.logger.debug("Range requests not supported – using single stream.")
+                        offset = 0
+                        async for chunk in res.aiter_bytes(chunksize):
+                            self.write_at(fd=fd, data=chunk, offset=offset)
+                            offset += len(chunk)
+                            if callback_fn: callback_fn(len(chunk))
+                        return
+                    
+                    self.logger.debug("Downloading %s segments.", len(segments))
+                    remaining = asyncio.create_task(download_remaining(fd=fd))
+                    
+                    offset = start
+                    async for chunk in res.aiter_bytes(chunksize):
+                        self.write_at(fd=fd, data=chunk, offset=offset)
+                        offset += len(chunk)
+                        if callback_fn: callback_fn(len(chunk))
+                
+                await remaining
+            finally:
+                if remaining and not remaining.done():
+                    remaining.cancel()
+                    await asyncio.gather(remaining, return_exceptions=True)
+
     async def download_unencrypted(self, download_url: str, target_path: str, node_info: Node, chunksize: int = CHUNK_SIZE, 
                                    raise_on_err: bool = False, callback_fn: Callback  = None,
-                                   file_name: str = None
+                                   file_name: str = None, max_parallel_segments: int = MAX_PARALLEL_SEGMENTS
                                    ):
         """ Download a file from an unecrypted data room. """
+        """ max_parallel_segments: concurrent range requests (segments of chunksize) written at their offset """
 
         self.logger.info("Download started.")
         self.logger.debug("Download to %s", target_path)
@@ -103,15 +201,23 @@ class DRACOONDownloads:
 
         self.logger.debug("File download for size: %s", size)
         self.logger.debug("Using chunksize: %s", chunksize)
+        
+        # segmented download requires positional writes (POSIX)
+        use_segments = max_parallel_segments > 1 and size > chunksize and hasattr(os, 'pwrite')
+        file_out = None
             
-        try:             
-            file_out = open(file_path, 'wb')
-                
-            async with self.dracoon.downloader.stream(method='GET', url=download_url) as res:
-                res.raise_for_status()
-                async for chunk in res.aiter_bytes(chunksize):
-                    file_out.write(chunk)
-                    if callback_fn: callback_fn(len(chunk))
+        try:
+            if use_segments:
+                await self.download_segments(download_url=download_url, file_path=file_path, size=size, chunksize=chunksize, 
+                                             max_parallel_segments=max_parallel_segments, callback_fn=callback_fn)
+            else:
+                file_out = open(file_path, 'wb')
+                    
+                async with self.dracoon.downloader.stream(method='GET', url=download_url) as res:
+                    res.raise_for_status()
+                    async for chunk in res.aiter_bytes(chunksize):
+                        file_out.write(chunk)
+                        if callback_fn: callback_fn(len(chunk))
                                         
         except httpx.RequestError as e:
             os.remove(file_path)
@@ -124,6 +230,62 @@ class DRACOONDownloads:
            
         self.logger.info("Download completed.")
             
+    def decrypt_to_file(self, file_out, decryptor: FileDecryptionCipher, chunk_queue: queue.Queue, aborted: threading.Event,
+                        on_chunk: Callable[[], None]) -> None:
+        """ 
+        decrypt chunks from a queue and write them to file (runs on a dedicated thread)
+        None marks the end of the stream – decryption is finalized (tag verified) unless aborted, on_chunk is called per processed chunk
+        on errors, aborted is set and the queue is drained until the end of the stream
+        """
+        error = None
+        
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is None:
+                break
+            if not error and not aborted.is_set():
+                try:
+                    file_out.write(decryptor.decode_bytes(chunk))
+                except Exception as e:
+                    error = e
+                    aborted.set()
+            on_chunk()
+        
+        if error:
+            raise error
+        if aborted.is_set():
+            return
+        
+        file_out.write(decryptor.finalize())
+    
+    def start_writer(self, file_out, decryptor: FileDecryptionCipher, chunk_queue: queue.Queue, aborted: threading.Event,
+                     slots: asyncio.Semaphore) -> asyncio.Future:
+        """
+        run decrypt_to_file on a dedicated thread (no executor worker is blocked while waiting for chunks)
+        each processed chunk releases a queue slot, the returned future is resolved when the thread ends
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def resolve(error: BaseException = None) -> None:
+            if done.done():
+                return
+            if error:
+                done.set_exception(error)
+            else:
+                done.set_result(None)
+
+        def write() -> None:
+            try:
+                self.decrypt_to_file(file_out, decryptor, chunk_queue, aborted, on_chunk=lambda: loop.call_soon_threadsafe(slots.release))
+            except BaseException as e:
+                loop.call_soon_threadsafe(resolve, e)
+            else:
+                loop.call_soon_threadsafe(resolve)
+
+        threading.Thread(target=write, name='dracoon-decrypt', daemon=True).start()
+        return done
+            
     async def download_encrypted(self, download_url: str, target_path: str, node_info: Node, plain_keypair: PlainUserKeyPairContainer, file_key: FileKey, 
                                        chunksize: int = CHUNK_SIZE, raise_on_err: bool = False, callback_fn: Callback  = None, file_name: str = None):   
         """ Download a file from an encrypted data room. """
@@ -174,23 +336,35 @@ class DRACOONDownloads:
         # init callback size
         if callback_fn: callback_fn(0, size)
 
+        # network receive runs on the event loop, decryption and disk writes on a dedicated thread
+        # queued chunks are bound by PIPELINE_QUEUE_SIZE (slots are released by the writer)
+        chunk_queue = queue.Queue()
+        slots = asyncio.Semaphore(PIPELINE_QUEUE_SIZE)
+        aborted = threading.Event()
+
         try:
-            with open(file_path, 'wb') as file_out:       
-                async with self.dracoon.downloader.stream(method='GET', url=download_url) as res:
-                    res.raise_for_status()
-                
-                    # decrypt file and then write to disk
-                    async for chunk in res.aiter_bytes(chunksize):            
-                        plain_chunk = decryptor.decode_bytes(chunk)
-                        file_out.write(plain_chunk)
-                        if callback_fn: callback_fn(len(chunk))
-                            
-                            # finalize encryption after last chunk
-                        if not chunk:
-                            last_data = decryptor.finalize()
-                            file_out.write(last_data)
+            with open(file_path, 'wb') as file_out:
+                writer = self.start_writer(file_out, decryptor, chunk_queue, aborted, slots)
+                try:
+                    async with self.dracoon.downloader.stream(method='GET', url=download_url) as res:
+                        res.raise_for_status()
+                    
+                        # decrypt file and then write to disk
+                        async for chunk in res.aiter_bytes(chunksize):
+                            await slots.acquire()
+                            # writer failed – error is raised when awaited
+                            if aborted.is_set(): break
+                            chunk_queue.put_nowait(chunk)
+                            if callback_fn: callback_fn(len(chunk))
+                except BaseException:
+                    aborted.set()
+                    raise
+                finally:
+                    # end of stream: finalize decryption after last chunk
+                    chunk_queue.put_nowait(None)
+                    await writer
                                         
-                        self.logger.info("Download completed.")
+            self.logger.info("Download completed.")
         except InvalidTag:
             # remove unverified decrypted bytes
             os.remove(file_path)
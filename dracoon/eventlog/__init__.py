@@ -14,16 +14,50 @@ Please note: maximum 500 items are returned in GET requests
 
 """
 
-from typing import List
+import asyncio
+import csv
+import heapq
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import httpx
 import logging
 import urllib.parse
+from pydantic import TypeAdapter
 from tenacity import retry
 
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
-from dracoon.errors import ClientDisconnectedError, InvalidClientError
-from .responses import AuditNodeInfoResponse, AuditNodeResponse, LogEventList
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, MAX_PARALLEL_PAGES, construct_model, iter_json_array, iter_pages, loads_json
+from dracoon.client.models import ResponseMode
+from dracoon.errors import ClientDisconnectedError, InvalidArgumentError, InvalidClientError
+from .models import EventExportFormat
+from .responses import AuditNodeInfo, AuditNodeInfoResponse, AuditNodeResponse, LogEvent, LogEventList
+from .store import EventStore, format_time
 
+# permission audit (JSON array of AuditNodeResponse)
+AUDIT_NODES_ADAPTER = TypeAdapter(List[AuditNodeResponse])
+# permission audit CSV (one row per node and user, see examples/csv_permissions_standalone.py)
+PERMISSIONS_CSV_COLUMNS = ['roomId', 'roomName', 'path', 'parentId', 'userId', 'firstName', 'lastName', 'login', 'manage', 'read', 'create', 'change', 
+                           'delete', 'manageShares', 'manageFileRequests', 'readRecycleBin', 'restoreRecycleBin', 'deleteRecycleBin']
+PERMISSIONS_CSV_DELIMITER = ';'
+# window size (date_start / date_end) of sync_events
+EVENT_SYNC_WINDOW = timedelta(days=1)
+# events stored per transaction in sync_events
+EVENT_SYNC_BATCH_SIZE = 500
+# time windows in iter_events_by_window / export_events: concurrent windows, max. size (initial), min. size, 
+# max. events per window (denser windows are split)
+MAX_PARALLEL_WINDOWS = 4
+EVENT_EXPORT_WINDOW = timedelta(days=1)
+EVENT_EXPORT_MIN_WINDOW = timedelta(minutes=1)
+EVENT_WINDOW_MAX_EVENTS = 5000
+# events per request (API maximum)
+EVENT_PAGE_SIZE = 500
+
+
+def format_event_date(date: datetime) -> str:
+    """ date_start / date_end parameter (UTC, seconds) – naive datetimes are treated as UTC """
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
 
 class DRACOONEvents:
 
@@ -81,13 +115,84 @@ class DRACOONEvents:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved node permission audit.")
-        tmp_list = res.json()
         
-        return [AuditNodeResponse(**node_info) for node_info in tmp_list]
+        return AUDIT_NODES_ADAPTER.validate_python(loads_json(res.content))
+
+    async def iter_permissions(self, filter: str = None, sort: str = None, raise_on_err = False) -> AsyncIterator[AuditNodeResponse]:
+        """ 
+        iterate permissions for all nodes (rooms) – the response of get_permissions() is streamed and parsed incrementally 
+        (memory use does not depend on the number of nodes) 
+        """
+        if not await self.dracoon.test_connection() and self.dracoon.connection:
+            await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
+
+        if self.raise_on_err:
+            raise_on_err = True
+        
+        if filter: filter = urllib.parse.quote(filter)
+
+        api_url = self.api_url + '/audits/nodes/?offset=0'
+        if filter != None: api_url += f'&filter={filter}' 
+        if sort != None: api_url += f'&sort={sort}' 
+
+        count = 0
+        try:
+            async with self.dracoon.http.stream('GET', api_url) as res:
+                try:
+                    res.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    await res.aread()
+                    self.logger.error("Getting permissions failed.")
+                    await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
+                    return
+                
+                try:
+                    async for item in iter_json_array(res.aiter_bytes()):
+                        yield AuditNodeResponse.model_validate(item)
+                        count += 1
+                except ValueError as e:
+                    # invalid or incomplete (truncated) response
+                    self.logger.error("Parsing permissions failed (%s nodes).", count)
+                    if raise_on_err:
+                        await self.dracoon.handle_generic_error(err=e)
+                    return
+        except httpx.RequestError as e:
+            await self.dracoon.handle_connection_error(e)
+        
+        self.logger.info("Retrieved node permission audit (%s nodes).", count)
+
+    async def export_permissions(self, file_path: str, filter: str = None, sort: str = None, raise_on_err = False) -> int:
+        """ 
+        export permissions for all nodes (rooms) to CSV (one row per user permission, nodes without users: one row) 
+        nodes are written while the response is streamed (see iter_permissions) – returns number of nodes 
+        """
+        count = 0
+        
+        with open(file_path, 'w', newline='', encoding='utf-8') as export_file:
+            writer = csv.writer(export_file, delimiter=PERMISSIONS_CSV_DELIMITER)
+            writer.writerow(PERMISSIONS_CSV_COLUMNS)
+            
+            async for node in self.iter_permissions(filter=filter, sort=sort, raise_on_err=raise_on_err):
+                node_columns = [node.nodeId, node.nodeName, node.nodeParentPath, node.nodeParentId]
+                if not node.auditUserPermissionList:
+                    writer.writerow(node_columns + ['-'] * (len(PERMISSIONS_CSV_COLUMNS) - len(node_columns)))
+                
+                for user_permission in node.auditUserPermissionList:
+                    permissions = user_permission.permissions
+                    writer.writerow(node_columns + [user_permission.userId, user_permission.userFirstName, user_permission.userLastName, 
+                                                    user_permission.userLogin, permissions.manage, permissions.read, permissions.create, 
+                                                    permissions.change, permissions.delete, permissions.manageDownloadShare, 
+                                                    permissions.manageUploadShare, permissions.readRecycleBin, permissions.restoreRecycleBin, 
+                                                    permissions.deleteRecycleBin])
+                count += 1
+        
+        self.logger.info("Exported permissions of %s nodes.", count)
+        return count
     
     @retry(**RETRY_CONFIG)
     async def get_rooms(self, parent_id: int = 0, offset: int = 0, filter: str = None, 
-                                   limit: int = None, sort: str = None, raise_on_err = False) -> AuditNodeInfoResponse:
+                                   limit: int = None, sort: str = None, raise_on_err = False, 
+                        response_mode: ResponseMode = None) -> AuditNodeInfoResponse:
         """ get permissions for all nodes (rooms) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -112,11 +217,19 @@ class DRACOONEvents:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved node permission audit.")
-        return AuditNodeInfoResponse(**res.json())
+        return self.dracoon.parse_response(res=res, model=AuditNodeInfoResponse, response_mode=response_mode)
+
+    async def iter_rooms(self, parent_id: int = 0, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                         raise_on_err=False, response_mode: ResponseMode = None) -> AsyncIterator[AuditNodeInfo]:
+        """ iterate (all) items of get_rooms() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_rooms, offset=offset, parent_id=parent_id, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def get_events(self, offset: int = 0, filter: str = None, limit: int = None, 
-                        sort: str = None, date_start: str = None, date_end: str = None, operation_id: int = None, user_id: int = None, raise_on_err = False) -> LogEventList:
+                        sort: str = None, date_start: str = None, date_end: str = None, operation_id: int = None, user_id: int = None, raise_on_err = False, 
+                         response_mode: ResponseMode = None) -> LogEventList:
         """ get events (audit log) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -146,6 +259,203 @@ class DRACOONEvents:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
         self.logger.info("Retrieved events from eventlog.")
-        return LogEventList(**res.json())
+        return self.dracoon.parse_response(res=res, model=LogEventList, response_mode=response_mode)
+
+    async def iter_events(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, date_start: str = None, 
+                          date_end: str = None, operation_id: int = None, user_id: int = None, raise_on_err=False, 
+                          max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                          response_mode: ResponseMode = None) -> AsyncIterator[LogEvent]:
+        """ iterate (all) items of get_events() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_events, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     date_start=date_start, date_end=date_end, operation_id=operation_id, user_id=user_id, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
+
+    async def sync_events(self, store: EventStore, date_start: datetime = None, date_end: datetime = None, window: timedelta = EVENT_SYNC_WINDOW, 
+                          raise_on_err=False) -> int:
+        """ 
+        sync events incrementally into a local store – starts at the checkpoint of the store (else date_start or the first event) 
+        events are requested in windows of given size (date_start / date_end), the checkpoint is updated per stored batch – returns number of new events 
+        on resume, events before the checkpoint time and the checkpoint event (last id) are not stored again 
+        """
+        checkpoint = store.get_checkpoint()
+        if checkpoint is not None:
+            date_start = checkpoint[1]
+        elif date_start is None:
+            first_events = await self.get_events(limit=1, sort='time:asc', raise_on_err=raise_on_err, response_mode=ResponseMode.validate)
+            if not first_events.items:
+                self.logger.info("No events to sync.")
+                return 0
+            date_start = first_events.items[0].time
+        
+        # windows start at full seconds – events at window bounds are requested twice (stored once)
+        if date_start.tzinfo is None:
+            date_start = date_start.replace(tzinfo=timezone.utc)
+        window_start = date_start.replace(microsecond=0)
+        date_end = date_end or datetime.now(timezone.utc)
+        if date_end.tzinfo is None:
+            date_end = date_end.replace(tzinfo=timezone.utc)
+        
+        last_id, last_time = (checkpoint[0], format_time(checkpoint[1])) if checkpoint else (None, None)
+        checkpoint_id, checkpoint_time = last_id, last_time
+        added = 0
+        while window_start < date_end:
+            window_end = min(window_start + window, date_end)
+            batch = []
+            
+            async for event in self.iter_events(date_start=format_event_date(window_start), date_end=format_event_date(window_end), sort='time:asc', 
+                                                raise_on_err=raise_on_err, response_mode=ResponseMode.raw):
+                event_time = format_time(event['time'])
+                # synced before the checkpoint (events are ordered by time) or the checkpoint event itself
+                if checkpoint_time is not None and (event_time < checkpoint_time or event['id'] == checkpoint_id):
+                    continue
+                batch.append(event)
+                if last_time is None or event_time >= last_time:
+                    last_id, last_time = event['id'], event_time
+                if len(batch) >= EVENT_SYNC_BATCH_SIZE:
+                    added += store.add_events(batch, checkpoint=(last_id, last_time))
+                    batch = []
+                        
+            if batch:
+                added += store.add_events(batch, checkpoint=(last_id, last_time))
+            
+            self.logger.debug("Synced events until %s.", window_end)
+            window_start = window_end
+        
+        self.logger.info("Synced %s new events.", added)
+        return added
 
+    async def get_event_window(self, date_start: datetime, date_end: datetime, operation_id: int = None, user_id: int = None, 
+                               filter: str = None, max_events: int = None, raise_on_err=False) -> Optional[List[Dict[str, Any]]]:
+        """ 
+        get all events (raw, ordered by time) with date_start <= time < date_end – None if the window has more than max_events 
+        (pages are requested sequentially, see iter_events_by_window for concurrent windows) 
+        """
+        events = []
+        offset = 0
+        lower, upper = format_time(date_start), format_time(date_end)
+        
+        while True:
+            page = await self.get_events(offset=offset, limit=EVENT_PAGE_SIZE, sort='time:asc', date_start=format_event_date(date_start), 
+                                         date_end=format_event_date(date_end), operation_id=operation_id, user_id=user_id, filter=filter, 
+                                         raise_on_err=raise_on_err, response_mode=ResponseMode.raw)
+            if max_events is not None and page['range']['total'] > max_events:
+                return None
+            
+            # bounds of date_start / date_end are inclusive (seconds) – events are assigned to exactly one window
+            for event in page['items']:
+                event_time = format_time(event['time'])
+                if lower <= event_time < upper:
+                    events.append((event_time, event['id'], event))
+            
+            offset += len(page['items'])
+            if not page['items'] or offset >= page['range']['total']:
+                break
+        
+        events.sort(key=lambda item: item[:2])
+        return [event for _, _, event in events]
 
+    async def iter_events_by_window(self, date_start: datetime, date_end: datetime = None, operation_id: int = None, user_id: int = None, 
+                                    filter: str = None, window: timedelta = EVENT_EXPORT_WINDOW, max_parallel_windows: int = MAX_PARALLEL_WINDOWS, 
+                                    raise_on_err=False, response_mode: ResponseMode = None) -> AsyncIterator[LogEvent]:
+        """ 
+        iterate events of a period ordered by time – the period is split in windows (date_start / date_end) requested concurrently 
+        windows with more than EVENT_WINDOW_MAX_EVENTS are split, following windows shrink (dense periods) or grow up to window (sparse periods) 
+        received windows are kept until all previous windows are yielded (max. max_parallel_windows) 
+        """
+        if date_start.tzinfo is None:
+            date_start = date_start.replace(tzinfo=timezone.utc)
+        date_end = date_end or datetime.now(timezone.utc)
+        if date_end.tzinfo is None:
+            date_end = date_end.replace(tzinfo=timezone.utc)
+        if response_mode is None:
+            response_mode = self.dracoon.response_mode
+        
+        # windows start at full seconds (date_start / date_end parameters)
+        next_start = date_start.replace(microsecond=0)
+        window_start = next_start
+        window_size = window
+        # split windows (ordered by start), requested and received (not yet yielded) windows
+        split_windows: List[Tuple[datetime, datetime]] = []
+        tasks = {}
+        windows = {}
+        
+        try:
+            while True:
+                while len(tasks) < max_parallel_windows and (len(windows) < max_parallel_windows or not tasks):
+                    if split_windows:
+                        start, end = heapq.heappop(split_windows)
+                    elif window_start < date_end:
+                        start, end = window_start, min(window_start + window_size, date_end)
+                        window_start = end
+                    else:
+                        break
+                    max_events = EVENT_WINDOW_MAX_EVENTS if end - start > EVENT_EXPORT_MIN_WINDOW else None
+                    task = asyncio.ensure_future(self.get_event_window(date_start=start, date_end=end, operation_id=operation_id, user_id=user_id, 
+                                                                       filter=filter, max_events=max_events, raise_on_err=raise_on_err))
+                    tasks[task] = (start, end)
+                
+                if not tasks:
+                    break
+                
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start, end = tasks.pop(task)
+                    events = task.result()
+                    
+                    if events is None:
+                        half = max((end - start) / 2, EVENT_EXPORT_MIN_WINDOW)
+                        middle = start + timedelta(seconds=int(half.total_seconds()))
+                        heapq.heappush(split_windows, (start, middle))
+                        heapq.heappush(split_windows, (middle, end))
+                        window_size = max(window_size / 2, EVENT_EXPORT_MIN_WINDOW)
+                        self.logger.debug("Split event window %s – %s.", start, end)
+                        continue
+                    
+                    if len(events) < EVENT_WINDOW_MAX_EVENTS / 4:
+                        window_size = min(window_size * 2, window)
+                    windows[start] = (end, events)
+                
+                while next_start in windows:
+                    next_start, events = windows.pop(next_start)
+                    for event in events:
+                        if response_mode == ResponseMode.raw:
+                            yield event
+                        elif response_mode == ResponseMode.construct:
+                            yield construct_model(LogEvent, event)
+                        else:
+                            yield LogEvent.model_validate(event)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def export_events(self, file_path: str, date_start: datetime, date_end: datetime = None, file_format: EventExportFormat = EventExportFormat.ndjson, 
+                            operation_id: int = None, user_id: int = None, filter: str = None, window: timedelta = EVENT_EXPORT_WINDOW, 
+                            max_parallel_windows: int = MAX_PARALLEL_WINDOWS, raise_on_err=False) -> int:
+        """ 
+        export events of a period (ordered by time) to a file (NDJSON or CSV) – events are written while windows are received 
+        (see iter_events_by_window) – returns number of exported events 
+        """
+        if not isinstance(file_format, EventExportFormat):
+            raise InvalidArgumentError(message=f'Invalid export format: {file_format}')
+        
+        count = 0
+        events = self.iter_events_by_window(date_start=date_start, date_end=date_end, operation_id=operation_id, user_id=user_id, filter=filter, 
+                                            window=window, max_parallel_windows=max_parallel_windows, raise_on_err=raise_on_err, 
+                                            response_mode=ResponseMode.raw)
+        
+        with open(file_path, 'w', newline='', encoding='utf-8') as export_file:
+            if file_format == EventExportFormat.csv:
+                writer = csv.DictWriter(export_file, fieldnames=list(LogEvent.model_fields), extrasaction='ignore')
+                writer.writeheader()
+            
+            async for event in events:
+                if file_format == EventExportFormat.csv:
+                    writer.writerow(event)
+                else:
+                    export_file.write(json.dumps(event) + '\n')
+                count += 1
+        
+        self.logger.info("Exported %s events.", count)
+        return count
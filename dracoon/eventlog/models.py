@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class EventExportFormat(Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
@@ -0,0 +1,141 @@
+"""
+Local event log store (SQLite) for incremental syncs of the eventlog API
+Events are indexed by time, user and operation – see DRACOONEvents.sync_events()
+
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .responses import LogEvent
+
+# event columns (JSON of each event is stored in data)
+EVENT_COLUMNS = ('id', 'time', 'userId', 'userName', 'operationId', 'operationName', 'status', 'objectId1', 'objectName1', 'data')
+# stored times: UTC, fixed length (sortable as text)
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time TEXT NOT NULL,
+    userId INTEGER,
+    userName TEXT,
+    operationId INTEGER,
+    operationName TEXT,
+    status INTEGER,
+    objectId1 INTEGER,
+    objectName1 TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (time);
+CREATE INDEX IF NOT EXISTS idx_events_user_time ON events (userId, time);
+CREATE INDEX IF NOT EXISTS idx_events_operation_time ON events (operationId, time);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    lastId INTEGER NOT NULL,
+    lastTime TEXT NOT NULL
+);
+"""
+
+
+def format_time(time: Union[datetime, str]) -> str:
+    """ stored time format – naive datetimes are treated as UTC """
+    if isinstance(time, str):
+        time = datetime.fromisoformat(time.replace('Z', '+00:00'))
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return time.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+def parse_time(time: str) -> datetime:
+    """ stored time as (UTC) datetime """
+    return datetime.strptime(time, TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class EventStore:
+    """
+    events in a local SQLite database (path or ':memory:') with a high-water mark (last event id and time)
+    events are unique by id – storing an event twice has no effect
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'EventStore':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add_events(self, events: Iterable[Union[LogEvent, Dict[str, Any]]], checkpoint: Tuple[int, datetime] = None) -> int:
+        """
+        store events (models or raw dicts) and optionally update the checkpoint in one transaction
+        returns the number of new events
+        """
+        rows = []
+        for event in events:
+            if isinstance(event, LogEvent):
+                event = event.model_dump(mode='json')
+            rows.append((event['id'], format_time(event['time']), event.get('userId'), event.get('userName'), event.get('operationId'),
+                         event.get('operationName'), event.get('status'), event.get('objectId1'), event.get('objectName1'), json.dumps(event)))
+
+        with self.connection:
+            added = self.connection.total_changes
+            self.connection.executemany(f"INSERT OR IGNORE INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})", rows)
+            added = self.connection.total_changes - added
+            if checkpoint is not None:
+                self.connection.execute("INSERT OR REPLACE INTO checkpoint (id, lastId, lastTime) VALUES (1, ?, ?)",
+                                        (checkpoint[0], format_time(checkpoint[1])))
+
+        return added
+
+    def get_checkpoint(self) -> Optional[Tuple[int, datetime]]:
+        """ last synced event (id, time) – None if no sync was run """
+        row = self.connection.execute("SELECT lastId, lastTime FROM checkpoint WHERE id = 1").fetchone()
+        return (row[0], parse_time(row[1])) if row else None
+
+    def make_query(self, date_start: datetime = None, date_end: datetime = None, user_id: int = None, operation_id: int = None,
+                   user_name: str = None) -> Tuple[str, List[Any]]:
+        """ WHERE clause and parameters of a query (date_start inclusive, date_end exclusive) """
+        conditions, params = [], []
+        if date_start is not None:
+            conditions.append('time >= ?')
+            params.append(format_time(date_start))
+        if date_end is not None:
+            conditions.append('time < ?')
+            params.append(format_time(date_end))
+        if user_id is not None:
+            conditions.append('userId = ?')
+            params.append(user_id)
+        if operation_id is not None:
+            conditions.append('operationId = ?')
+            params.append(operation_id)
+        if user_name is not None:
+            conditions.append('userName = ?')
+            params.append(user_name)
+
+        return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+    def get_events(self, date_start: datetime = None, date_end: datetime = None, user_id: int = None, operation_id: int = None,
+                   user_name: str = None, limit: int = None, descending: bool = False) -> Iterator[LogEvent]:
+        """ iterate stored events (ordered by time) – e.g. all downloads of a user in a quarter """
+        where, params = self.make_query(date_start=date_start, date_end=date_end, user_id=user_id, operation_id=operation_id, user_name=user_name)
+        sql = f"SELECT data FROM events{where} ORDER BY time {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        for (data, ) in self.connection.execute(sql, params):
+            yield LogEvent(**json.loads(data))
+
+    def count_events(self, date_start: datetime = None, date_end: datetime = None, user_id: int = None, operation_id: int = None,
+                     user_name: str = None) -> int:
+        """ number of stored events matching given filters """
+        where, params = self.make_query(date_start=date_start, date_end=date_end, user_id=user_id, operation_id=operation_id, user_name=user_name)
+        return self.connection.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
@@ -15,17 +15,21 @@ Please note: maximum 500 items are returned in GET requests
 """
 
 import logging
-from typing import List
+from typing import AsyncIterator, Iterable, List, Tuple
 import urllib.parse
 
 import httpx
 from tenacity import retry
 
 from dracoon.user.responses import RoleList
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, MAX_CONCURRENT_REQUESTS, MAX_PARALLEL_PAGES, bulk_process, iter_pages
+from dracoon.client.models import ResponseMode
 from dracoon.errors import ClientDisconnectedError, InvalidClientError
-from .models import CreateGroup, Expiration, UpdateGroup
-from .responses import Group, GroupList, GroupUserList, LastAdminGroupRoomList
+from .models import CreateGroup, Expiration, GroupMembersSync, UpdateGroup
+from .responses import Group, GroupList, GroupUser, GroupUserList, LastAdminGroupRoomList
+
+# max. user ids per add_group_users / delete_group_users request in bulk operations
+GROUP_USERS_BATCH_SIZE = 500
 
 
 class DRACOONGroups:
@@ -91,7 +95,8 @@ class DRACOONGroups:
         return CreateGroup(**group)
     
     @retry(**RETRY_CONFIG)
-    async def get_groups(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> GroupList:
+    async def get_groups(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                         response_mode: ResponseMode = None) -> GroupList:
         """ list (all) groups """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -116,7 +121,16 @@ class DRACOONGroups:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved groups.")
-        return GroupList(**res.json())
+        return self.dracoon.parse_response(res=res, model=GroupList, response_mode=response_mode)
+
+    async def iter_groups(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                          raise_on_err: bool = False, max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                          response_mode: ResponseMode = None) -> AsyncIterator[Group]:
+        """ iterate (all) items of get_groups() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_groups, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
@@ -201,7 +215,8 @@ class DRACOONGroups:
         return None
 
     @retry(**RETRY_CONFIG)
-    async def get_group_users(self, group_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> GroupUserList:
+    async def get_group_users(self, group_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                              response_mode: ResponseMode = None) -> GroupUserList:
         """ list all users for a specific group (by id) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -226,7 +241,14 @@ class DRACOONGroups:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved group users.")
-        return GroupUserList(**res.json())
+        return self.dracoon.parse_response(res=res, model=GroupUserList, response_mode=response_mode)
+
+    async def iter_group_users(self, group_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                               raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[GroupUser]:
+        """ iterate (all) items of get_group_users() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_group_users, offset=offset, group_id=group_id, filter=filter, limit=limit, 
+                                     sort=sort, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def get_group_last_admin_rooms(self, group_id: int, raise_on_err: bool = False) -> LastAdminGroupRoomList:
@@ -328,4 +350,45 @@ class DRACOONGroups:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Deleted group users(s).")
-        return Group(**res.json())
\ No newline at end of file
+        return Group(**res.json())
+
+    async def sync_group_members(self, group_id: int, desired_ids: Iterable[int], delete_missing: bool = True, batch_size: int = GROUP_USERS_BATCH_SIZE, 
+                                 max_concurrency: int = MAX_CONCURRENT_REQUESTS, raise_on_err: bool = False) -> GroupMembersSync:
+        """ 
+        sync members of a group (by id) with a list of user ids – missing users are added, other members removed (delete_missing) 
+        changes are sent in batches (add_group_users / delete_group_users) concurrently – no requests if members match 
+        """
+        if self.raise_on_err:
+            raise_on_err = True
+        
+        members = {item['userInfo']['id'] async for item in self.iter_group_users(group_id=group_id, raise_on_err=True, response_mode=ResponseMode.raw)}
+        desired_ids = set(desired_ids)
+        
+        add_ids = sorted(desired_ids - members)
+        delete_ids = sorted(members - desired_ids) if delete_missing else []
+        batches = [(True, add_ids[start:start + batch_size]) for start in range(0, len(add_ids), batch_size)]
+        batches += [(False, delete_ids[start:start + batch_size]) for start in range(0, len(delete_ids), batch_size)]
+        
+        async def update_members(batch: Tuple[bool, List[int]]) -> None:
+            add, user_ids = batch
+            if add:
+                await self.add_group_users(group_id=group_id, user_list=user_ids, raise_on_err=True)
+            else:
+                await self.delete_group_users(group_id=group_id, user_list=user_ids, raise_on_err=True)
+        
+        result = GroupMembersSync(group_id=group_id)
+        async for res in bulk_process(items=batches, fn=update_members, max_concurrency=max_concurrency):
+            add, user_ids = res.item
+            if not res.ok:
+                result.errors.append(res.error)
+            elif add:
+                result.added.extend(user_ids)
+            else:
+                result.removed.extend(user_ids)
+        
+        self.logger.info("Synced group members: %s added, %s removed, %s failed batches.", len(result.added), len(result.removed), len(result.errors))
+        
+        if raise_on_err and result.errors:
+            raise result.errors[0]
+        
+        return result
\ No newline at end of file
@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -14,4 +15,17 @@ class CreateGroup(BaseModel):
 # required payload for PUT /groups/{group_id}
 class UpdateGroup(BaseModel):
     name: Optional[str]
-    expiration: Optional[Expiration] = None
\ No newline at end of file
+    expiration: Optional[Expiration] = None
+
+@dataclass
+class GroupMembersSync:
+    """ result of sync_group_members """
+    """ added / removed: user ids of successful requests, errors: exceptions of failed batches """
+    group_id: int
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    errors: List[Exception] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -15,32 +15,40 @@ Please note: maximum 500 items are returned in GET requests
 """
 
 import datetime
+from collections import deque
+import json
 import math
+import os
 from pathlib import Path
 from datetime import datetime
-from typing import List, Union
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import logging
 import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import multiprocessing
+import threading
 import urllib.parse
 
 import httpx
 from tenacity import retry
 
-from dracoon.crypto import FileEncryptionCipher, decrypt_file_key, encrypt_bytes, encrypt_file_key, create_file_key, encrypt_file_key_public
-from dracoon.crypto.models import FileKey, PlainUserKeyPairContainer, UserKeyPairContainer
+from dracoon.crypto import (FileEncryptionCipher, decrypt_file_key, decrypt_file_keys, encrypt_bytes, encrypt_file_key, create_file_key, 
+                            encrypt_file_key_public, encrypt_file_keys_public)
+from dracoon.crypto.models import FileKey, PlainFileKey, PlainUserKeyPairContainer, PublicKeyContainer, UserKeyPairContainer
 from dracoon.groups.models import Expiration
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
-from dracoon.errors import (InvalidClientError, ClientDisconnectedError, InvalidFileError, InvalidArgumentError)
-from dracoon.uploads.models import UploadChannelResponse
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, MAX_PARALLEL_PAGES, bulk_process, iter_pages, loads_json
+from dracoon.client.models import ResponseMode
+from dracoon.errors import (DRACOONHttpError, InvalidClientError, ClientDisconnectedError, InvalidFileError, InvalidArgumentError)
+from dracoon.uploads.models import UploadChannelResponse, UploadJournal, UploadJournalPart
 from .models import (Callback, CompleteS3Upload, CompleteUpload, ConfigRoom, CreateFolder, CreateRoom, CreateUploadChannel, EncryptRoom, FileVersionList, 
-                     GetS3Urls, LogEventList, MissingKeysResponse, Node, NodeItem, Permissions, ProcessRoomPendingUsers, S3Part, 
+                     FileKeyDistributionJob, GetS3Urls, LogEvent, LogEventList, MissingKeysResponse, Node, NodeCache, NodeItem, NodeType, Permissions, ProcessRoomPendingUsers, S3Part, 
                      SetFileKeys, SetFileKeysItem, TransferNode, CommentNode, RestoreNode, UpdateFile, UpdateFiles, 
                      UpdateFolder, UpdateRoom, UpdateRoomGroupItem, UpdateRoomGroups, UpdateRoomHooks, 
                      UpdateRoomUserItem, UpdateRoomUsers)
-from .responses import (Comment, CommentList, CreateFileUploadResponse, DeletedNode, DeletedNodeSummaryList, 
+from .responses import (Comment, CommentList, CreateFileUploadResponse, DeletedNode, DeletedNodeSummary, DeletedNodeSummaryList, 
                        DeletedNodeVersionsList, DownloadTokenGenerateResponse, NodeList, NodeParentList, 
-                       PendingAssignmentList, PresignedUrlList, RoomGroupList, RoomUserList, RoomWebhookList, 
-                       S3FileUploadStatus, S3Status)
+                       PendingAssignmentData, PendingAssignmentList, PresignedUrl, PresignedUrlList, RoomGroup, RoomGroupList, 
+                       RoomUser, RoomUserList, RoomWebhook, RoomWebhookList, S3FileUploadStatus, S3Status)
 
 # constants for uploads 
 CHUNK_SIZE = 33554432
@@ -49,6 +57,36 @@ MIN_CHUNK_SIZE = 5242880
 MAX_CHUNKS = 9999
 POLL_WAIT = 0.1
 FILE_KEY_LIMIT = 50
+# parallel S3 part uploads (1: sequential)
+MAX_PARALLEL_PARTS = 1
+# encrypted chunks buffered by the encryption thread (pipelined upload)
+PIPELINE_QUEUE_SIZE = 2
+# missing file keys: page size and file keys per SetFileKeys request
+FILE_KEY_BATCH_SIZE = 100
+MAX_PARALLEL_FILE_KEY_BATCHES = 4
+# path to node cache (get_node_from_path): max. entries and validity in seconds
+NODE_CACHE_SIZE = 10000
+NODE_CACHE_TTL = 60
+# concurrent folder listings in get_nodes_from_paths
+MAX_PARALLEL_PATH_SEARCHES = 4
+# concurrent page requests in walk_nodes
+MAX_PARALLEL_TREE_REQUESTS = 4
+
+
+def split_node_path(path: str) -> Tuple[str, str, int]:
+    """ parent path, name and depth level of a node path (folders / rooms end with /) """
+    if path[-1] == '/':
+        name = path.split('/')[-2]
+        parent_path = '/'.join(path.split('/')[:-2])
+    else:
+        name = path.split('/')[-1]
+        parent_path = '/'.join(path.split('/')[:-1])
+    
+    return parent_path, name, len(parent_path.split('/'))
+
+def get_node_path(node: Node) -> str:
+    """ path of a node (parent path and name) """
+    return f'{node.parentPath or "/"}{node.name}'
 
 class DRACOONNodes:
 
@@ -57,8 +95,9 @@ class DRACOONNodes:
     Node operations (rooms, files, folders), room webhooks, comments and file transfer (up- and download)
     """
 
-    def __init__(self, dracoon_client: DRACOONClient):
+    def __init__(self, dracoon_client: DRACOONClient, node_cache: NodeCache = None):
         """ requires a DRACOONClient to perform any request """
+        """ node_cache: shared path to node cache (e.g. kept by DRACOON across adapters) – a new cache is created if missing """
         if not isinstance(dracoon_client, DRACOONClient):
             raise InvalidClientError(message='Invalid client')
         
@@ -72,6 +111,10 @@ class DRACOONNodes:
                 self.raise_on_err = True
             else:
                 self.raise_on_err = False
+            
+            if node_cache is None:
+                node_cache = NodeCache(max_size=NODE_CACHE_SIZE, ttl=NODE_CACHE_TTL)
+            self.node_cache = node_cache
 
         else:
             self.logger.error("DRACOON client error: no connection. ")
@@ -95,6 +138,65 @@ class DRACOONNodes:
             if callback_fn: callback_fn(len(data))
             yield data
             
+    async def encrypt_in_chunks(self, file_obj, plain_file_key: PlainFileKey, filesize: int, chunksize: int = CHUNK_SIZE, 
+                                callback_fn: Callback = None, queue_size: int = PIPELINE_QUEUE_SIZE) -> AsyncIterator[bytes]:
+        """ 
+        async iterator to read and encrypt a file object in chunks on a dedicated thread 
+        up to queue_size encrypted chunks are buffered – the event loop never runs the cipher and no executor worker waits for chunks
+        the last chunk includes the final data, the tag is set on the passed plain file key 
+        """
+        loop = asyncio.get_running_loop()
+        chunk_queue = asyncio.Queue()
+        # free buffer slots – taken by the encryption thread, released by the consumer
+        slots = threading.Semaphore(queue_size)
+        stop = threading.Event()
+        
+        def put(item) -> None:
+            if not stop.is_set():
+                loop.call_soon_threadsafe(chunk_queue.put_nowait, item)
+        
+        def wait_for_slot() -> bool:
+            # stop waiting for a free slot once the consumer is gone
+            while not stop.is_set():
+                if slots.acquire(timeout=POLL_WAIT):
+                    return True
+            return False
+        
+        def encrypt() -> None:
+            try:
+                dracoon_cipher = FileEncryptionCipher(plain_file_key=plain_file_key)
+                offset = 0
+                for chunk in self.read_in_chunks(file_obj=file_obj, chunksize=chunksize):
+                    if not wait_for_slot():
+                        return
+                    offset += len(chunk)
+                    enc_chunk = dracoon_cipher.encode_bytes(chunk)
+                    # last chunk needs to include the final data 
+                    if offset >= filesize:
+                        last_chunk, _ = dracoon_cipher.finalize()
+                        enc_chunk += last_chunk
+                    put((enc_chunk, len(chunk)))
+                put(None)
+            except Exception as e:
+                put(e)
+        
+        encryption_thread = threading.Thread(target=encrypt, name='dracoon-encrypt', daemon=True)
+        encryption_thread.start()
+        
+        try:
+            while True:
+                item = await chunk_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                slots.release()
+                enc_chunk, plain_size = item
+                if callback_fn: callback_fn(plain_size)
+                yield enc_chunk
+        finally:
+            stop.set()
+            
     async def byte_stream(self, data: bytes, callback_fn: Callback  = None):  
         """ stream bytes """   
         while True:
@@ -171,19 +273,18 @@ class DRACOONNodes:
         return None
     
     @retry(**RETRY_CONFIG)
-    async def get_node_from_path(self, path: str, filter: str = None, raise_on_err: bool = False) -> Node:
+    async def get_node_from_path(self, path: str, filter: str = None, raise_on_err: bool = False, use_cache: bool = True) -> Node:
         """ get node id from path """
+        """ use_cache: nodes are cached by path (see NODE_CACHE_SIZE, NODE_CACHE_TTL) – not used with filter """
+        use_cache = use_cache and not filter
         
-        # folder / room 
-        if path[-1] == '/':
-            last_node = path.split('/')[-2]
-            parent_path = '/'.join(path.split('/')[:-2])
-            depth = len(path.split('/')[:-1]) - 1
-        # file
-        else:
-            last_node = path.split('/')[-1]
-            parent_path = '/'.join(path.split('/')[:-1])
-            depth = len(path.split('/')[:-1])
+        if use_cache:
+            node = self.node_cache.get(path.rstrip('/'))
+            if node is not None:
+                self.logger.debug("Retrieved node from path (cached).")
+                return node
+        
+        parent_path, last_node, depth = split_node_path(path)
 
         filter_str = f'parentPath:eq:{parent_path}/'
 
@@ -210,13 +311,51 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
 
-        if res.status_code == 200 and len(res.json()["items"]) > 0:
+        nodes = NodeList.model_validate(loads_json(res.content)) if res.status_code == 200 else None
+
+        if nodes and len(nodes.items) > 0:
             self.logger.info("Retrieved node from path.")
-            return Node(**res.json()["items"][0])
+            if use_cache:
+                self.node_cache.set(path.rstrip('/'), nodes.items[0])
+            return nodes.items[0]
         else:
             self.logger.error("Node from path not found.")
             return None
 
+    async def get_nodes_from_paths(self, paths: List[str], raise_on_err: bool = False, use_cache: bool = True, 
+                                   max_parallel_searches: int = MAX_PARALLEL_PATH_SEARCHES) -> Dict[str, Optional[Node]]:
+        """ get nodes for a list of paths – one (paged) search per parent folder instead of one per path (missing nodes: None) """
+        """ all nodes of searched folders are cached (use_cache) """
+        nodes: Dict[str, Optional[Node]] = {}
+        # parent path and depth level: requested names and their paths
+        folders: Dict[Tuple[str, int], Dict[str, List[str]]] = {}
+        
+        for path in paths:
+            node = self.node_cache.get(path.rstrip('/')) if use_cache else None
+            nodes[path] = node
+            if node is None:
+                parent_path, name, depth = split_node_path(path)
+                folders.setdefault((parent_path, depth), {}).setdefault(name, []).append(path)
+        
+        async def search_folder(folder: Tuple[str, int]) -> List[Node]:
+            parent_path, depth = folder
+            return [node async for node in self.iter_search_nodes(search='*', depth_level=depth, filter=f'parentPath:eq:{parent_path}/', 
+                                                                  raise_on_err=raise_on_err, response_mode=ResponseMode.validate)]
+        
+        async for result in bulk_process(items=list(folders), fn=search_folder, max_concurrency=max_parallel_searches):
+            if not result.ok:
+                raise result.error
+            
+            parent_path, _ = result.item
+            names = folders[result.item]
+            for node in result.result:
+                if use_cache:
+                    self.node_cache.set(f'{parent_path}/{node.name}', node)
+                for path in names.get(node.name, []):
+                    nodes[path] = node
+        
+        self.logger.info("Retrieved %s nodes from %s paths.", sum(1 for node in nodes.values() if node), len(nodes))
+        return nodes
 
     @retry(**RETRY_CONFIG)
     async def complete_s3_upload(self, upload_id: str, upload: CompleteS3Upload, raise_on_err: bool = False) -> None:
@@ -482,27 +621,11 @@ class DRACOONNodes:
         missing_keys = await self.get_missing_file_keys(file_id=node.id, limit=FILE_KEY_LIMIT)
 
         if missing_keys.range.total > 0:
-            keys = self.make_set_file_keys(file_key_list=[])
-
-            for key in missing_keys.items:
-                # get file key
-                for file_item in missing_keys.files:
-                    if key.fileId == file_item.id:
-                        file_key = file_item.fileKeyContainer
-                        plain_file_key = decrypt_file_key(file_key=file_key, keypair=plain_keypair)
-
-                # add requests per user 
-                for user in missing_keys.users:
-                    if key.userId == user.id:
-                        public_key = user.publicKeyContainer
-
-                user_file_key = encrypt_file_key_public(plain_file_key=plain_file_key, public_key=public_key)
-
-                file_key_item = self.make_set_file_key_item(file_id=key.fileId, user_id=key.userId, file_key=user_file_key)
-
-                keys.items.append(file_key_item)
-                    
-            await self.set_file_keys(file_keys=keys)
+            keys = self.make_missing_file_keys(missing_keys=missing_keys, plain_keypair=plain_keypair)
+            
+            # all keys skipped (no file or public key)
+            if keys.items:
+                await self.set_file_keys(file_keys=keys)
              
         return node
     
@@ -545,10 +668,16 @@ class DRACOONNodes:
     async def upload_s3_unencrypted(self, file_path: str, upload_channel: CreateFileUploadResponse, keep_shares: bool = False,
                                     file_name: str = None,
                                     resolution_strategy: str = 'autorename', chunksize: int = CHUNK_SIZE, 
-                                    raise_on_err: bool = False, callback_fn: Callback  = None) -> S3FileUploadStatus:
+                                    raise_on_err: bool = False, callback_fn: Callback  = None, 
+                                    max_parallel_parts: int = MAX_PARALLEL_PARTS) -> S3FileUploadStatus:
         if self.raise_on_err:
             raise_on_err = True
 
+        if max_parallel_parts < 1:
+            err = InvalidArgumentError(message='At least one part upload is required (max_parallel_parts).')
+            await self.dracoon.handle_generic_error(err)
+
+
         """ Check if file is file """
 
         file = Path(file_path)
@@ -625,32 +754,20 @@ class DRACOONNodes:
            
         elif part_count > 1:
                
+            self.logger.debug("Parallel part uploads: %s", max_parallel_parts)
+               
             with open(file, 'rb') as f:
                 
-                part_number = 0
-                                         
-                for chunk in self.read_in_chunks(file_obj=f, chunksize=chunksize, callback_fn=callback_fn):
-                                          
-                    upload_url = s3_urls.urls[part_number].url
-
-                    try:        
-                        self.dracoon.uploader.headers["Content-Length"] = str(len(chunk)) 
-                            
-                        res = await self.dracoon.uploader.put(url=upload_url, content=chunk)
-                            
-                        res.raise_for_status()
-                        e_tag = res.headers["ETag"].replace('"', '')
-                        part = S3Part(**{ "partNumber": s3_urls.urls[part_number].partNumber, "partEtag": e_tag })
-                        parts.append(part)
-                    except httpx.RequestError as e:
-                        res = await self.dracoon.http.delete(upload_channel.uploadUrl)
-                        await self.dracoon.handle_connection_error(e)
-                    except httpx.HTTPStatusError as e:
-                        res = await self.dracoon.http.delete(upload_channel.uploadUrl)
-                        self.logger.error("Uploading chunk failed.")
-                        await self.dracoon.handle_http_error(err=e, raise_on_err=True, is_xml=True)
-  
-                    part_number += 1
+                try:
+                    parts = await self.upload_s3_parts(file_obj=f, s3_urls=s3_urls.urls, chunksize=chunksize, 
+                                                       max_parallel_parts=max_parallel_parts, callback_fn=callback_fn)
+                except httpx.RequestError as e:
+                    res = await self.dracoon.http.delete(upload_channel.uploadUrl)
+                    await self.dracoon.handle_connection_error(e)
+                except httpx.HTTPStatusError as e:
+                    res = await self.dracoon.http.delete(upload_channel.uploadUrl)
+                    self.logger.error("Uploading chunk failed.")
+                    await self.dracoon.handle_http_error(err=e, raise_on_err=True, is_xml=True)
                     
         s3_complete = self.make_s3_upload_complete(parts=parts, file_name=file_name, keep_share_links=keep_shares, 
                                                    resolution_strategy=resolution_strategy)
@@ -676,18 +793,312 @@ class DRACOONNodes:
             
         return upload_status
     
+    async def upload_s3_part(self, s3_url: PresignedUrl, chunk: bytes) -> S3Part:
+        """ upload a single part (chunk) to a presigned S3 url and return the part with its ETag """
+        # Content-Length per request: the uploader is shared by all parts in flight
+        res = await self.dracoon.uploader.put(url=s3_url.url, content=chunk, headers={"Content-Length": str(len(chunk))})
+        res.raise_for_status()
+        
+        # remove double quotes from etag
+        e_tag = res.headers["ETag"].replace('"', '')
+        self.logger.debug("Uploaded part %s", s3_url.partNumber)
+        
+        return S3Part(**{ "partNumber": s3_url.partNumber, "partEtag": e_tag })
+    
+    async def upload_s3_parts(self, file_obj, s3_urls: List[PresignedUrl], chunksize: int = CHUNK_SIZE, 
+                              max_parallel_parts: int = MAX_PARALLEL_PARTS, callback_fn: Callback = None, 
+                              chunks: Union[Iterable[bytes], AsyncIterator[bytes]] = None, 
+                              part_callback: Callable[[S3Part], Any] = None) -> List[S3Part]:
+        """ 
+        upload a file object in chunks to given presigned S3 urls 
+        keeps up to max_parallel_parts PUT requests in flight – a chunk is only read once a slot is free,
+        therefore memory is limited to roughly max_parallel_parts * chunksize 
+        returns the parts (ETags) ordered by part number – raises httpx errors of the first failed part 
+        optional: chunks (lazy iterable or async iterator of chunks matching the urls), part_callback (called per uploaded part)
+        """
+        parts = {}
+        pending = set()
+        
+        def collect_parts(done) -> None:
+            # record all uploaded parts (e.g. journal) before raising the first error
+            errors = []
+            for task in done:
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                    continue
+                part: S3Part = task.result()
+                parts[part.partNumber] = part
+                if part_callback: part_callback(part)
+            if errors:
+                raise errors[0]
+        
+        if chunks is None:
+            chunks = self.read_in_chunks(file_obj=file_obj, chunksize=chunksize, callback_fn=callback_fn)
+        
+        async def iter_chunks():
+            if hasattr(chunks, '__aiter__'):
+                async for chunk in chunks:
+                    yield chunk
+            else:
+                for chunk in chunks:
+                    yield chunk
+        
+        url_iter = iter(s3_urls)
+        
+        try:
+            async for chunk in iter_chunks():
+                s3_url = next(url_iter, None)
+                if s3_url is None:
+                    break
+                pending.add(asyncio.create_task(self.upload_s3_part(s3_url=s3_url, chunk=chunk)))
+                
+                # wait for a free slot before reading the next chunk
+                if len(pending) >= max_parallel_parts:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    collect_parts(done)
+            
+            if pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                collect_parts(done)
+        finally:
+            # cancel remaining parts on failure and wait for them to finish
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+                
+        return [parts[part_number] for part_number in sorted(parts)]
+    
+    def read_parts(self, file_obj, s3_urls: List[PresignedUrl], chunksize: int = CHUNK_SIZE, callback_fn: Callback = None):
+        """ iterator to read the chunks of given parts from a file object (offset based on part number) """
+        for s3_url in s3_urls:
+            file_obj.seek((s3_url.partNumber - 1) * chunksize)
+            data = file_obj.read(chunksize)
+            if callback_fn: callback_fn(len(data))
+            yield data
+            
+    def make_upload_journal(self, upload_channel: CreateFileUploadResponse, file_path: str, parent_id: int, file_name: str, 
+                            chunksize: int = CHUNK_SIZE) -> UploadJournal:
+        """ make a new (empty) upload journal required for upload_s3_resumable() """
+        file = Path(file_path)
+        
+        journal = {
+            "uploadId": upload_channel.uploadId,
+            "uploadUrl": upload_channel.uploadUrl,
+            "token": upload_channel.token,
+            "parentId": parent_id,
+            "fileName": file_name,
+            "filePath": str(file.resolve()),
+            "fileSize": file.stat().st_size,
+            "fileModified": file.stat().st_mtime,
+            "chunkSize": chunksize,
+            "parts": []
+        }
+        
+        return UploadJournal(**journal)
+    
+    def load_upload_journal(self, journal_path: str) -> Optional[UploadJournal]:
+        """ load an upload journal from disk (None if missing or invalid) """
+        journal_file = Path(journal_path)
+        
+        if not journal_file.is_file():
+            return None
+        
+        try:
+            return UploadJournal(**json.loads(journal_file.read_text(encoding='utf-8')))
+        except ValueError:
+            self.logger.warning("Invalid upload journal: %s", journal_path)
+            return None
+        
+    def save_upload_journal(self, journal: UploadJournal, journal_path: str) -> None:
+        """ save an upload journal to disk (replaces the previous journal atomically) """
+        tmp_path = f'{journal_path}.tmp'
+        
+        with open(tmp_path, 'w', encoding='utf-8') as journal_file:
+            journal_file.write(journal.model_dump_json())
+            
+        os.replace(tmp_path, journal_path)
+        
+    def is_journal_valid(self, journal: UploadJournal, file_path: str, parent_id: int, file_name: str, chunksize: int = CHUNK_SIZE) -> bool:
+        """ check if an upload journal belongs to given (unchanged) file, target (parent id and file name) and chunk size """
+        file = Path(file_path)
+        
+        return (journal.parentId == parent_id and journal.fileName == file_name 
+                and journal.filePath == str(file.resolve()) and journal.fileSize == file.stat().st_size 
+                and journal.fileModified == file.stat().st_mtime and journal.chunkSize == chunksize)
+        
+    async def check_upload_journal(self, journal_path: str, file_path: str, parent_id: int, file_name: str, 
+                                   chunksize: int = CHUNK_SIZE) -> Optional[UploadJournal]:
+        """ 
+        check if an upload can be resumed from a journal: file and target unchanged, upload channel still open (check_s3_upload()) 
+        returns the journal – a stale journal is removed and None is returned 
+        """
+        journal = self.load_upload_journal(journal_path=journal_path)
+        
+        if journal is None:
+            return None
+        
+        upload_status = None
+        
+        if self.is_journal_valid(journal=journal, file_path=file_path, parent_id=parent_id, file_name=file_name, chunksize=chunksize):
+            try:
+                upload_status = await self.check_s3_upload(upload_id=journal.uploadId, raise_on_err=True)
+            except DRACOONHttpError:
+                self.logger.debug("Upload channel not found: %s", journal.uploadId)
+                
+        if upload_status is None or upload_status.status != S3Status.transfer.value:
+            self.logger.info("Upload journal cannot be resumed.")
+            Path(journal_path).unlink(missing_ok=True)
+            return None
+        
+        self.logger.info("Upload journal can be resumed.")
+        self.logger.debug("Uploaded parts: %s", len(journal.parts))
+        return journal
+    
+    async def get_s3_urls_for_parts(self, upload_id: str, part_numbers: List[int], filesize: int, 
+                                    chunksize: int = CHUNK_SIZE, raise_on_err: bool = False) -> List[PresignedUrl]:
+        """ get presigned S3 urls for given part numbers only (one request per range of consecutive parts) """
+        s3_urls = []
+        part_count = max(math.ceil(filesize / chunksize), 1)
+        
+        # group consecutive parts of equal size into ranges (last part is smaller)
+        ranges = []
+        for part_number in sorted(part_numbers):
+            size = min(chunksize, filesize - (part_number - 1) * chunksize)
+            if ranges and ranges[-1][1] == part_number - 1 and ranges[-1][2] == size and part_number != part_count:
+                ranges[-1][1] = part_number
+            else:
+                ranges.append([part_number, part_number, size])
+                
+        for first_part, last_part, size in ranges:
+            s3_upload = self.make_get_s3_urls(first_part=first_part, last_part=last_part, chunk_size=size)
+            s3_url_list = await self.get_s3_urls(upload_id=upload_id, upload=s3_upload, raise_on_err=raise_on_err)
+            s3_urls.extend(s3_url_list.urls)
+            
+        return s3_urls
+    
+    @retry(**RETRY_CONFIG)
+    async def upload_s3_resumable(self, file_path: str, upload_channel: CreateFileUploadResponse, journal_path: str, 
+                                  keep_shares: bool = False, file_name: str = None, resolution_strategy: str = 'autorename', 
+                                  chunksize: int = CHUNK_SIZE, raise_on_err: bool = False, callback_fn: Callback = None, 
+                                  max_parallel_parts: int = MAX_PARALLEL_PARTS, parent_id: int = None) -> S3FileUploadStatus:
+        """ 
+        S3 direct upload (unencrypted) with progress saved to a journal (upload id, target, parts, ETags and offsets) 
+        if the journal belongs to the upload channel, only missing parts are uploaded 
+        on failure the upload channel is kept – use check_upload_journal() to resume after a restart 
+        """
+        if self.raise_on_err:
+            raise_on_err = True
+            
+        if max_parallel_parts < 1:
+            err = InvalidArgumentError(message='At least one part upload is required (max_parallel_parts).')
+            await self.dracoon.handle_generic_error(err)
+            
+        file = Path(file_path)
+        
+        if not file.is_file():
+            err = InvalidFileError(message=f'A file needs to be provided. {file_path} is not a file.')
+            await self.dracoon.handle_generic_error(err)
+            
+        filesize = file.stat().st_size
+        if file_name is None: 
+            file_name = file.name
+            
+        journal = self.load_upload_journal(journal_path=journal_path)
+        
+        if (journal is None or journal.uploadId != upload_channel.uploadId 
+            or not self.is_journal_valid(journal=journal, file_path=file_path, parent_id=parent_id, file_name=file_name, chunksize=chunksize)):
+            journal = self.make_upload_journal(upload_channel=upload_channel, file_path=file_path, parent_id=parent_id, file_name=file_name, 
+                                               chunksize=chunksize)
+            self.save_upload_journal(journal=journal, journal_path=journal_path)
+            
+        part_count = max(math.ceil(filesize / chunksize), 1)
+        
+        if part_count > MAX_CHUNKS:
+            err = InvalidArgumentError(message=f'Maximum count of chunks ({MAX_CHUNKS}) exceeded.')
+            await self.dracoon.handle_generic_error(err)
+            
+        uploaded_parts = { part.partNumber for part in journal.parts }
+        missing_parts = [part_number for part_number in range(1, part_count + 1) if part_number not in uploaded_parts]
+        
+        # init callback size and report uploaded parts
+        if callback_fn: 
+            callback_fn(0, filesize)
+            callback_fn(sum(part.size for part in journal.parts))
+            
+        self.logger.debug("File name: %s", file_name)
+        self.logger.debug("File size: %s", filesize)
+        self.logger.debug("Parts: %s (missing: %s)", part_count, len(missing_parts))
+        
+        def save_part(part: S3Part) -> None:
+            offset = (part.partNumber - 1) * chunksize
+            journal_part = UploadJournalPart(partNumber=part.partNumber, partEtag=part.partEtag, offset=offset, size=min(chunksize, filesize - offset))
+            journal.parts.append(journal_part)
+            self.save_upload_journal(journal=journal, journal_path=journal_path)
+        
+        if missing_parts:
+            s3_urls = await self.get_s3_urls_for_parts(upload_id=upload_channel.uploadId, part_numbers=missing_parts, filesize=filesize, 
+                                                       chunksize=chunksize, raise_on_err=raise_on_err)
+            
+            with open(file, 'rb') as f:
+                
+                chunks = self.read_parts(file_obj=f, s3_urls=s3_urls, chunksize=chunksize, callback_fn=callback_fn)
+                
+                # upload channel is not removed on failure (resume)
+                try:
+                    await self.upload_s3_parts(file_obj=f, s3_urls=s3_urls, chunksize=chunksize, max_parallel_parts=max_parallel_parts, 
+                                               chunks=chunks, part_callback=save_part)
+                except httpx.RequestError as e:
+                    await self.dracoon.handle_connection_error(e)
+                except httpx.HTTPStatusError as e:
+                    self.logger.error("Uploading chunk failed.")
+                    await self.dracoon.handle_http_error(err=e, raise_on_err=True, is_xml=True)
+                    
+        parts = [S3Part(partNumber=part.partNumber, partEtag=part.partEtag) for part in sorted(journal.parts, key=lambda part: part.partNumber)]
+        
+        s3_complete = self.make_s3_upload_complete(parts=parts, file_name=file_name, keep_share_links=keep_shares, 
+                                                   resolution_strategy=resolution_strategy)
+        
+        upload = await self.complete_s3_upload(upload_id=upload_channel.uploadId, upload=s3_complete, raise_on_err=raise_on_err)
+        
+        # upload channel is finalized – journal can no longer be resumed
+        Path(journal_path).unlink(missing_ok=True)
+        
+        # handle resolutionStrategy fail and raise_on_err True with conflict  (409)
+        if upload is not None:         
+            return 
+        
+        time  = POLL_WAIT
+        
+        while True:
+            upload_status = await self.check_s3_upload(upload_id=upload_channel.uploadId, raise_on_err=raise_on_err)
+            if upload_status.status == S3Status.done.value:
+                break
+            if upload_status.status == S3Status.error.value:
+                break
+            # wait until next request
+            await asyncio.sleep(time)
+            # increase wait 
+            time *= 2
+            
+        return upload_status
+    
     @retry(**RETRY_CONFIG)
     async def upload_s3_encrypted(self, file_path: str, upload_channel: CreateFileUploadResponse, plain_keypair: PlainUserKeyPairContainer, 
                                   file_name: str = None,
                                   keep_shares: bool = False, resolution_strategy: str = 'autorename', 
                                   chunksize: int = CHUNK_SIZE, raise_on_err: bool = False,
-                                  callback_fn: Callback  = None
-                                  ) -> S3FileUploadStatus:
+                                  callback_fn: Callback  = None, pipelined: bool = False,
+                                  max_parallel_parts: int = MAX_PARALLEL_PARTS) -> S3FileUploadStatus:
         
         """ Upload a file into an encrypted container via S3 direct upload """
+        """ pipelined: encrypt on a dedicated thread – next chunks are encrypted while up to max_parallel_parts parts are uploaded """
         
         if self.raise_on_err:
             raise_on_err = True
+            
+        if max_parallel_parts < 1:
+            err = InvalidArgumentError(message='At least one part upload is required (max_parallel_parts).')
+            await self.dracoon.handle_generic_error(err)
 
         file = Path(file_path)
         
@@ -746,7 +1157,10 @@ class DRACOONNodes:
             
             with open(file, 'rb') as f:
                 
-                enc_bytes, plain_file_key = encrypt_bytes(plain_data=f.read(), plain_file_key=plain_file_key)
+                if pipelined:
+                    enc_bytes, plain_file_key = await asyncio.to_thread(encrypt_bytes, plain_data=f.read(), plain_file_key=plain_file_key)
+                else:
+                    enc_bytes, plain_file_key = encrypt_bytes(plain_data=f.read(), plain_file_key=plain_file_key)
                          
                 try:
 
@@ -767,6 +1181,27 @@ class DRACOONNodes:
                     res = await self.dracoon.http.delete(upload_channel.uploadUrl)
                     await self.dracoon.handle_http_error(err=e, raise_on_err=True, is_xml=True)
 
+        # multipart upload (pipelined: encryption thread)
+        elif part_count > 1 and pipelined:
+            
+            with open(file, 'rb') as f:
+                
+                enc_chunks = self.encrypt_in_chunks(file_obj=f, plain_file_key=plain_file_key, filesize=filesize, 
+                                                    chunksize=chunksize, callback_fn=callback_fn)
+                
+                try:
+                    parts = await self.upload_s3_parts(file_obj=f, s3_urls=s3_urls.urls, chunksize=chunksize, 
+                                                       max_parallel_parts=max_parallel_parts, chunks=enc_chunks)
+                except httpx.RequestError as e:
+                    res = await self.dracoon.http.delete(upload_channel.uploadUrl)
+                    await self.dracoon.handle_connection_error(e)
+                except httpx.HTTPStatusError as e:
+                    res = await self.dracoon.http.delete(upload_channel.uploadUrl)
+                    self.logger.error("Uploading chunk failed.")
+                    await self.dracoon.handle_http_error(err=e, raise_on_err=True, is_xml=True)
+                finally:
+                    await enc_chunks.aclose()
+        
         # multipart upload
         elif part_count > 1:
                
@@ -835,27 +1270,11 @@ class DRACOONNodes:
                 if missing_keys.range.total == 0:
                     break
 
-                keys = self.make_set_file_keys(file_key_list=[])
-
-                for key in missing_keys.items:
-                    # get file key
-                    for file_item in missing_keys.files:
-                        if key.fileId == file_item.id:
-                            file_key = file_item.fileKeyContainer
-                            plain_file_key = decrypt_file_key(file_key=file_key, keypair=plain_keypair)
-
-                    # add requests per user 
-                    for user in missing_keys.users:
-                        if key.userId == user.id:
-                            public_key = user.publicKeyContainer
-
-                    user_file_key = encrypt_file_key_public(plain_file_key=plain_file_key, public_key=public_key)
-
-                    file_key_item = self.make_set_file_key_item(file_id=key.fileId, user_id=key.userId, file_key=user_file_key)
-
-                    keys.items.append(file_key_item)
+                keys = self.make_missing_file_keys(missing_keys=missing_keys, plain_keypair=plain_keypair)
                 
-                await self.set_file_keys(file_keys=keys)
+                # all keys skipped (no file or public key)
+                if keys.items:
+                    await self.set_file_keys(file_keys=keys)
 
                 break
             if upload_status.status == S3Status.error.value:
@@ -890,7 +1309,7 @@ class DRACOONNodes:
 
     @retry(**RETRY_CONFIG)
     async def get_nodes(self, room_manager: bool = False, parent_id: int = 0, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
-                        raise_on_err: bool = False) -> NodeList:
+                        raise_on_err: bool = False, response_mode: ResponseMode = None) -> NodeList:
         """ list (all) visible nodes """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -919,7 +1338,71 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved nodes.")
-        return NodeList(**res.json())
+        return self.dracoon.parse_response(res=res, model=NodeList, response_mode=response_mode)
+
+    async def iter_nodes(self, room_manager: bool = False, parent_id: int = 0, offset: int = 0, filter: str = None, 
+                         limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                         max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                         response_mode: ResponseMode = None) -> AsyncIterator[Node]:
+        """ iterate (all) items of get_nodes() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_nodes, offset=offset, room_manager=room_manager, parent_id=parent_id, 
+                                     filter=filter, limit=limit, sort=sort, raise_on_err=raise_on_err, 
+                                     response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
+
+    async def walk_nodes(self, parent_id: int = 0, node_types: List[NodeType] = None, max_depth: int = None, room_manager: bool = False, 
+                         max_parallel_requests: int = MAX_PARALLEL_TREE_REQUESTS, raise_on_err: bool = False) -> AsyncIterator[Node]:
+        """ 
+        walk a subtree (breadth-first) and yield nodes as pages are received – rooms and folders are listed concurrently (pages of get_nodes) 
+        node_types: only yield given types (files are not requested if not included), max_depth: levels below parent (1: children only, 0: none) 
+        only pending room / folder ids are kept, no nodes of walked levels 
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        
+        containers = (NodeType.room, NodeType.folder)
+        filter = 'type:eq:room:folder' if node_types and NodeType.file not in node_types else None
+        
+        # pages to request: parent id, depth of its children, offset
+        pending = deque([(parent_id, 1, 0)])
+        tasks = {}
+        
+        try:
+            while pending or tasks:
+                while pending and len(tasks) < max_parallel_requests:
+                    node_id, depth, offset = pending.popleft()
+                    task = asyncio.ensure_future(self.get_nodes(parent_id=node_id, offset=offset, filter=filter, room_manager=room_manager, 
+                                                                raise_on_err=raise_on_err, response_mode=ResponseMode.validate))
+                    tasks[task] = (node_id, depth, offset)
+                
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # retrieve all errors of the done pages to raise the first one
+                errors = [task.exception() for task in done if task.exception() is not None]
+                if errors:
+                    for task in done:
+                        tasks.pop(task)
+                    raise errors[0]
+                
+                for task in done:
+                    node_id, depth, offset = tasks.pop(task)
+                    page = task.result()
+                    
+                    # remaining pages of a folder before the next folder
+                    offset += len(page.items)
+                    if page.items and offset < page.range.total:
+                        pending.appendleft((node_id, depth, offset))
+                    
+                    for node in page.items:
+                        if node.type in containers and (max_depth is None or depth < max_depth):
+                            pending.append((node.id, depth + 1, 0))
+                        if not node_types or node.type in node_types:
+                            yield node
+        finally:
+            # cancel remaining pages and wait for them to finish
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
     
 
     @retry(**RETRY_CONFIG) 
@@ -945,6 +1428,7 @@ class DRACOONNodes:
             self.logger.error("Deleting nodes failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
+        self.node_cache.invalidate_nodes(node_list)
         self.logger.info("Deleted node(s).")
         return None
 
@@ -993,11 +1477,12 @@ class DRACOONNodes:
             self.logger.error("Deleting node failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
+        self.node_cache.invalidate_nodes([node_id])
         self.logger.info("Deleted node.")
         return None
 
     @retry(**RETRY_CONFIG)
-    async def get_node_comments(self, node_id: int, offset: int = 0, raise_on_err: bool = False) -> CommentList:
+    async def get_node_comments(self, node_id: int, offset: int = 0, raise_on_err: bool = False, response_mode: ResponseMode = None) -> CommentList:
         """ get comments for specific node (by id) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -1019,7 +1504,13 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved node comments.")
-        return CommentList(**res.json())
+        return self.dracoon.parse_response(res=res, model=CommentList, response_mode=response_mode)
+
+    async def iter_node_comments(self, node_id: int, offset: int = 0, raise_on_err: bool = False, 
+                                 response_mode: ResponseMode = None) -> AsyncIterator[Comment]:
+        """ iterate (all) items of get_node_comments() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_node_comments, offset=offset, node_id=node_id, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def add_node_comment(self, node_id: int, comment: CommentNode, raise_on_err: bool = False) -> Comment:
@@ -1105,7 +1596,8 @@ class DRACOONNodes:
         return NodeItem(**node_item)
 
     @retry(**RETRY_CONFIG)
-    async def get_deleted_nodes(self, parent_id: int = 0, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> DeletedNodeSummaryList:
+    async def get_deleted_nodes(self, parent_id: int = 0, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                                response_mode: ResponseMode = None) -> DeletedNodeSummaryList:
         """ list (all) deleted nodes """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -1136,7 +1628,15 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved deleted nodes.")
-        return DeletedNodeSummaryList(**res.json())
+        return self.dracoon.parse_response(res=res, model=DeletedNodeSummaryList, response_mode=response_mode)
+
+    async def iter_deleted_nodes(self, parent_id: int = 0, offset: int = 0, filter: str = None, limit: int = None, 
+                                 sort: str = None, raise_on_err: bool = False, 
+                                 response_mode: ResponseMode = None) -> AsyncIterator[DeletedNodeSummary]:
+        """ iterate (all) items of get_deleted_nodes() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_deleted_nodes, offset=offset, parent_id=parent_id, filter=filter, limit=limit, 
+                                     sort=sort, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
@@ -1164,7 +1664,8 @@ class DRACOONNodes:
         return None
 
     @retry(**RETRY_CONFIG)
-    async def get_node_versions(self, parent_id: int, name: str, type: str, offset: int = 0, raise_on_err: bool = False) -> DeletedNodeVersionsList:
+    async def get_node_versions(self, parent_id: int, name: str, type: str, offset: int = 0, raise_on_err: bool = False, 
+                                response_mode: ResponseMode = None) -> DeletedNodeVersionsList:
         """ get (all) versions of a node (by id) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -1187,7 +1688,14 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved node versions.")
-        return DeletedNodeVersionsList(**res.json())
+        return self.dracoon.parse_response(res=res, model=DeletedNodeVersionsList, response_mode=response_mode)
+
+    async def iter_node_versions(self, parent_id: int, name: str, type: str, offset: int = 0, raise_on_err: bool = False, 
+                                 response_mode: ResponseMode = None) -> AsyncIterator[DeletedNode]:
+        """ iterate (all) items of get_node_versions() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_node_versions, offset=offset, parent_id=parent_id, name=name, type=type, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
@@ -1258,6 +1766,7 @@ class DRACOONNodes:
             self.logger.error("Moving nodes failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
             self.logger.info("Moved node(s).")
+        self.node_cache.invalidate_nodes([item.id for item in move_node.items])
         return Node(**res.json())
 
 
@@ -1398,6 +1907,7 @@ class DRACOONNodes:
             self.logger.error("Updating file failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
+        self.node_cache.invalidate_nodes([file_id])
         self.logger.info("Updated file.")
         return Node(**res.json())
 
@@ -1423,6 +1933,7 @@ class DRACOONNodes:
         except httpx.HTTPStatusError as e:
             self.logger.error("Updating files failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
+        self.node_cache.invalidate_nodes(files_update.objectIds)
         self.logger.info("Updated file(s).")
         return None
     
@@ -1543,7 +2054,165 @@ class DRACOONNodes:
             "userId": user_id, 
             "fileKey": file_key
         })
+
+    def make_missing_file_keys(self, missing_keys: MissingKeysResponse, plain_keypair: PlainUserKeyPairContainer, 
+                               plain_file_keys: Dict[int, PlainFileKey] = None) -> SetFileKeys:
+        """ 
+        make payload for set_file_keys() from missing file keys (get_missing_file_keys()) 
+        users and files are indexed by id, each file key is decrypted once (plain_file_keys: cache by file id, e.g. across pages) 
+        items without file or public key are skipped – payload has no items if all were skipped 
+        """
+        if plain_file_keys is None:
+            plain_file_keys = {}
+        
+        file_keys = { file_item.id: file_item.fileKeyContainer for file_item in missing_keys.files }
+        public_keys = { user.id: user.publicKeyContainer for user in missing_keys.users }
+        
+        keys = self.make_set_file_keys(file_key_list=[])
+        
+        for key in missing_keys.items:
+            if key.fileId not in plain_file_keys:
+                if key.fileId not in file_keys:
+                    self.logger.warning("Missing file key for file %s.", key.fileId)
+                    continue
+                plain_file_keys[key.fileId] = decrypt_file_key(file_key=file_keys[key.fileId], keypair=plain_keypair)
+            
+            if key.userId not in public_keys:
+                self.logger.warning("Missing public key for user %s.", key.userId)
+                continue
+            
+            # deserialized public keys are cached (per PEM) in crypto
+            user_file_key = encrypt_file_key_public(plain_file_key=plain_file_keys[key.fileId], public_key=public_keys[key.userId])
+            
+            keys.items.append(self.make_set_file_key_item(file_id=key.fileId, user_id=key.userId, file_key=user_file_key))
+        
+        return keys
     
+    async def distribute_missing_file_keys(self, plain_keypair: PlainUserKeyPairContainer, room_id: int = None, user_id: int = None, 
+                                           file_id: int = None, batch_size: int = FILE_KEY_BATCH_SIZE, 
+                                           max_parallel_batches: int = MAX_PARALLEL_FILE_KEY_BATCHES, executor: Executor = None, 
+                                           callback_fn: Callable[[FileKeyDistributionJob], Any] = None, 
+                                           raise_on_err: bool = False) -> FileKeyDistributionJob:
+        """ 
+        distribute (all) missing file keys, e.g. for a room (room_id) or a user (user_id) 
+        missing keys are paged first, each file key is decrypted once and encrypted for every user in an executor 
+        (default: ProcessPoolExecutor started with spawn – RSA is CPU bound), file keys are set in batches (max_parallel_batches in flight) 
+        failed batches (encryption or request) are counted as failed – raised with raise_on_err 
+        callback_fn receives the job after every batch (progress, throughput) 
+        """
+        if self.raise_on_err:
+            raise_on_err = True
+        
+        if batch_size < 1 or max_parallel_batches < 1:
+            err = InvalidArgumentError(message='Batch size and parallel batches must be at least 1.')
+            await self.dracoon.handle_generic_error(err=err)
+        
+        # page through missing keys first – setting keys changes the list (and offsets)
+        items = {}
+        file_keys: Dict[int, FileKey] = {}
+        public_keys: Dict[int, PublicKeyContainer] = {}
+        offset = 0
+        
+        while True:
+            missing_keys = await self.get_missing_file_keys(file_id=file_id, room_id=room_id, user_id=user_id, offset=offset, 
+                                                            limit=batch_size, raise_on_err=raise_on_err)
+            for key in missing_keys.items:
+                items[(key.fileId, key.userId)] = key
+            file_keys.update({ file_item.id: file_item.fileKeyContainer for file_item in missing_keys.files })
+            public_keys.update({ user.id: user.publicKeyContainer for user in missing_keys.users })
+            
+            offset += len(missing_keys.items)
+            if not missing_keys.items or offset >= missing_keys.range.total:
+                break
+        
+        job = FileKeyDistributionJob(total=len(items))
+        
+        pending_keys = [(file_id, user_id) for file_id, user_id in items if file_id in file_keys and user_id in public_keys]
+        job.skipped = job.total - len(pending_keys)
+        if job.skipped:
+            self.logger.warning("Skipping %s missing file key(s) without file or public key.", job.skipped)
+        
+        self.logger.info("Distributing %s missing file key(s).", len(pending_keys))
+        
+        if not pending_keys:
+            if callback_fn: callback_fn(job)
+            return job
+        
+        loop = asyncio.get_running_loop()
+        shutdown_executor = executor is None
+        if shutdown_executor:
+            # forking a process running an event loop (and threads) is unsafe
+            executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        
+        tasks = set()
+        
+        try:
+            # decrypt each file key once
+            file_ids = sorted({ file_id for file_id, _ in pending_keys })
+            file_id_batches = [file_ids[i:i + batch_size] for i in range(0, len(file_ids), batch_size)]
+            plain_file_key_batches = await asyncio.gather(*(loop.run_in_executor(executor, decrypt_file_keys, 
+                                                                                 [file_keys[file_id] for file_id in batch], plain_keypair) 
+                                                            for batch in file_id_batches), return_exceptions=True)
+            plain_file_keys: Dict[int, PlainFileKey] = {}
+            decrypt_error = None
+            for batch, plain_batch in zip(file_id_batches, plain_file_key_batches):
+                if isinstance(plain_batch, BaseException):
+                    self.logger.error("Decrypting %s file key(s) failed: %s", len(batch), plain_batch)
+                    decrypt_error = decrypt_error or plain_batch
+                    continue
+                plain_file_keys.update(zip(batch, plain_batch))
+            
+            self.logger.debug("Decrypted %s file key(s).", len(plain_file_keys))
+            
+            # keys of files in failed batches cannot be distributed
+            if decrypt_error:
+                job.failed = sum(1 for file_id, _ in pending_keys if file_id not in plain_file_keys)
+                pending_keys = [(file_id, user_id) for file_id, user_id in pending_keys if file_id in plain_file_keys]
+                if callback_fn: callback_fn(job)
+                if raise_on_err:
+                    raise decrypt_error
+            
+            # bounds batches in flight (encryption and request)
+            requests = asyncio.Semaphore(max_parallel_batches)
+            
+            async def distribute_batch(batch):
+                async with requests:
+                    try:
+                        user_file_keys = await loop.run_in_executor(executor, encrypt_file_keys_public, 
+                                                                    [(plain_file_keys[file_id], public_keys[user_id]) for file_id, user_id in batch])
+                        keys = self.make_set_file_keys(file_key_list=[self.make_set_file_key_item(file_id=file_id, user_id=user_id, file_key=user_file_key) 
+                                                                      for (file_id, user_id), user_file_key in zip(batch, user_file_keys)])
+                        await self.set_file_keys(file_keys=keys, raise_on_err=True)
+                    except Exception as e:
+                        # e.g. invalid public key, HTTP or connection error – other batches continue
+                        job.failed += len(batch)
+                        self.logger.error("Distributing %s file key(s) failed: %s", len(batch), e)
+                        if raise_on_err:
+                            raise
+                    else:
+                        job.distributed += len(batch)
+                
+                self.logger.debug("Distributed %s of %s file key(s) (%.1f keys/s).", job.distributed, job.total, job.keys_per_second)
+                if callback_fn: callback_fn(job)
+            
+            tasks = { asyncio.ensure_future(distribute_batch(pending_keys[i:i + batch_size])) 
+                     for i in range(0, len(pending_keys), batch_size) }
+            if tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                # only raised with raise_on_err – all exceptions are retrieved
+                errors = [task.exception() for task in done if task.exception()]
+                if errors:
+                    raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if shutdown_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.logger.info("Distributed %s file key(s) (failed: %s, skipped: %s).", job.distributed, job.failed, job.skipped)
+        return job
+
     @retry(**RETRY_CONFIG)
     async def get_file_versions(self, reference_id: int, raise_on_err: bool = False):
         """ get all file versions (including deleted nodes) for given reference id """
@@ -1640,6 +2309,7 @@ class DRACOONNodes:
             self.logger.error("Updating folder failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
+        self.node_cache.invalidate_nodes([node_id])
         self.logger.info("Updated folder.")
         return Node(**res.json())
 
@@ -1727,6 +2397,7 @@ class DRACOONNodes:
             self.logger.error("Updating room failed.")
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
+        self.node_cache.invalidate_nodes([node_id])
         self.logger.info("Updated room.")
         return Node(**res.json())
 
@@ -1881,7 +2552,8 @@ class DRACOONNodes:
         return Node(**res.json())
 
     @retry(**RETRY_CONFIG)
-    async def get_room_groups(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False) -> RoomGroupList:
+    async def get_room_groups(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                              response_mode: ResponseMode = None) -> RoomGroupList:
         """ list (all) groups assigned to a room """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -1911,7 +2583,14 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved room groups.")
-        return RoomGroupList(**res.json())
+        return self.dracoon.parse_response(res=res, model=RoomGroupList, response_mode=response_mode)
+
+    async def iter_room_groups(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, 
+                               raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[RoomGroup]:
+        """ iterate (all) items of get_room_groups() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_room_groups, offset=offset, room_id=room_id, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
@@ -1968,7 +2647,8 @@ class DRACOONNodes:
         return None
 
     @retry(**RETRY_CONFIG)
-    async def get_room_users(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False) -> RoomUserList:
+    async def get_room_users(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                             response_mode: ResponseMode = None) -> RoomUserList:
         """ get (all) users assigned to a room """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -1998,7 +2678,14 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
         self.logger.info("Retrieved room users.")
-        return RoomUserList(**res.json())
+        return self.dracoon.parse_response(res=res, model=RoomUserList, response_mode=response_mode)
+
+    async def iter_room_users(self, room_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, 
+                              raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[RoomUser]:
+        """ iterate (all) items of get_room_users() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_room_users, offset=offset, room_id=room_id, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def update_room_users(self, room_id: int, users_update: UpdateRoomUsers, raise_on_err: bool = False) -> None:
@@ -2057,7 +2744,8 @@ class DRACOONNodes:
         return None
 
     @retry(**RETRY_CONFIG)
-    async def get_room_webhooks(self, node_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False) -> RoomWebhookList:
+    async def get_room_webhooks(self, node_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                                response_mode: ResponseMode = None) -> RoomWebhookList:
         """" list (all) room webhooks """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -2088,7 +2776,14 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
         self.logger.info("Retrieved room webhooks.")
-        return RoomWebhookList(**res.json())
+        return self.dracoon.parse_response(res=res, model=RoomWebhookList, response_mode=response_mode)
+
+    async def iter_room_webhooks(self, node_id: int, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, 
+                                 raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[RoomWebhook]:
+        """ iterate (all) items of get_room_webhooks() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_room_webhooks, offset=offset, node_id=node_id, filter=filter, limit=limit, 
+                                     sort=sort, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def update_room_webhooks(self, node_id: int, hook_update: UpdateRoomHooks, raise_on_err: bool = False) -> RoomWebhookList:
@@ -2118,7 +2813,8 @@ class DRACOONNodes:
     
     @retry(**RETRY_CONFIG)
     async def get_room_events(self, room_id: int, offset: int = 0, filter: str = None, limit: int = None, 
-                        sort: str = None, date_start: str = None, date_end: str = None, operation_id: int = None, user_id: int = None, raise_on_err = False) -> LogEventList:
+                        sort: str = None, date_start: str = None, date_end: str = None, operation_id: int = None, user_id: int = None, raise_on_err = False, 
+                              response_mode: ResponseMode = None) -> LogEventList:
         """ get pending room assignments (new group members not accepted) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -2149,11 +2845,21 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved room events.")
-        return LogEventList(**res.json())
+        return self.dracoon.parse_response(res=res, model=LogEventList, response_mode=response_mode)
+
+    async def iter_room_events(self, room_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                               date_start: str = None, date_end: str = None, operation_id: int = None, user_id: int = None, 
+                               raise_on_err=False, response_mode: ResponseMode = None) -> AsyncIterator[LogEvent]:
+        """ iterate (all) items of get_room_events() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_room_events, offset=offset, room_id=room_id, filter=filter, limit=limit, sort=sort, 
+                                     date_start=date_start, date_end=date_end, operation_id=operation_id, user_id=user_id, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     
     @retry(**RETRY_CONFIG)
-    async def get_pending_assignments(self, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False) -> PendingAssignmentList:
+    async def get_pending_assignments(self, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                                      response_mode: ResponseMode = None) -> PendingAssignmentList:
         """ get pending room assignments (new group members not accepted) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -2183,7 +2889,14 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved pending assignments.")
-        return PendingAssignmentList(**res.json())
+        return self.dracoon.parse_response(res=res, model=PendingAssignmentList, response_mode=response_mode)
+
+    async def iter_pending_assignments(self, offset: int = 0, filter: str = None, limit: str = None, sort: str = None, 
+                                       raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[PendingAssignmentData]:
+        """ iterate (all) items of get_pending_assignments() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_pending_assignments, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
@@ -2214,7 +2927,8 @@ class DRACOONNodes:
 
     @retry(**RETRY_CONFIG)
     async def search_nodes(self, search: str, parent_id: int = 0, depth_level: int = 0, offset: int = 0, 
-                           filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False) -> NodeList:
+                           filter: str = None, limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                           response_mode: ResponseMode = None) -> NodeList:
         """ search for specific nodes """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -2245,4 +2959,12 @@ class DRACOONNodes:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
 
         self.logger.info("Retrieved node(s) from search.")
-        return NodeList(**res.json())
\ No newline at end of file
+        return self.dracoon.parse_response(res=res, model=NodeList, response_mode=response_mode)
+
+    async def iter_search_nodes(self, search: str, parent_id: int = 0, depth_level: int = 0, offset: int = 0, filter: str = None, 
+                                limit: str = None, sort: str = None, raise_on_err: bool = False, 
+                                response_mode: ResponseMode = None) -> AsyncIterator[Node]:
+        """ iterate (all) items of search_nodes() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.search_nodes, offset=offset, search=search, parent_id=parent_id, 
+                                     depth_level=depth_level, filter=filter, limit=limit, sort=sort, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
\ No newline at end of file
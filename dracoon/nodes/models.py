@@ -1,8 +1,11 @@
 
+import bisect
+import time
+from collections import OrderedDict
 from enum import Enum
 from typing_extensions import Protocol
 from pydantic import BaseModel
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 
@@ -331,30 +334,103 @@ class TransferJob:
             return 0
 
 
+class FileKeyDistributionJob:
+    """ object representing a distribution of missing file keys (see DRACOONNodes.distribute_missing_file_keys()) """
+    
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.distributed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started_at = time.monotonic()
+    
+    @property
+    def progress(self) -> float:
+        if self.total > 0:
+            return (self.distributed + self.failed + self.skipped) / self.total
+        else:
+            return 0
+    
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+    
+    @property
+    def keys_per_second(self) -> float:
+        """ throughput of distributed file keys """
+        elapsed = self.elapsed
+        if elapsed > 0:
+            return self.distributed / elapsed
+        else:
+            return 0
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+class NodeCache:
+    """ path to node cache (see DRACOONNodes.get_node_from_path()) """
+    """ bounded by max_size (least recently used entries are removed) and ttl (seconds) """
+    """ indexed by node id and sorted path – invalidation does not scan all entries """
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, Tuple[float, Node]] = OrderedDict()
+        self.paths: Dict[int, Set[str]] = {}
+        self.sorted_paths: List[str] = []
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, path: str) -> Optional[Node]:
+        entry = self.entries.get(path)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                self.remove(path)
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(path)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, path: str, node: Node) -> None:
+        if path in self.entries:
+            self.remove(path)
+        self.entries[path] = (time.monotonic(), node)
+        self.paths.setdefault(node.id, set()).add(path)
+        bisect.insort(self.sorted_paths, path)
+        while len(self.entries) > self.max_size:
+            self.remove(next(iter(self.entries)))
+    
+    def remove(self, path: str) -> None:
+        """ remove a single path (entry and indexes) """
+        _, node = self.entries.pop(path)
+        node_paths = self.paths[node.id]
+        node_paths.discard(path)
+        if not node_paths:
+            del self.paths[node.id]
+        del self.sorted_paths[bisect.bisect_left(self.sorted_paths, path)]
+    
+    def invalidate(self, path: str) -> None:
+        """ remove a path and all paths below """
+        path = path.rstrip('/')
+        # paths below are sorted between path + '/' and path + '0' ('0' follows '/')
+        start = bisect.bisect_left(self.sorted_paths, path + '/')
+        end = bisect.bisect_left(self.sorted_paths, path + '0')
+        for cached_path in self.sorted_paths[start:end]:
+            self.remove(cached_path)
+        if path in self.entries:
+            self.remove(path)
+    
+    def invalidate_nodes(self, node_ids: List[int]) -> None:
+        """ remove nodes (and all paths below) – the cache is cleared if a node is not cached (unknown path) """
+        if any(node_id not in self.paths for node_id in node_ids):
+            self.clear()
+            return
+        
+        for node_id in node_ids:
+            for path in list(self.paths.get(node_id, ())):
+                self.invalidate(path)
+    
+    def clear(self) -> None:
+        self.entries.clear()
+        self.paths.clear()
+        self.sorted_paths.clear()
@@ -12,13 +12,14 @@ Please note: maximum 500 items are returned in GET requests
 
 """
 
-from typing import List
+from typing import AsyncIterator, List
 import httpx
 import logging
 import urllib.parse
 from tenacity import retry
 
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, iter_pages
+from dracoon.client.models import ResponseMode
 from dracoon.errors import InvalidArgumentError, InvalidClientError, ClientDisconnectedError
 from .models import CreateWebhook, UpdateSettings, UpdateWebhook
 from .responses import EventTypeList, WebhookList, Webhook, CustomerSettingsResponse
@@ -110,7 +111,8 @@ class DRACOONSettings:
         return UpdateSettings(**settings_update)
 
     @retry(**RETRY_CONFIG)
-    async def get_webhooks(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> WebhookList:
+    async def get_webhooks(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                           response_mode: ResponseMode = None) -> WebhookList:
         """ list (all) webhooks """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -135,7 +137,14 @@ class DRACOONSettings:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved webhooks.")
-        return WebhookList(**res.json())
+        return self.dracoon.parse_response(res=res, model=WebhookList, response_mode=response_mode)
+
+    async def iter_webhooks(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                            raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[Webhook]:
+        """ iterate (all) items of get_webhooks() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_webhooks, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
 
     @retry(**RETRY_CONFIG)
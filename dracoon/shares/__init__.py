@@ -7,13 +7,14 @@ Documentation: https://dracoon.team/api/swagger-ui/index.html?configUrl=/api/spe
 
 """
 
-from typing import List
+from typing import AsyncIterator, List
 import httpx
 import logging
 import urllib.parse
 from tenacity import retry
 
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, MAX_PARALLEL_PAGES, iter_pages
+from dracoon.client.models import ResponseMode
 from dracoon.crypto.models import FileKey, UserKeyPairContainer
 from dracoon.errors import ClientDisconnectedError, InvalidClientError
 from .models import CreateFileRequest, CreateShare, Expiration, SendShare, UpdateFileRequest, UpdateFileRequests, UpdateShare, UpdateShares
@@ -51,7 +52,8 @@ class DRACOONShares:
             raise ClientDisconnectedError(message='DRACOON client must be connected: client.connect()')
 
     @retry(**RETRY_CONFIG)
-    async def get_shares(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> DownloadShareList:
+    async def get_shares(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                         response_mode: ResponseMode = None) -> DownloadShareList:
         """ list (all) shares visible as authenticated user """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -76,7 +78,16 @@ class DRACOONShares:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved shares.")
-        return DownloadShareList(**res.json())
+        return self.dracoon.parse_response(res=res, model=DownloadShareList, response_mode=response_mode)
+
+    async def iter_shares(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                          raise_on_err: bool = False, max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                          response_mode: ResponseMode = None) -> AsyncIterator[DownloadShare]:
+        """ iterate (all) items of get_shares() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_shares, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def create_share(self, share: CreateShare, raise_on_err: bool = False) -> DownloadShare:
@@ -328,7 +339,8 @@ class DRACOONShares:
 
 
     @retry(**RETRY_CONFIG)
-    async def get_file_requests(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False) -> UploadShareList:
+    async def get_file_requests(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, raise_on_err: bool = False, 
+                                response_mode: ResponseMode = None) -> UploadShareList:
         """ list all file requests visible as authenticated user """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -354,7 +366,16 @@ class DRACOONShares:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved file requests.")
-        return UploadShareList(**res.json())
+        return self.dracoon.parse_response(res=res, model=UploadShareList, response_mode=response_mode)
+
+    async def iter_file_requests(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                                 raise_on_err: bool = False, max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                                 response_mode: ResponseMode = None) -> AsyncIterator[UploadShare]:
+        """ iterate (all) items of get_file_requests() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_file_requests, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def create_file_request(self, file_request: CreateFileRequest, raise_on_err: bool = False) -> UploadShare:
@@ -22,3 +22,22 @@ class FinalizeUpload(BaseModel):
     userFileKeyList: Optional[UserFileKeyList] = None
 
     
+
+class UploadJournalPart(BaseModel):
+    partNumber: int
+    partEtag: str
+    offset: int
+    size: int
+
+# on-disk state of a resumable S3 upload
+class UploadJournal(BaseModel):
+    uploadId: str
+    uploadUrl: str
+    token: str
+    parentId: int
+    fileName: str
+    filePath: str
+    fileSize: int
+    fileModified: float
+    chunkSize: int
+    parts: List[UploadJournalPart] = []
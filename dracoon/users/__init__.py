@@ -14,19 +14,27 @@ Please note: maximum 500 items are returned in GET requests
 
 """
 
-from typing import List
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple, Union
 import logging
 import urllib.parse
 
 import httpx
 from tenacity import retry
 
-from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG
-from dracoon.user.responses import (AttributesResponse, LastAdminUserRoomList, RoleList, 
-                                    UserData, UserGroupList, UserList)
-from dracoon.errors import ClientDisconnectedError, InvalidClientError
-from .models import (AttributeEntry, CreateUser, Expiration, MfaConfig, UpdateUser, UpdateUserAttributes, 
-                     UserAuthData)
+from dracoon.client import DRACOONClient, OAuth2ConnectionType, RETRY_CONFIG, MAX_CONCURRENT_REQUESTS, MAX_PARALLEL_PAGES, bulk_process, iter_pages
+from dracoon.client.models import ResponseMode
+from dracoon.user.responses import (AttributesResponse, KeyValueEntry, LastAdminUserRoomList, RoleList, 
+                                    UserData, UserGroup, UserGroupList, UserItem, UserList)
+from dracoon.errors import ClientDisconnectedError, InvalidArgumentError, InvalidClientError
+# modules only – dracoon.groups and dracoon.user import dracoon.users.models (circular import)
+from dracoon import groups as dracoon_groups, user as dracoon_user
+from .models import (AttributeEntry, CreateUser, Expiration, MfaConfig, ProvisioningAction, ProvisioningKey, ProvisioningResult, ProvisionUser, 
+                     UpdateUser, UpdateUserAttributes, UserAuthData)
+
+# concurrent page requests for the user snapshot in provision_users
+PROVISIONING_PARALLEL_PAGES = 4
+# user fields compared in provision_users (updated if set in the desired state)
+PROVISIONING_UPDATE_FIELDS = ('firstName', 'lastName', 'email', 'userName', 'phone')
 
 
 class DRACOONUsers:
@@ -195,7 +203,7 @@ class DRACOONUsers:
     @retry(**RETRY_CONFIG)
     async def get_users(self, offset: int = 0, filter: str = None, limit: int = None, 
                         sort: str = None, raise_on_err: bool = False, include_attributes: bool = False,
-                        include_roles: bool = False) -> UserList:     
+                        include_roles: bool = False, response_mode: ResponseMode = None) -> UserList:     
         """ list (all) users """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -219,7 +227,18 @@ class DRACOONUsers:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved users.")
-        return UserList(**res.json())
+        return self.dracoon.parse_response(res=res, model=UserList, response_mode=response_mode)
+
+    async def iter_users(self, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                         raise_on_err: bool = False, include_attributes: bool = False, include_roles: bool = False, 
+                         max_parallel_pages: int = MAX_PARALLEL_PAGES, ordered: bool = True, 
+                         response_mode: ResponseMode = None) -> AsyncIterator[UserItem]:
+        """ iterate (all) items of get_users() – pages are requested lazily until range.total is reached """
+        """ max_parallel_pages: prefetch remaining pages concurrently, ordered: yield items in offset order (or as pages arrive) """
+        async for item in iter_pages(self.get_users, offset=offset, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, include_attributes=include_attributes, include_roles=include_roles, 
+                                     response_mode=response_mode, max_parallel_pages=max_parallel_pages, ordered=ordered):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def get_user(self, user_id: int, raise_on_err: bool = False) -> UserData:
@@ -288,7 +307,7 @@ class DRACOONUsers:
     @retry(**RETRY_CONFIG)
     async def get_user_groups(self, user_id: int, offset: int = 0, filter: str = None, 
                               limit: int = None, sort: str = None, 
-                              raise_on_err: bool = False) -> UserGroupList:
+                              raise_on_err: bool = False, response_mode: ResponseMode = None) -> UserGroupList:
         """ list all groups for a specific user (by id) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -310,7 +329,14 @@ class DRACOONUsers:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved user groups.")
-        return UserGroupList(**res.json())
+        return self.dracoon.parse_response(res=res, model=UserGroupList, response_mode=response_mode)
+
+    async def iter_user_groups(self, user_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                               raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[UserGroup]:
+        """ iterate (all) items of get_user_groups() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_user_groups, offset=offset, user_id=user_id, filter=filter, limit=limit, sort=sort, 
+                                     raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def get_user_last_admin_rooms(self, user_id: int, 
@@ -356,7 +382,7 @@ class DRACOONUsers:
     @retry(**RETRY_CONFIG)
     async def get_user_attributes(self, user_id: int, offset: int = 0, filter: str = None, 
                                   limit: int = None, sort: str = None, 
-                                  raise_on_err: bool = False) -> AttributesResponse:
+                                  raise_on_err: bool = False, response_mode: ResponseMode = None) -> AttributesResponse:
         """ get custom user attributes for a specific user (by id) """
         if not await self.dracoon.test_connection() and self.dracoon.connection:
             await self.dracoon.connect(OAuth2ConnectionType.refresh_token)
@@ -378,7 +404,14 @@ class DRACOONUsers:
             await self.dracoon.handle_http_error(err=e, raise_on_err=raise_on_err)
         
         self.logger.info("Retrieved user attributes.")
-        return AttributesResponse(**res.json())
+        return self.dracoon.parse_response(res=res, model=AttributesResponse, response_mode=response_mode)
+
+    async def iter_user_attributes(self, user_id: int, offset: int = 0, filter: str = None, limit: int = None, sort: str = None, 
+                                   raise_on_err: bool = False, response_mode: ResponseMode = None) -> AsyncIterator[KeyValueEntry]:
+        """ iterate (all) items of get_user_attributes() – pages are requested lazily until range.total is reached """
+        async for item in iter_pages(self.get_user_attributes, offset=offset, user_id=user_id, filter=filter, limit=limit, 
+                                     sort=sort, raise_on_err=raise_on_err, response_mode=response_mode):
+            yield item
 
     @retry(**RETRY_CONFIG)
     async def delete_user_attribute(self, user_id: int, key: str, 
@@ -436,3 +469,149 @@ class DRACOONUsers:
             "items": list
         })
 
+    def get_provisioning_key(self, user: CreateUser, key: ProvisioningKey) -> str:
+        """ key of a desired user (provision_users) – login defaults to the auth login or email """
+        if key == ProvisioningKey.login:
+            return user.userName or user.authData.login or user.email
+        return user.email
+
+    def is_provisioning_value_equal(self, field: str, key: ProvisioningKey, desired: Any, current: Any) -> bool:
+        """ compare a user field (provision_users) – the key field is compared case-insensitively (as users are matched) """
+        if field == key.value and isinstance(desired, str) and isinstance(current, str):
+            return desired.lower() == current.lower()
+        return desired == current
+
+    async def provision_users(self, users: Iterable[Union[ProvisionUser, CreateUser]], key: ProvisioningKey = ProvisioningKey.email, 
+                              filter: str = None, delete_missing: bool = False, dry_run: bool = False, 
+                              max_concurrency: int = MAX_CONCURRENT_REQUESTS, group_batch_size: int = None, 
+                              max_parallel_pages: int = PROVISIONING_PARALLEL_PAGES) -> List[ProvisioningResult]:
+        """ 
+        provision users from a desired state – users are compared with a snapshot of all users (indexed by email or login) and created, 
+        updated or deleted (delete_missing: users of the snapshot not in the desired state) with bounded concurrency 
+        group memberships (groupIds) missing in a group are added per group in batches – returns a result per user (dry_run: planned actions only) 
+        filter: restricts the snapshot (and therefore deletions) to matching users – required with delete_missing (the current user is never deleted) 
+        users with a key matching several users of the snapshot are not changed (error), group_batch_size: user ids per request (default: GROUP_USERS_BATCH_SIZE) 
+        """
+        if delete_missing and not filter:
+            err = InvalidArgumentError(message='A filter is required to delete missing users.')
+            await self.dracoon.handle_generic_error(err=err)
+        
+        group_batch_size = group_batch_size or dracoon_groups.GROUP_USERS_BATCH_SIZE
+        # users per key (several users of the snapshot might share an email or login)
+        snapshot: Dict[str, List[Dict[str, Any]]] = {}
+        async for user in self.iter_users(filter=filter, raise_on_err=True, max_parallel_pages=max_parallel_pages, response_mode=ResponseMode.raw):
+            user_key = user.get(key.value)
+            if user_key:
+                snapshot.setdefault(user_key.lower(), []).append(user)
+        
+        results: List[ProvisioningResult] = []
+        operations: List[Tuple[ProvisioningResult, Any]] = []
+        memberships: List[Tuple[ProvisioningResult, List[int]]] = []
+        provisioned = set()
+        
+        for index, item in enumerate(users):
+            if isinstance(item, CreateUser):
+                item = ProvisionUser(user=item)
+            
+            user_key = self.get_provisioning_key(user=item.user, key=key)
+            result = ProvisioningResult(index=index, key=user_key, action=ProvisioningAction.unchanged)
+            results.append(result)
+            
+            if user_key.lower() in provisioned:
+                result.error = InvalidArgumentError(message=f'Duplicate user: {user_key}')
+                continue
+            provisioned.add(user_key.lower())
+            
+            current_users = snapshot.get(user_key.lower(), [])
+            if len(current_users) > 1:
+                result.error = InvalidArgumentError(message=f'Ambiguous user: {user_key} matches {len(current_users)} users')
+                continue
+            
+            if not current_users:
+                result.action = ProvisioningAction.create
+                operations.append((result, item.user))
+            else:
+                current = current_users[0]
+                result.user_id = current['id']
+                desired = item.user.model_dump(exclude_unset=True)
+                update = { field: desired[field] for field in PROVISIONING_UPDATE_FIELDS 
+                          if desired.get(field) is not None and not self.is_provisioning_value_equal(field=field, key=key, 
+                                                                                                     desired=desired[field], current=current.get(field)) }
+                if update:
+                    result.action = ProvisioningAction.update
+                    operations.append((result, UpdateUser(**update)))
+            
+            if item.groupIds:
+                memberships.append((result, item.groupIds))
+        
+        if delete_missing:
+            account = await dracoon_user.DRACOONUser(dracoon_client=self.dracoon).get_account_information(raise_on_err=True)
+            for user_key, current_users in snapshot.items():
+                if user_key in provisioned:
+                    continue
+                for current in current_users:
+                    if current['id'] == account.id:
+                        continue
+                    result = ProvisioningResult(index=None, key=current[key.value], action=ProvisioningAction.delete, user_id=current['id'])
+                    results.append(result)
+                    operations.append((result, None))
+        
+        if dry_run:
+            self.logger.info("Planned %s user operations.", len(operations))
+            return results
+        
+        async def run_operation(operation: Tuple[ProvisioningResult, Any]) -> None:
+            result, payload = operation
+            if result.action == ProvisioningAction.create:
+                user = await self.create_user(user=payload, raise_on_err=True)
+                result.user_id = user.id
+            elif result.action == ProvisioningAction.update:
+                await self.update_user(user_id=result.user_id, user_update=payload, raise_on_err=True)
+            else:
+                await self.delete_user(user_id=result.user_id, raise_on_err=True)
+        
+        async for res in bulk_process(items=operations, fn=run_operation, max_concurrency=max_concurrency):
+            if not res.ok:
+                res.item[0].error = res.error
+        
+        # group memberships: one request per group (and batch of users)
+        group_users: Dict[int, List[ProvisioningResult]] = {}
+        for result, group_ids in memberships:
+            if result.ok:
+                for group_id in group_ids:
+                    group_users.setdefault(group_id, []).append(result)
+        
+        if group_users:
+            groups = dracoon_groups.DRACOONGroups(dracoon_client=self.dracoon)
+            
+            # existing users might be members already – members of these groups are listed once (created users are not)
+            async def get_group_members(group_id: int) -> set:
+                return {item['userInfo']['id'] async for item in groups.iter_group_users(group_id=group_id, raise_on_err=True, 
+                                                                                          response_mode=ResponseMode.raw)}
+            
+            group_ids = [group_id for group_id, group_results in group_users.items() 
+                         if any(result.action != ProvisioningAction.create for result in group_results)]
+            async for res in bulk_process(items=group_ids, fn=get_group_members, max_concurrency=max_concurrency):
+                if not res.ok:
+                    for result in group_users.pop(res.item):
+                        result.error = res.error
+                    continue
+                group_users[res.item] = [result for result in group_users[res.item] if result.user_id not in res.result]
+            
+            batches = [(group_id, group_results[start:start + group_batch_size]) for group_id, group_results in group_users.items() 
+                       for start in range(0, len(group_results), group_batch_size)]
+            
+            async def add_group_users(batch: Tuple[int, List[ProvisioningResult]]) -> None:
+                group_id, batch_results = batch
+                await groups.add_group_users(group_id=group_id, user_list=[result.user_id for result in batch_results], raise_on_err=True)
+            
+            async for res in bulk_process(items=batches, fn=add_group_users, max_concurrency=max_concurrency):
+                if not res.ok:
+                    for result in res.item[1]:
+                        result.error = res.error
+        
+        counts = { action: sum(1 for result in results if result.action == action and result.ok) for action in ProvisioningAction }
+        self.logger.info("Provisioned users: %s created, %s updated, %s deleted, %s unchanged, %s failed.", counts[ProvisioningAction.create], 
+                         counts[ProvisioningAction.update], counts[ProvisioningAction.delete], counts[ProvisioningAction.unchanged], 
+                         sum(1 for result in results if not result.ok))
+        return results
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+from enum import Enum
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -67,8 +69,31 @@ class SetUserAttributes(BaseModel):
 class UpdateUserAttributes(BaseModel):
     items: Optional[List[AttributeEntry]] = None
 
+# desired state of a user (DRACOONUsers.provision_users): user payload and groups to add the user to
+class ProvisionUser(BaseModel):
+    user: CreateUser
+    groupIds: Optional[List[int]] = None
 
+class ProvisioningKey(Enum):
+    email = 'email'
+    login = 'userName'
 
+class ProvisioningAction(Enum):
+    create = 'create'
+    update = 'update'
+    delete = 'delete'
+    unchanged = 'unchanged'
 
-
-
+@dataclass
+class ProvisioningResult:
+    """ result of a single user in provision_users """
+    """ index: position in the desired state (None for deleted users), error: exception of the user or group request (None on success) """
+    index: Optional[int]
+    key: str
+    action: ProvisioningAction
+    user_id: Optional[int] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -31,5 +31,8 @@ setup(
     ],
     packages=find_packages(),
     include_package_data=True,
-    install_requires=["httpx", "asyncio", "pydantic", "cryptography", "tenacity"]
+    install_requires=["httpx", "asyncio", "pydantic", "cryptography", "tenacity"],
+    extras_require={
+        "orjson": ["orjson>=3.8.3,<4"]
+    }
 )
\ No newline at end of file
@@ -1,5 +1,25 @@
+import asyncio
+import gc
+import importlib.util
+import json
+import time
 import unittest
-from dracoon.client import DRACOONClient
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+
+from dracoon import DRACOON, crypto
+from dracoon.client import (DRACOONClient, DRACOONConnection, OAuth2ConnectionType, RATE_INCREASE_INTERVAL, RATE_INCREASE_RATIO, RateLimiter, RateLimitedTransport, 
+                            TOKEN_REFRESH_RATIO, bulk_process, iter_json_array, iter_pages, loads_json, parse_retry_after)
+from dracoon.errors import ClientDisconnectedError, InvalidClientError
+from dracoon.client.metrics import BYTES_UPLOADED, REQUEST_DURATION, THROTTLED, TOKEN_REFRESHES, PrometheusMetrics
+from dracoon.client.models import Range, ResponseMode, TransportConfig
+from dracoon.crypto.models import UserKeyPairVersion
+from dracoon.nodes.models import Node
+from dracoon.nodes.responses import NodeList
+from dracoon.user.models import UserInfo
+from dracoon.user.responses import AttributesResponse
 
 class TestDRACOONClient(unittest.TestCase):
 
@@ -20,6 +40,47 @@ class TestDRACOONClient(unittest.TestCase):
         self.assertEqual(dracoon.client_secret, 'my_test_secret')
         self.assertFalse(dracoon.connected)
 
+    def test_client_creation_transport_config(self):
+
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', rate_limit=10,
+                                transport_config=TransportConfig(max_connections=50, upload_max_connections=4, download_max_connections=8))
+
+        self.assertEqual(dracoon.http._transport.transport._pool._max_connections, 50)
+        self.assertEqual(dracoon.uploader._transport.transport._pool._max_connections, 4)
+        self.assertEqual(dracoon.downloader._transport.transport._pool._max_connections, 8)
+        self.assertIs(dracoon.uploader._transport.rate_limiter, dracoon.http._transport.rate_limiter)
+
+    def test_client_creation_proxy_rate_limit(self):
+        """ proxied requests use the rate limiter """
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', rate_limit=10, proxy_config='http://proxy.test.com:3128')
+
+        transport = dracoon.http._transport_for_url(httpx.URL('https://just.a.test.com/api/v4/user/account'))
+        self.assertIsInstance(transport, RateLimitedTransport)
+        self.assertIs(transport.rate_limiter, dracoon.http._transport.rate_limiter)
+
+    def test_client_creation_proxy_config(self):
+        """ proxied requests use the transport config (connection pools) """
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', proxy_config='http://proxy.test.com:3128',
+                                transport_config=TransportConfig(max_connections=500, max_keepalive_connections=50, upload_max_connections=4))
+
+        url = httpx.URL('https://just.a.test.com/api/v4/user/account')
+        pool = dracoon.http._transport_for_url(url)._pool
+        self.assertEqual(pool._max_connections, 500)
+        self.assertEqual(pool._max_keepalive_connections, 50)
+        self.assertEqual(pool._proxy_url.host, b'proxy.test.com')
+        self.assertEqual(dracoon.uploader._transport_for_url(url)._pool._max_connections, 4)
+
+        # no proxy for http
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', proxy_config={ 'https://': 'http://proxy.test.com:3128', 'http://': None })
+
+        self.assertEqual(dracoon.http._transport_for_url(url)._pool._proxy_url.host, b'proxy.test.com')
+        self.assertIs(dracoon.http._transport_for_url(httpx.URL('http://just.a.test.com')), dracoon.http._transport)
+
+    @unittest.skipIf(importlib.util.find_spec('h2'), 'h2 installed')
+    def test_client_creation_http2_missing(self):
+
+        self.assertRaises(InvalidClientError, DRACOONClient, base_url='https://just.a.test.com', transport_config=TransportConfig(http2=True))
+
     def test_client_redirect_uri(self):
         dracoon_custom_redirect = DRACOONClient(base_url='https://foo.bar', redirect_uri='https://bar.foo/callback')
         dracoon_default_redirect = DRACOONClient(base_url='https://foo.bar')
@@ -29,5 +90,362 @@ class TestDRACOONClient(unittest.TestCase):
         self.assertEqual(dracoon_custom_redirect.get_code_url(), dracoon_custom_redirect.base_url + f'/oauth/authorize?branding=full&response_type=code&client_id={dracoon_custom_redirect.client_id}&redirect_uri=https://bar.foo/callback&scope=all')
         self.assertEqual(dracoon_default_redirect.get_code_url(), dracoon_custom_redirect.base_url + f'/oauth/authorize?branding=full&response_type=code&client_id={dracoon_default_redirect.client_id}&redirect_uri=https://foo.bar/oauth/callback&scope=all')
 
+    def test_adapter_cache(self):
+        dracoon = DRACOON(base_url='https://just.a.test.com')
+
+        with self.assertRaises(ClientDisconnectedError):
+            dracoon.nodes
+
+        dracoon.client.connection = DRACOONConnection(datetime.now(), 'access_token', 28800, 'refresh_token')
+        nodes = dracoon.nodes
+        self.assertIs(dracoon.nodes, nodes)
+        self.assertIsNot(dracoon.users, nodes)
+
+        # reconnect creates new adapters – the node cache is kept
+        dracoon.client.connection = DRACOONConnection(datetime.now(), 'new_access_token', 28800, 'refresh_token')
+        self.assertIsNot(dracoon.nodes, nodes)
+        self.assertIs(dracoon.nodes.node_cache, nodes.node_cache)
+
+        dracoon.client.connection = None
+        with self.assertRaises(ClientDisconnectedError):
+            dracoon.nodes
+
+
+class TestLogout(unittest.IsolatedAsyncioTestCase):
+
+    async def test_logout_key_cache(self):
+        """ logout drops the plain keypair and deserialized keys """
+        dracoon = DRACOON(base_url='https://just.a.test.com')
+        dracoon.client.connection = DRACOONConnection(datetime.now(), 'access_token', 28800, 'refresh_token')
+        dracoon.client.http._transport = httpx.MockTransport(lambda request: httpx.Response(200))
+        dracoon.plain_keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        crypto.load_private_key(dracoon.plain_keypair)
+
+        await dracoon.logout()
+
+        self.assertIsNone(dracoon.plain_keypair)
+        self.assertEqual(crypto.load_private_key_pem.cache_info().currsize, 0)
+
+
+class TestTokenRefresh(unittest.IsolatedAsyncioTestCase):
+
+    async def test_single_flight_refresh(self):
+        token_requests = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            token_requests.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={ "access_token": f'access_token_{len(token_requests)}', "expires_in": 28800, 
+                                             "refresh_token": 'refresh_token' })
+
+        dracoon = DRACOONClient(base_url='https://just.a.test.com')
+        dracoon.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        dracoon.connected = True
+        # token is refreshed ahead of expiry
+        connected_at = datetime.now() - timedelta(seconds=28800 * TOKEN_REFRESH_RATIO + 1)
+        dracoon.connection = DRACOONConnection(connected_at, 'access_token', 28800, 'refresh_token')
+        self.assertFalse(await dracoon.check_access_token())
+
+        async def request():
+            if not await dracoon.test_connection() and dracoon.connection:
+                await dracoon.connect(OAuth2ConnectionType.refresh_token)
+            return dracoon.http.headers["Authorization"]
+
+        tokens = await asyncio.gather(*(request() for _ in range(50)))
+
+        self.assertEqual(len(token_requests), 1)
+        self.assertEqual(set(tokens), { 'Bearer access_token_1' })
+        self.assertTrue(await dracoon.check_access_token())
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('2'), 2)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+        self.assertIsNone(parse_retry_after('invalid'))
+        self.assertIsNone(parse_retry_after(None))
+
+    async def test_retry_after(self):
+        requests = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(asyncio.get_running_loop().time())
+            if len(requests) == 1:
+                return httpx.Response(429, headers={ "Retry-After": '0.2' })
+            return httpx.Response(200)
+
+        rate_limiter = RateLimiter(rate=10)
+        client = httpx.AsyncClient(transport=RateLimitedTransport(transport=httpx.MockTransport(handler), rate_limiter=rate_limiter))
+
+        res = await client.get('https://just.a.test.com')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(requests), 2)
+        self.assertGreaterEqual(requests[1] - requests[0], 0.2)
+        # multiplicative decrease – no increase within the decrease window
+        self.assertAlmostEqual(rate_limiter.rate, 5)
+
+    async def test_throttled_once(self):
+        """ simultaneous 429 responses decrease the rate once """
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(429)
+
+        rate_limiter = RateLimiter(rate=100)
+        client = httpx.AsyncClient(transport=RateLimitedTransport(transport=httpx.MockTransport(handler), rate_limiter=rate_limiter))
+
+        responses = await asyncio.gather(*(client.post('https://just.a.test.com', content=b'') for _ in range(10)))
+
+        self.assertTrue(all(res.status_code == 429 for res in responses))
+        self.assertAlmostEqual(rate_limiter.rate, 50)
+
+    def test_increase_per_interval(self):
+        """ additive increase depends on elapsed time, not on the number of responses """
+        rate_limiter = RateLimiter(rate=100)
+        rate_limiter.rate = 50
+        rate_limiter.increased_at = time.monotonic() - RATE_INCREASE_INTERVAL / 2
+
+        for _ in range(100):
+            rate_limiter.on_success()
+
+        self.assertGreaterEqual(rate_limiter.rate, 50 + 100 * RATE_INCREASE_RATIO / 2)
+        self.assertLess(rate_limiter.rate, 50 + 100 * RATE_INCREASE_RATIO)
+
+    async def test_rate(self):
+        rate_limiter = RateLimiter(rate=20, burst=1)
+        client = httpx.AsyncClient(transport=RateLimitedTransport(transport=httpx.MockTransport(lambda request: httpx.Response(200)), 
+                                                                  rate_limiter=rate_limiter))
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(client.get('https://just.a.test.com') for _ in range(6)))
+
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - started, 0.25)
+
+
+class TestPagination(unittest.IsolatedAsyncioTestCase):
+
+    async def test_iter_pages(self):
+        attributes = [{ "key": str(i), "value": 'test' } for i in range(7)]
+        offsets = []
+
+        async def get_attributes(offset: int = 0, limit: int = None) -> AttributesResponse:
+            offsets.append(offset)
+            return AttributesResponse(range=Range(offset=offset, limit=limit, total=len(attributes)), items=attributes[offset:offset + limit])
+
+        keys = [attribute.key async for attribute in iter_pages(get_attributes, limit=3)]
+
+        self.assertEqual(keys, [str(i) for i in range(7)])
+        self.assertEqual(offsets, [0, 3, 6])
+
+    async def test_iter_pages_parallel(self):
+        attributes = [{ "key": str(i), "value": 'test' } for i in range(25)]
+        requests = { "in_flight": 0, "max": 0 }
+
+        async def get_attributes(offset: int = 0, limit: int = None) -> AttributesResponse:
+            requests["in_flight"] += 1
+            requests["max"] = max(requests["max"], requests["in_flight"])
+            # later pages arrive first
+            await asyncio.sleep(0.01 * (len(attributes) - offset) / limit)
+            requests["in_flight"] -= 1
+            return AttributesResponse(range=Range(offset=offset, limit=limit, total=len(attributes)), items=attributes[offset:offset + limit])
+
+        keys = [attribute.key async for attribute in iter_pages(get_attributes, limit=4, max_parallel_pages=3)]
+        self.assertEqual(keys, [str(i) for i in range(25)])
+        self.assertEqual(requests["max"], 3)
+
+        keys = [attribute.key async for attribute in iter_pages(get_attributes, limit=4, max_parallel_pages=3, ordered=False)]
+        self.assertNotEqual(keys, [str(i) for i in range(25)])
+        self.assertEqual(sorted(keys, key=int), [str(i) for i in range(25)])
+
+    async def test_iter_pages_errors(self):
+        """ errors of all failed pages are retrieved, pending pages are cancelled and awaited """
+        attributes = [{ "key": str(i), "value": 'test' } for i in range(20)]
+        cancelled = []
+
+        async def get_attributes(offset: int = 0, limit: int = None) -> AttributesResponse:
+            if offset in (4, 8):
+                raise ValueError(f'Page {offset} failed')
+            if offset:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(offset)
+                    raise
+            return AttributesResponse(range=Range(offset=offset, limit=limit, total=len(attributes)), items=attributes[offset:offset + limit])
+
+        loop = asyncio.get_running_loop()
+        unretrieved = []
+        loop.set_exception_handler(lambda loop, context: unretrieved.append(context))
+
+        with self.assertRaises(ValueError):
+            _ = [attribute async for attribute in iter_pages(get_attributes, limit=4, max_parallel_pages=4)]
+
+        self.assertEqual(sorted(cancelled), [12, 16])
+        gc.collect()
+        self.assertEqual(unretrieved, [])
+
+    async def test_iter_pages_empty(self):
+        async def get_attributes(offset: int = 0) -> AttributesResponse:
+            return AttributesResponse(range=Range(offset=offset, limit=500, total=0), items=[])
+
+        self.assertEqual([attribute async for attribute in iter_pages(get_attributes)], [])
+
+class TestJSONArray(unittest.IsolatedAsyncioTestCase):
+
+    async def iter_chunks(self, content: bytes, chunk_size: int):
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    async def test_iter_json_array(self):
+        items = [{ "nodeId": i, "nodeName": f'Räume {i}', "list": [i, 'a,]'] } for i in range(20)] + [123, 'test', None]
+        items += ['quote \\" and backslash \\\\ ]}', { "a": ['{', '"[', { "b": -1.5e3 }] }, [], True, '', 1.25, -2e10]
+        content = ('\n [' + ', '.join(json.dumps(item, ensure_ascii=False) for item in items) + '] \n').encode('utf-8')
+
+        # chunks split items, numbers and multibyte characters
+        for chunk_size in (1, 7, len(content)):
+            decoded = [item async for item in iter_json_array(self.iter_chunks(content, chunk_size))]
+            self.assertEqual(decoded, items)
+
+        self.assertEqual([item async for item in iter_json_array(self.iter_chunks(b'[]', 1))], [])
+
+    async def test_iter_json_array_invalid(self):
+        invalid = (b'[{"a": 1}, {"b"', b'{"a": 1}', b'[,,1]', b'[,1]', b'[1 2]', b'[1,,2]', b'[1,]', b'[1] 2', b'[1]]', b'[{"a": 1]', b'[tru]', b'[1')
+        for content in invalid:
+            for chunk_size in (1, len(content)):
+                with self.subTest(content=content, chunk_size=chunk_size), self.assertRaises(ValueError):
+                    [item async for item in iter_json_array(self.iter_chunks(content, chunk_size))]
+
+    async def test_iter_json_array_large_item(self):
+        """ items split by chunks are scanned and decoded once (not per received chunk) """
+        items = [{ "data": ['x' * 100] * 1000 }, 1]
+        content = json.dumps(items).encode('utf-8')
+
+        with patch('dracoon.client.json.loads', wraps=json.loads) as loads:
+            decoded = [item async for item in iter_json_array(self.iter_chunks(content, 64))]
+
+        self.assertEqual(decoded, items)
+        self.assertEqual(loads.call_count, 1)
+
+class TestResponseMode(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.page = { "range": { "offset": 0, "limit": 500, "total": 1 }, 
+                      "items": [{ "id": 1, "type": "room", "name": "test", "createdAt": "2023-10-01T12:00:00.000Z", "unknown": True,
+                                  "createdBy": { "id": 2, "userType": "internal", "userName": "test" } }] }
+
+    def test_parse_response(self):
+        dracoon = DRACOONClient(base_url='https://just.a.test.com')
+        res = httpx.Response(200, json=self.page)
+
+        nodes = dracoon.parse_response(res=res, model=NodeList)
+        self.assertIsInstance(nodes.items[0].createdAt, datetime)
+
+        nodes = dracoon.parse_response(res=res, model=NodeList, response_mode=ResponseMode.construct)
+        self.assertIsInstance(nodes.items[0], Node)
+        self.assertIsInstance(nodes.items[0].createdBy, UserInfo)
+        self.assertEqual(nodes.items[0].createdBy.userName, 'test')
+        self.assertEqual(nodes.items[0].createdAt, '2023-10-01T12:00:00.000Z')
+        self.assertIsNone(nodes.items[0].size)
+        self.assertNotIn('unknown', nodes.items[0].model_fields_set)
+        self.assertEqual(nodes.range.total, 1)
+
+        nodes = dracoon.parse_response(res=res, model=NodeList, response_mode=ResponseMode.raw)
+        self.assertEqual(nodes, self.page)
+
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', response_mode=ResponseMode.raw)
+        self.assertEqual(dracoon.parse_response(res=res, model=NodeList), self.page)
+
+    def test_loads_json(self):
+        self.assertEqual(loads_json(b'{"items": [{"id": 1, "name": "t\\u00e4st"}]}'), { "items": [{ "id": 1, "name": "täst" }] })
+
+    async def test_iter_pages_raw(self):
+
+        async def get_nodes(offset: int = 0) -> dict:
+            return { "range": { "offset": offset, "limit": 1, "total": 3 }, "items": [{ "id": offset }] }
+
+        self.assertEqual([node["id"] async for node in iter_pages(get_nodes)], [0, 1, 2])
+
+class TestMetrics(unittest.IsolatedAsyncioTestCase):
+
+    async def test_event_hooks(self):
+        metrics = PrometheusMetrics()
+        dracoon = DRACOONClient(base_url='https://just.a.test.com', metrics=metrics)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await request.aread()
+            return httpx.Response(429 if request.url.path.endswith('users') else 200, stream=httpx.ByteStream(b'test'))
+
+        dracoon.http._transport = httpx.MockTransport(handler)
+        dracoon.uploader._transport = httpx.MockTransport(handler)
+
+        async def upload():
+            yield b'chunk'
+            yield b'chunk'
+
+        await dracoon.http.get('https://just.a.test.com/api/v4/nodes/12/comments')
+        await dracoon.http.get('https://just.a.test.com/api/v4/users')
+        await dracoon.uploader.put('https://s3.just.a.test.com/upload', content=upload())
+
+        self.assertEqual(metrics.get_count(REQUEST_DURATION, endpoint='/api/v4/nodes/{id}/comments', status='200'), 1)
+        self.assertEqual(metrics.get_count(REQUEST_DURATION, client='upload', endpoint='s3.just.a.test.com'), 1)
+        self.assertEqual(metrics.get_count(THROTTLED), 1)
+        self.assertEqual(metrics.get_count(BYTES_UPLOADED, client='upload'), 10)
+
+    def test_export(self):
+        metrics = PrometheusMetrics(buckets=(0.1, 1))
+        metrics.observe(REQUEST_DURATION, 0.5, endpoint='/api/v4/nodes')
+        metrics.observe(REQUEST_DURATION, 2, endpoint='/api/v4/nodes')
+        metrics.increment(TOKEN_REFRESHES)
+
+        exported = metrics.export().splitlines()
+
+        self.assertIn('dracoon_token_refreshes_total 1', exported)
+        self.assertIn('# TYPE dracoon_request_duration_seconds histogram', exported)
+        self.assertIn('dracoon_request_duration_seconds_bucket{endpoint="/api/v4/nodes",le="0.1"} 0', exported)
+        self.assertIn('dracoon_request_duration_seconds_bucket{endpoint="/api/v4/nodes",le="1"} 1', exported)
+        self.assertIn('dracoon_request_duration_seconds_bucket{endpoint="/api/v4/nodes",le="+Inf"} 2', exported)
+        self.assertIn('dracoon_request_duration_seconds_sum{endpoint="/api/v4/nodes"} 2.5', exported)
+        self.assertIn('dracoon_request_duration_seconds_count{endpoint="/api/v4/nodes"} 2', exported)
+
+class TestBulkProcess(unittest.IsolatedAsyncioTestCase):
+
+    async def test_bulk_process(self):
+        requests = { "in_flight": 0, "max": 0 }
+        progress = []
+
+        async def process(item: int) -> int:
+            requests["in_flight"] += 1
+            requests["max"] = max(requests["max"], requests["in_flight"])
+            await asyncio.sleep(0.001 * (item % 4))
+            requests["in_flight"] -= 1
+            if item % 5 == 0:
+                raise ValueError(item)
+            return item * 2
+
+        async def items():
+            for i in range(20):
+                yield i
+
+        results = [res async for res in bulk_process(items(), fn=process, max_concurrency=3, callback_fn=lambda val, total: progress.append(val))]
+
+        self.assertEqual(requests["max"], 3)
+        self.assertEqual(len(progress), 20)
+        self.assertEqual(sorted(res.index for res in results), list(range(20)))
+        self.assertEqual(sorted(res.item for res in results if not res.ok), [0, 5, 10, 15])
+        self.assertTrue(all(isinstance(res.error, ValueError) for res in results if not res.ok))
+        self.assertTrue(all(res.result == res.item * 2 for res in results if res.ok))
+
+    async def test_bulk_process_coroutines(self):
+
+        async def process(item: int) -> int:
+            await asyncio.sleep(0.02 * (3 - item))
+            return item
+
+        results = [res async for res in bulk_process([process(i) for i in range(4)], max_concurrency=4)]
+
+        # yielded as finished
+        self.assertEqual([res.result for res in results], [3, 2, 1, 0])
+        self.assertEqual([res.index for res in results], [res.result for res in results])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
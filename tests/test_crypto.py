@@ -188,6 +188,30 @@ class TestDRACOONCrypto(unittest.TestCase):
         self.assertIsInstance(decrypted_key_2048, PlainFileKey)
         self.assertIsInstance(decrypted_key_4096, PlainFileKey)
         
+    def test_key_cache(self):
+        """ Test deserialized keys are cached per PEM and cache can be cleared """
+        crypto.clear_key_cache()
+
+        plain_keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        plain_file_key = crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM)
+
+        enc_file_key = crypto.encrypt_file_key(plain_file_key=plain_file_key, keypair=plain_keypair)
+        crypto.decrypt_file_key(file_key=enc_file_key, keypair=plain_keypair)
+        crypto.encrypt_file_key_public(plain_file_key=plain_file_key, public_key=plain_keypair.publicKeyContainer)
+        crypto.encrypt_file_key_public(plain_file_key=plain_file_key, public_key=plain_keypair.publicKeyContainer)
+
+        private_key_info = crypto.load_private_key_pem.cache_info()
+        public_key_info = crypto.load_public_key_pem.cache_info()
+        self.assertEqual(private_key_info.misses, 1)
+        self.assertEqual(private_key_info.hits, 1)
+        self.assertEqual(public_key_info.misses, 1)
+        self.assertEqual(public_key_info.hits, 1)
+        self.assertIs(crypto.load_private_key(plain_keypair), crypto.load_private_key(plain_keypair))
+
+        crypto.clear_key_cache()
+        self.assertEqual(crypto.load_private_key_pem.cache_info().currsize, 0)
+        self.assertEqual(crypto.load_public_key_pem.cache_info().currsize, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
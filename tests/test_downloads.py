@@ -0,0 +1,119 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+
+import httpx
+
+from dracoon import crypto
+from dracoon.client import DRACOONClient, DRACOONConnection
+from dracoon.crypto.models import PlainFileKeyVersion, UserKeyPairVersion
+from dracoon.downloads import DRACOONDownloads
+from dracoon.errors import DRACOONCryptoError
+from dracoon.nodes.models import Node, NodeType
+
+CHUNK_SIZE = 1024
+CHUNKS = 16
+
+class ChunkStream(httpx.AsyncByteStream):
+    """ response body sent in chunks """
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def __aiter__(self):
+        for start in range(0, len(self.content), CHUNK_SIZE):
+            yield self.content[start:start + CHUNK_SIZE]
+
+
+class TestEncryptedDownload(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        cls.data = os.urandom(CHUNK_SIZE * CHUNKS)
+
+        plain_file_key = crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM)
+        encryptor = crypto.FileEncryptionCipher(plain_file_key=plain_file_key)
+        enc_data = encryptor.encode_bytes(cls.data)
+        last_data, plain_file_key = encryptor.finalize()
+        cls.enc_data = enc_data + last_data
+        cls.file_key = crypto.encrypt_file_key(plain_file_key=plain_file_key, keypair=cls.keypair)
+
+    def setUp(self) -> None:
+        self.target = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.target.cleanup()
+
+    def make_downloads(self, content: bytes) -> DRACOONDownloads:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        client.downloader._transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=ChunkStream(content)))
+        return DRACOONDownloads(dracoon_client=client)
+
+    async def download(self, downloads: DRACOONDownloads, file_name: str):
+        node = Node(id=1, type=NodeType.file, name=file_name, size=len(self.data))
+        await downloads.download_encrypted(download_url='https://dracoon.team/download', target_path=self.target.name, node_info=node,
+                                           plain_keypair=self.keypair, file_key=self.file_key, chunksize=CHUNK_SIZE)
+
+    async def test_download_encrypted(self):
+        await self.download(self.make_downloads(self.enc_data), file_name='test.bin')
+
+        with open(os.path.join(self.target.name, 'test.bin'), 'rb') as file:
+            self.assertEqual(file.read(), self.data)
+
+    async def test_download_encrypted_parallel(self):
+        """ parallel downloads with slow decryption do not depend on executor workers """
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+        decode_bytes = crypto.FileDecryptionCipher.decode_bytes
+
+        def slow_decode_bytes(cipher, enc_data: bytes) -> bytes:
+            time.sleep(0.002)
+            return decode_bytes(cipher, enc_data)
+
+        with patch.object(crypto.FileDecryptionCipher, 'decode_bytes', slow_decode_bytes):
+            await asyncio.wait_for(asyncio.gather(*(self.download(self.make_downloads(self.enc_data), file_name=f'test_{i}.bin')
+                                                    for i in range(8))), timeout=30)
+
+        for i in range(8):
+            with open(os.path.join(self.target.name, f'test_{i}.bin'), 'rb') as file:
+                self.assertEqual(file.read(), self.data)
+
+    async def test_download_encrypted_invalid_tag(self):
+        enc_data = bytes([self.enc_data[0] ^ 1]) + self.enc_data[1:]
+
+        with self.assertRaises(DRACOONCryptoError):
+            await self.download(self.make_downloads(enc_data), file_name='test.bin')
+
+        self.assertEqual(os.listdir(self.target.name), [])
+
+    async def test_download_encrypted_writer_error(self):
+        """ a failing writer stops the download and raises its error """
+        received = []
+
+        class CountingStream(ChunkStream):
+            async def __aiter__(self):
+                async for chunk in super().__aiter__():
+                    received.append(chunk)
+                    yield chunk
+
+        downloads = self.make_downloads(self.enc_data)
+        downloads.dracoon.downloader._transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=CountingStream(self.enc_data)))
+
+        def fail(cipher, enc_data: bytes) -> bytes:
+            raise OSError('Disk full')
+
+        with patch.object(crypto.FileDecryptionCipher, 'decode_bytes', fail):
+            with self.assertRaises(OSError):
+                await self.download(downloads, file_name='test.bin')
+
+        self.assertLess(len(received), CHUNKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,15 @@
 import os
 import asyncio
 import unittest
+from datetime import datetime, timedelta, timezone
 
 import dotenv
 
 from dracoon.client import DRACOONClient, OAuth2ConnectionType
 from dracoon.eventlog import DRACOONEvents
-from dracoon.eventlog.responses import AuditNodeInfoResponse, AuditNodeResponse, LogEventList
+from dracoon.eventlog.models import EventExportFormat
+from dracoon.eventlog.responses import AuditNodeInfoResponse, AuditNodeResponse, LogEvent, LogEventList
+from dracoon.eventlog.store import EventStore
 
 dotenv.load_dotenv()
 
@@ -35,6 +38,16 @@ class TestAsyncDRACOONEventlog(unittest.IsolatedAsyncioTestCase):
         self.assertGreater(len(permissions_audit), 0)
         self.assertIsInstance(permissions_audit[0], AuditNodeResponse)
 
+    async def test_iter_permissions(self):
+        permissions_audit = await self.eventlog.get_permissions()
+        nodes = [node async for node in self.eventlog.iter_permissions()]
+        self.assertEqual(nodes, permissions_audit)
+
+        file_path = 'test_permissions_export.csv'
+        count = await self.eventlog.export_permissions(file_path=file_path)
+        self.assertEqual(count, len(permissions_audit))
+        os.remove(file_path)
+
     async def test_get_events(self):
         events_audit = await self.eventlog.get_events()
         self.assertIsInstance(events_audit, LogEventList)
@@ -43,5 +56,33 @@ class TestAsyncDRACOONEventlog(unittest.IsolatedAsyncioTestCase):
         room_list = await self.eventlog.get_rooms()
         self.assertIsInstance(room_list, AuditNodeInfoResponse)
 
+    async def test_sync_events(self):
+        date_start = datetime.now(timezone.utc) - timedelta(days=7)
+
+        with EventStore() as store:
+            added = await self.eventlog.sync_events(store=store, date_start=date_start)
+            self.assertEqual(store.count_events(), added)
+            self.assertGreater(added, 0)
+            self.assertIsNotNone(store.get_checkpoint())
+            self.assertIsInstance(next(store.get_events(limit=1)), LogEvent)
+
+            # only events after the checkpoint are requested (duplicates are ignored)
+            count = store.count_events()
+            added = await self.eventlog.sync_events(store=store)
+            self.assertEqual(store.count_events(), count + added)
+
+    async def test_export_events(self):
+        date_start = datetime.now(timezone.utc) - timedelta(days=7)
+        file_path = 'test_events_export.csv'
+
+        events = [event async for event in self.eventlog.iter_events_by_window(date_start=date_start, window=timedelta(hours=12))]
+        self.assertIsInstance(events[0], LogEvent)
+        self.assertEqual([event.time for event in events], sorted(event.time for event in events))
+        self.assertEqual(len({event.id for event in events}), len(events))
+
+        count = await self.eventlog.export_events(file_path=file_path, date_start=date_start, date_end=events[-1].time, file_format=EventExportFormat.csv)
+        self.assertGreater(count, 0)
+        os.remove(file_path)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
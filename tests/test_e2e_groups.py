@@ -4,7 +4,7 @@ import unittest
 import dotenv
 from dracoon import DRACOONClient, OAuth2ConnectionType
 from dracoon.groups import DRACOONGroups
-from dracoon.groups.models import CreateGroup, UpdateGroup
+from dracoon.groups.models import CreateGroup, GroupMembersSync, UpdateGroup
 from dracoon.groups.responses import Group, GroupList, GroupUserList, LastAdminGroupRoomList, UserType
 from dracoon.user import DRACOONUser
 from dracoon.user.responses import RoleList
@@ -39,6 +39,11 @@ class TestAsyncDRACOONGroups(unittest.IsolatedAsyncioTestCase):
         group_list = await self.groups.get_groups()
         self.assertIsInstance(group_list, GroupList)
         
+    async def test_iter_groups(self):
+        group_list = await self.groups.get_groups()
+        groups = [group async for group in self.groups.iter_groups(limit=1)]
+        self.assertEqual(len(groups), group_list.range.total)
+        
     async def test_get_group(self):
         group_payload = self.groups.make_group(name='GET GROUP TEST')
         group = await self.groups.create_group(group_payload)
@@ -144,6 +149,30 @@ class TestAsyncDRACOONGroups(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(group_users.items), 0)
 
         await self.groups.delete_group(group_id=group.id)
+
+    async def test_sync_group_members(self):
+
+        new_group = self.groups.make_group(name='GROUP MEMBERS SYNC TEST')
+        group = await self.groups.create_group(new_group)
+
+        user_info = await self.user.get_account_information()
+
+        result = await self.groups.sync_group_members(group_id=group.id, desired_ids=[user_info.id])
+        self.assertIsInstance(result, GroupMembersSync)
+        self.assertEqual(result.added, [user_info.id])
+        self.assertEqual(result.removed, [])
+
+        # members match – nothing to change
+        result = await self.groups.sync_group_members(group_id=group.id, desired_ids=[user_info.id])
+        self.assertEqual((result.added, result.removed), ([], []))
+
+        result = await self.groups.sync_group_members(group_id=group.id, desired_ids=[])
+        self.assertEqual(result.removed, [user_info.id])
+
+        group_users = await self.groups.get_group_users(group_id=group.id)
+        self.assertEqual(len(group_users.items), 0)
+
+        await self.groups.delete_group(group_id=group.id)
     
     async def test_delete_group(self):
         
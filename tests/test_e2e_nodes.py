@@ -117,6 +117,52 @@ class TestAsyncDRACOONNodes(unittest.IsolatedAsyncioTestCase):
         del_node = await self.dracoon.nodes.delete_node(node_id=target_node.id)
         self.assertIsNone(del_node)
     
+    async def test_get_nodes_from_paths(self):
+        
+        room = self.dracoon.nodes.make_room(name='TEST_NODES_FROM_PATHS')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+        
+        folders = [await self.dracoon.nodes.create_folder(folder=self.dracoon.nodes.make_folder(name=f'FOLDER_{i}', parent_id=target_node.id)) 
+                   for i in range(3)]
+        paths = [f'/TEST_NODES_FROM_PATHS/FOLDER_{i}/' for i in range(3)] + ['/TEST_NODES_FROM_PATHS/MISSING/']
+        
+        nodes = await self.dracoon.nodes.get_nodes_from_paths(paths=paths)
+        
+        self.assertEqual([nodes[path].id if nodes[path] else None for path in paths], [folder.id for folder in folders] + [None])
+        
+        # cached – removed on delete
+        node_info = await self.dracoon.nodes.get_node_from_path(path=paths[0])
+        self.assertEqual(node_info.id, folders[0].id)
+        
+        await self.dracoon.nodes.delete_node(node_id=folders[0].id)
+        node_info = await self.dracoon.nodes.get_node_from_path(path=paths[0])
+        self.assertIsNone(node_info)
+        
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+
+    async def test_walk_nodes(self):
+
+        room = self.dracoon.nodes.make_room(name='TEST_WALK_NODES')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+
+        folders = [await self.dracoon.nodes.create_folder(folder=self.dracoon.nodes.make_folder(name=f'FOLDER_{i}', parent_id=target_node.id))
+                   for i in range(3)]
+        sub_folders = [await self.dracoon.nodes.create_folder(folder=self.dracoon.nodes.make_folder(name='SUB_FOLDER', parent_id=folder.id))
+                       for folder in folders]
+
+        nodes = [node async for node in self.dracoon.nodes.walk_nodes(parent_id=target_node.id)]
+        self.assertEqual(sorted(node.id for node in nodes), sorted(folder.id for folder in folders + sub_folders))
+        # breadth-first: children before grandchildren
+        self.assertEqual({node.id for node in nodes[:3]}, {folder.id for folder in folders})
+
+        nodes = [node async for node in self.dracoon.nodes.walk_nodes(parent_id=target_node.id, max_depth=1)]
+        self.assertEqual(sorted(node.id for node in nodes), sorted(folder.id for folder in folders))
+
+        nodes = [node async for node in self.dracoon.nodes.walk_nodes(parent_id=target_node.id, node_types=[NodeType.file])]
+        self.assertEqual(len(nodes), 0)
+
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+
     async def test_get_add_node_comments(self):
         
         room = self.dracoon.nodes.make_room(name='TEST_COMMENT_GET')
@@ -145,6 +145,72 @@ class TestAsyncDRACOONTransfers(unittest.IsolatedAsyncioTestCase):
         os.remove(small_file)
         os.remove(test_file)
 
+    async def test_upload_large_parallel_parts(self):
+        test_file = self.test_helper.generate_large_file()
+        
+        room = self.dracoon.nodes.make_room(name='UPLOAD_TEST_LARGE_PARALLEL')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+        
+        upload_job = TransferJob()
+        file_large = await self.dracoon.upload(target_parent_id=target_node.id, file_path=test_file, callback_fn=upload_job.update_progress, 
+                                               chunksize=chunksize, max_parallel_parts=3)
+        self.assertIsInstance(file_large, S3FileUploadStatus)
+        self.assertEqual(upload_job.progress, 1)
+        self.assertEqual(upload_job.transferred, file_large.node.size)
+        self.assertEqual(file_large.status, S3Status.done.value)
+        self.assertEqual(file_large.node.size, test_file.stat().st_size)
+        
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+        
+        os.remove(test_file)
+
+    async def test_download_large_parallel_segments(self):
+        test_file = self.test_helper.generate_large_file()
+        
+        room = self.dracoon.nodes.make_room(name='DOWNLOAD_TEST_LARGE_PARALLEL')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+        
+        file_large = await self.dracoon.upload(target_parent_id=target_node.id, file_path=test_file)
+        self.assertEqual(file_large.status, S3Status.done.value)
+        
+        download_job = TransferJob()
+        download_name = f'{file_large.node.name}_download'
+        await self.dracoon.download(target_path=self.test_helper.cwd, callback_fn=download_job.update_progress, 
+                                    source_node_id=file_large.node.id, file_name=download_name, 
+                                    chunksize=chunksize, max_parallel_segments=3)
+        
+        large_file = Path.joinpath(self.test_helper.cwd, download_name)
+        self.assertTrue(large_file.exists() and large_file.is_file())
+        self.assertEqual(large_file.read_bytes(), test_file.read_bytes())
+        self.assertEqual(download_job.transferred, file_large.node.size)
+        self.assertEqual(download_job.progress, 1)
+        
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+        
+        os.remove(large_file)
+        os.remove(test_file)
+
+    async def test_upload_large_resumable(self):
+        test_file = self.test_helper.generate_large_file()
+        journal_path = Path.joinpath(self.test_helper.cwd, f'{test_file.name}.journal')
+        
+        room = self.dracoon.nodes.make_room(name='UPLOAD_TEST_LARGE_RESUMABLE')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+        
+        upload_job = TransferJob()
+        file_large = await self.dracoon.upload(target_parent_id=target_node.id, file_path=test_file, callback_fn=upload_job.update_progress, 
+                                               chunksize=chunksize, journal_path=str(journal_path))
+        self.assertIsInstance(file_large, S3FileUploadStatus)
+        self.assertEqual(upload_job.progress, 1)
+        self.assertEqual(file_large.status, S3Status.done.value)
+        self.assertEqual(file_large.node.size, test_file.stat().st_size)
+        # journal is removed after completion
+        self.assertFalse(journal_path.exists())
+        
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+        
+        os.remove(test_file)
+
     async def test_upload_download_small_encrypted(self):
         test_file = self.test_helper.generate_small_file()
         
@@ -208,6 +274,35 @@ class TestAsyncDRACOONTransfers(unittest.IsolatedAsyncioTestCase):
         os.remove(small_file)
         os.remove(test_file)
 
+    async def test_upload_download_large_encrypted_pipelined(self):
+        test_file = self.test_helper.generate_large_file()
+        
+        room = self.dracoon.nodes.make_room(name='UPLOAD_TEST_LARGE_ENCRYPTED_PIPELINED')
+        target_node = await self.dracoon.nodes.create_room(room=room)
+        
+        encrypt_room = self.dracoon.nodes.make_encrypt_room(is_encrypted=True)
+        await self.dracoon.nodes.encrypt_room(room_id=target_node.id, encrypt_room=encrypt_room)
+        
+        upload_job = TransferJob()
+        file_large = await self.dracoon.upload(target_parent_id=target_node.id, file_path=test_file, callback_fn=upload_job.update_progress, 
+                                               chunksize=chunksize, pipelined=True)
+        self.assertIsInstance(file_large, S3FileUploadStatus)
+        self.assertEqual(upload_job.progress, 1)
+        self.assertEqual(upload_job.transferred, file_large.node.size)
+        self.assertEqual(file_large.status, S3Status.done.value)
+        
+        download_name = f'{file_large.node.name}_download'
+        await self.dracoon.download(target_path=self.test_helper.cwd, source_node_id=file_large.node.id, file_name=download_name)
+        
+        large_file = Path.joinpath(self.test_helper.cwd, download_name)
+        self.assertTrue(large_file.exists() and large_file.is_file())
+        self.assertEqual(large_file.read_bytes(), test_file.read_bytes())
+        
+        await self.dracoon.nodes.delete_node(node_id=target_node.id)
+        
+        os.remove(large_file)
+        os.remove(test_file)
+
     async def test_upload_custom_filename(self):
         test_file = self.test_helper.generate_small_file()
         
@@ -9,7 +9,8 @@ from dracoon.public import DRACOONPublic
 from dracoon.user import DRACOONUser
 from dracoon.users import DRACOONUsers
 from dracoon.user.responses import AttributesResponse, LastAdminUserRoomList, UserData, UserGroupList, UserList, RoleList
-from dracoon.users.models import AttributeEntry, CreateUser, UpdateUser, UpdateUserAttributes, UserAuthData
+from dracoon.users.models import (AttributeEntry, CreateUser, ProvisioningAction, ProvisioningKey, ProvisionUser, UpdateUser, 
+                                  UpdateUserAttributes, UserAuthData)
 
 
 dotenv.load_dotenv()
@@ -44,6 +45,12 @@ class TestAsyncDRACOONUsers(unittest.IsolatedAsyncioTestCase):
         user_list = await self.users.get_users()
         self.assertIsInstance(user_list, UserList)
         
+    async def test_iter_users(self):
+        user_list = await self.users.get_users()
+        users = [user async for user in self.users.iter_users(limit=1)]
+        self.assertEqual(len(users), user_list.range.total)
+        self.assertEqual(len({user.id for user in users}), user_list.range.total)
+        
     async def test_get_user(self):
         local_user = self.users.make_local_user(first_name='test', last_name='test', email='test@unbekanntespferd.com', login='local.user') 
         user = await self.users.create_user(local_user)
@@ -162,6 +169,31 @@ class TestAsyncDRACOONUsers(unittest.IsolatedAsyncioTestCase):
         await self.users.delete_user(user_id=user.id)
         await self.groups.delete_group(group_id=group.id)
     
+    async def test_provision_users(self):
+        new_group = self.groups.make_group(name='USER PROVISIONING TEST')
+        group = await self.groups.create_group(group=new_group)
+
+        desired = [ProvisionUser(user=self.users.make_local_user(first_name='test', last_name='test', email='test@unbekanntespferd.com', 
+                                                                 login=f'local.provisioning.user{i}'), groupIds=[group.id]) for i in range(3)]
+        results = await self.users.provision_users(users=desired, key=ProvisioningKey.login)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([result.action for result in results], [ProvisioningAction.create] * 3)
+
+        group_users = await self.groups.get_group_users(group_id=group.id)
+        self.assertEqual(sorted(user.userInfo.id for user in group_users.items), sorted(result.user_id for result in results))
+
+        # only changed users are updated
+        desired[0].user.lastName = 'updated'
+        results = await self.users.provision_users(users=desired, key=ProvisioningKey.login, filter='userName:cn:local.provisioning.user')
+        self.assertEqual([result.action for result in results], [ProvisioningAction.update] + [ProvisioningAction.unchanged] * 2)
+
+        results = await self.users.provision_users(users=desired[:1], key=ProvisioningKey.login, filter='userName:cn:local.provisioning.user', 
+                                                   delete_missing=True)
+        self.assertEqual(sorted(result.action.value for result in results), ['delete', 'delete', 'unchanged'])
+
+        await self.users.delete_user(user_id=results[0].user_id)
+        await self.groups.delete_group(group_id=group.id)
+
     async def test_get_user_roles(self):
         user_info = await self.user.get_account_information()
         user_roles = await self.users.get_user_roles(user_id=user_info.id)
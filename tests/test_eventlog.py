@@ -0,0 +1,160 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from dracoon.client import DRACOONClient, DRACOONConnection
+from dracoon.client.models import ResponseMode
+from dracoon.eventlog import DRACOONEvents
+from dracoon.eventlog.responses import LogEvent
+from dracoon.eventlog.store import EventStore, format_time, parse_time
+
+EVENT_START = datetime(2023, 10, 1, 12, tzinfo=timezone.utc)
+
+
+def make_event(event_id: int, time: datetime) -> dict:
+    return { "id": event_id, "time": time.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z', "userId": 1, "message": "test", "operationId": 6 }
+
+def parse_date(date: str) -> datetime:
+    return datetime.fromisoformat(date.replace('Z', '+00:00'))
+
+
+class EventHandler:
+    """ mock eventlog API (events filtered by date_start / date_end, paged by offset / limit) """
+
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.params)
+        events = sorted(self.events, key=lambda event: event['time'])
+        date_start, date_end = request.url.params.get('date_start'), request.url.params.get('date_end')
+        if date_start:
+            events = [event for event in events if parse_date(event['time']) >= parse_date(date_start)]
+        if date_end:
+            events = [event for event in events if parse_date(event['time']) < parse_date(date_end)]
+        offset, limit = int(request.url.params.get('offset', 0)), int(request.url.params.get('limit', 500))
+        return httpx.Response(200, json={ "range": { "offset": offset, "limit": limit, "total": len(events) }, 
+                                          "items": events[offset:offset + limit] })
+
+
+class TestSyncEvents(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.events = [make_event(event_id=i, time=EVENT_START + timedelta(hours=6 * i)) for i in range(1, 9)]
+        self.handler = EventHandler(self.events)
+
+    def make_eventlog(self, response_mode: ResponseMode = ResponseMode.validate) -> DRACOONEvents:
+        client = DRACOONClient(base_url='https://dracoon.team', response_mode=response_mode)
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        client.http._transport = httpx.MockTransport(self.handler)
+        return DRACOONEvents(dracoon_client=client)
+
+    async def test_sync_events_response_mode(self):
+        """ internal requests do not depend on the client response mode """
+        for response_mode in ResponseMode:
+            with self.subTest(response_mode=response_mode), EventStore() as store:
+                eventlog = self.make_eventlog(response_mode=response_mode)
+
+                added = await eventlog.sync_events(store=store, date_end=EVENT_START + timedelta(days=3))
+
+                self.assertEqual(added, 8)
+                self.assertEqual([event.id for event in store.get_events()], list(range(1, 9)))
+
+    async def test_sync_events_resume(self):
+        """ a resumed sync starts at the checkpoint – synced events are not stored again """
+        eventlog = self.make_eventlog()
+        stored = []
+
+        with EventStore() as store:
+            add_events = store.add_events
+            def record_events(events, checkpoint=None):
+                stored.extend(event['id'] for event in events)
+                return add_events(events, checkpoint=checkpoint)
+            store.add_events = record_events
+
+            self.assertEqual(await eventlog.sync_events(store=store, date_end=EVENT_START + timedelta(days=1)), 3)
+            self.assertEqual(store.get_checkpoint(), (3, EVENT_START + timedelta(hours=18)))
+
+            self.events.append(make_event(event_id=9, time=EVENT_START + timedelta(hours=18, milliseconds=500)))
+            stored.clear()
+
+            self.assertEqual(await eventlog.sync_events(store=store, date_end=EVENT_START + timedelta(days=3)), 6)
+            self.assertEqual(stored, [9, 4, 5, 6, 7, 8])
+            self.assertEqual(store.count_events(), 9)
+            self.assertEqual(store.get_checkpoint(), (8, EVENT_START + timedelta(hours=48)))
+
+
+class TestPermissions(unittest.IsolatedAsyncioTestCase):
+
+    def make_eventlog(self, content: bytes) -> DRACOONEvents:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        client.http._transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+        return DRACOONEvents(dracoon_client=client)
+
+    def make_content(self, count: int) -> bytes:
+        nodes = [{ "nodeId": i, "nodeName": f'room {i}', "nodeParentPath": '/', "nodeCntChildren": 0, "auditUserPermissionList": [] } 
+                 for i in range(count)]
+        return json.dumps(nodes).encode('utf-8')
+
+    async def test_iter_permissions(self):
+        eventlog = self.make_eventlog(self.make_content(3))
+
+        self.assertEqual([node.nodeId async for node in eventlog.iter_permissions()], [0, 1, 2])
+
+    async def test_iter_permissions_truncated(self):
+        """ truncated responses stop the iteration – raised with raise_on_err """
+        eventlog = self.make_eventlog(self.make_content(3)[:-20])
+
+        self.assertEqual([node.nodeId async for node in eventlog.iter_permissions()], [0, 1])
+
+        with self.assertRaises(ValueError):
+            [node async for node in eventlog.iter_permissions(raise_on_err=True)]
+
+
+class TestEventStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = EventStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_format_time(self):
+        time = datetime(2023, 10, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+        self.assertEqual(format_time(time), '2023-10-01T12:30:15.250000Z')
+        self.assertEqual(format_time('2023-10-01T14:30:15.250+02:00'), '2023-10-01T12:30:15.250000Z')
+        self.assertEqual(format_time('2023-10-01T12:30:15.25Z'), '2023-10-01T12:30:15.250000Z')
+        # naive datetimes are UTC
+        self.assertEqual(format_time(time.replace(tzinfo=None)), '2023-10-01T12:30:15.250000Z')
+        self.assertEqual(parse_time(format_time(time)), time)
+
+    def test_add_events(self):
+        """ events are stored once per id (models or raw dicts) """
+        events = [make_event(event_id=i, time=EVENT_START + timedelta(hours=i)) for i in range(1, 4)]
+
+        self.assertEqual(self.store.add_events(events), 3)
+        self.assertEqual(self.store.add_events([LogEvent(**events[0]), make_event(event_id=4, time=EVENT_START)]), 1)
+        self.assertEqual(self.store.count_events(), 4)
+        self.assertEqual([event.id for event in self.store.get_events()], [4, 1, 2, 3])
+        self.assertEqual([event.id for event in self.store.get_events(date_start=EVENT_START + timedelta(hours=1), 
+                                                                       date_end=EVENT_START + timedelta(hours=3))], [1, 2])
+
+    def test_checkpoint(self):
+        self.assertIsNone(self.store.get_checkpoint())
+
+        self.store.add_events([], checkpoint=(1, '2023-10-01T12:00:00.123Z'))
+        self.assertEqual(self.store.get_checkpoint(), (1, datetime(2023, 10, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)))
+
+        self.store.add_events([], checkpoint=(2, datetime(2023, 10, 2, 12)))
+        self.assertEqual(self.store.get_checkpoint(), (2, datetime(2023, 10, 2, 12, tzinfo=timezone.utc)))
+
+
+if __name__ == '__main__':
+    unittest.main()
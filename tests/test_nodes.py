@@ -0,0 +1,398 @@
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+from unittest.mock import patch
+
+import httpx
+
+from dracoon import crypto
+from dracoon.client import DRACOONClient, DRACOONConnection
+from dracoon.client.models import Range
+from dracoon.crypto.models import PlainFileKeyVersion, UserKeyPairVersion
+from dracoon.errors import DRACOONHttpError
+from dracoon.nodes import DRACOONNodes
+from dracoon.nodes.models import MissingKeysResponse, Node, NodeCache, NodeType, S3Part
+from dracoon.nodes.responses import CreateFileUploadResponse, NodeList, PresignedUrl
+
+
+def make_missing_keys(items, files, users, total: int = None, offset: int = 0) -> MissingKeysResponse:
+    """ missing keys response for (file id, user id) items, file keys and user public keys """
+    return MissingKeysResponse(**{
+        'range': {'offset': offset, 'limit': len(items), 'total': len(items) if total is None else total},
+        'items': [{'fileId': file_id, 'userId': user_id} for file_id, user_id in items],
+        'files': [{'id': file_id, 'fileKeyContainer': file_key} for file_id, file_key in files.items()],
+        'users': [{'id': user_id, 'publicKeyContainer': keypair.publicKeyContainer} for user_id, keypair in users.items()]
+    })
+
+
+class TestMissingFileKeys(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        cls.users = { user_id: crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048) for user_id in (10, 11) }
+        cls.plain_file_keys = { file_id: crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM) for file_id in (1, 2) }
+        cls.file_keys = { file_id: crypto.encrypt_file_key(plain_file_key=plain_file_key, keypair=cls.keypair)
+                         for file_id, plain_file_key in cls.plain_file_keys.items() }
+
+    def setUp(self) -> None:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.nodes = DRACOONNodes(dracoon_client=client)
+
+    def test_make_missing_file_keys(self):
+        missing_keys = make_missing_keys(items=[(1, 10), (1, 11), (2, 10)], files=self.file_keys, users=self.users)
+        plain_file_keys = {}
+
+        keys = self.nodes.make_missing_file_keys(missing_keys=missing_keys, plain_keypair=self.keypair, plain_file_keys=plain_file_keys)
+
+        self.assertEqual([(item.fileId, item.userId) for item in keys.items], [(1, 10), (1, 11), (2, 10)])
+        self.assertEqual(set(plain_file_keys), {1, 2})
+        for item in keys.items:
+            plain_file_key = crypto.decrypt_file_key(file_key=item.fileKey, keypair=self.users[item.userId])
+            self.assertEqual(plain_file_key.key, self.plain_file_keys[item.fileId].key)
+
+    def test_make_missing_file_keys_skipped(self):
+        """ items without file key or public key are skipped """
+        missing_keys = make_missing_keys(items=[(1, 10), (2, 10), (1, 12)], files={ 1: self.file_keys[1] }, users=self.users)
+
+        keys = self.nodes.make_missing_file_keys(missing_keys=missing_keys, plain_keypair=self.keypair)
+
+        self.assertEqual([(item.fileId, item.userId) for item in keys.items], [(1, 10)])
+
+    def test_make_missing_file_keys_all_skipped(self):
+        missing_keys = make_missing_keys(items=[(2, 10), (1, 12)], files={ 1: self.file_keys[1] }, users=self.users)
+
+        keys = self.nodes.make_missing_file_keys(missing_keys=missing_keys, plain_keypair=self.keypair)
+
+        self.assertEqual(keys.items, [])
+
+
+class TestDistributeMissingFileKeys(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        other_keypair = crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048)
+        cls.users = { user_id: crypto.create_plain_userkeypair(version=UserKeyPairVersion.RSA2048) for user_id in (10, 11) }
+        cls.file_keys = { file_id: crypto.encrypt_file_key(plain_file_key=crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM),
+                                                           keypair=cls.keypair) for file_id in range(1, 6) }
+        # file key not decryptable with keypair
+        cls.file_keys[6] = crypto.encrypt_file_key(plain_file_key=crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM), keypair=other_keypair)
+
+    def setUp(self) -> None:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.nodes = DRACOONNodes(dracoon_client=client)
+        self.nodes.get_missing_file_keys = self.get_missing_file_keys
+        self.nodes.set_file_keys = self.set_file_keys
+        self.executor = ThreadPoolExecutor(max_workers=8)
+
+        self.items = [(file_id, user_id) for file_id in range(1, 6) for user_id in self.users]
+        self.failing_files = set()
+        self.pages = []
+        self.set_keys = []
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    async def get_missing_file_keys(self, offset: int = 0, limit: int = None, **kwargs) -> MissingKeysResponse:
+        self.pages.append(offset)
+        items = self.items[offset:offset + limit]
+        files = { file_id: self.file_keys[file_id] for file_id, _ in items if file_id in self.file_keys }
+        users = { user_id: self.users[user_id] for _, user_id in items if user_id in self.users }
+        return make_missing_keys(items=items, files=files, users=users, total=len(self.items), offset=offset)
+
+    async def set_file_keys(self, file_keys, raise_on_err: bool = False) -> None:
+        items = [(item.fileId, item.userId) for item in file_keys.items]
+        if self.failing_files.intersection(file_id for file_id, _ in items):
+            request = httpx.Request('POST', 'https://dracoon.team/api/v4/nodes/files/keys')
+            raise DRACOONHttpError(error=httpx.HTTPStatusError('Bad request', request=request, response=httpx.Response(400, request=request)))
+        self.set_keys.extend(items)
+
+    async def distribute(self, **kwargs):
+        return await self.nodes.distribute_missing_file_keys(plain_keypair=self.keypair, room_id=1, executor=self.executor, **kwargs)
+
+    async def test_distribute_missing_file_keys(self):
+        """ all pages are fetched first, keys without public key are skipped """
+        self.items.append((1, 12))
+
+        job = await self.distribute(batch_size=3)
+
+        self.assertEqual(self.pages, [0, 3, 6, 9])
+        self.assertEqual((job.total, job.distributed, job.failed, job.skipped), (11, 10, 0, 1))
+        self.assertEqual(sorted(self.set_keys), sorted(self.items[:-1]))
+
+    async def test_distribute_missing_file_keys_failed_decryption(self):
+        """ keys of a file key batch failing decryption are counted as failed (files 5 and 6 share a batch) """
+        self.items.extend([(6, 10), (6, 11)])
+
+        job = await self.distribute(batch_size=2)
+
+        self.assertEqual((job.total, job.distributed, job.failed, job.skipped), (12, 8, 4, 0))
+        self.assertEqual(sorted(self.set_keys), sorted(self.items[:-4]))
+
+        with self.assertRaises(Exception):
+            await self.distribute(batch_size=2, raise_on_err=True)
+
+    async def test_distribute_missing_file_keys_failed_batch(self):
+        self.failing_files.add(3)
+
+        job = await self.distribute(batch_size=2)
+
+        self.assertEqual((job.total, job.distributed, job.failed, job.skipped), (10, 8, 2, 0))
+        self.assertNotIn((3, 10), self.set_keys)
+
+        with self.assertRaises(DRACOONHttpError):
+            await self.distribute(batch_size=2, raise_on_err=True)
+
+    async def test_distribute_missing_file_keys_failed_encryption(self):
+        """ errors in the executor (e.g. invalid public key) fail the batch only """
+        def encrypt_file_keys_public(items):
+            if any(public_key.publicKey == 'invalid' for _, public_key in items):
+                raise ValueError('Invalid public key')
+            return crypto.encrypt_file_keys_public(items)
+
+        self.users = { **self.users, 12: self.users[10].model_copy(deep=True) }
+        self.users[12].publicKeyContainer.publicKey = 'invalid'
+        self.items.append((1, 12))
+
+        with patch('dracoon.nodes.encrypt_file_keys_public', encrypt_file_keys_public):
+            job = await self.distribute(batch_size=1)
+
+            self.assertEqual((job.total, job.distributed, job.failed, job.skipped), (11, 10, 1, 0))
+            self.assertEqual(sorted(self.set_keys), sorted(self.items[:-1]))
+
+            with self.assertRaises(ValueError):
+                await self.distribute(batch_size=1, raise_on_err=True)
+
+    async def test_distribute_missing_file_keys_bounded(self):
+        """ encryption of batches is bound by max_parallel_batches """
+        encrypting, max_encrypting = 0, 0
+        lock = threading.Lock()
+
+        def encrypt_file_keys_public(items):
+            nonlocal encrypting, max_encrypting
+            with lock:
+                encrypting += 1
+                max_encrypting = max(max_encrypting, encrypting)
+            time.sleep(0.01)
+            with lock:
+                encrypting -= 1
+            return crypto.encrypt_file_keys_public(items)
+
+        with patch('dracoon.nodes.encrypt_file_keys_public', encrypt_file_keys_public):
+            job = await self.distribute(batch_size=1, max_parallel_batches=2)
+
+        self.assertEqual(job.distributed, 10)
+        self.assertLessEqual(max_encrypting, 2)
+
+
+class TestEncryptInChunks(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.nodes = DRACOONNodes(dracoon_client=client)
+        self.data = os.urandom(1024 * 10 + 512)
+        self.plain_file_key = crypto.create_file_key(version=PlainFileKeyVersion.AES256GCM)
+
+    def decrypt(self, enc_data: bytes) -> bytes:
+        decryptor = crypto.FileDecryptionCipher(plain_file_key=self.plain_file_key)
+        return decryptor.decode_bytes(enc_data) + decryptor.finalize()
+
+    async def test_encrypt_in_chunks(self):
+        """ chunks are yielded in order, the last chunk sets the tag on the file key """
+        sizes = []
+
+        enc_chunks = [chunk async for chunk in self.nodes.encrypt_in_chunks(file_obj=io.BytesIO(self.data), plain_file_key=self.plain_file_key,
+                                                                            filesize=len(self.data), chunksize=1024, callback_fn=sizes.append)]
+
+        self.assertEqual(len(enc_chunks), 11)
+        self.assertEqual(sum(sizes), len(self.data))
+        self.assertIsNotNone(self.plain_file_key.tag)
+        self.assertEqual(self.decrypt(b''.join(enc_chunks)), self.data)
+
+    async def test_encrypt_in_chunks_parallel_parts(self):
+        """ encrypted chunks are uploaded concurrently and returned ordered by part number """
+        uploaded = {}
+        uploading, max_uploading = 0, 0
+
+        async def upload_s3_part(s3_url: PresignedUrl, chunk: bytes):
+            nonlocal uploading, max_uploading
+            uploading += 1
+            max_uploading = max(max_uploading, uploading)
+            # later parts finish first
+            await asyncio.sleep(0.01 / s3_url.partNumber)
+            uploading -= 1
+            uploaded[s3_url.partNumber] = chunk
+            return S3Part(partNumber=s3_url.partNumber, partEtag=str(s3_url.partNumber))
+
+        self.nodes.upload_s3_part = upload_s3_part
+        s3_urls = [PresignedUrl(url=f'https://s3.dracoon.team/{part_number}', partNumber=part_number) for part_number in range(1, 12)]
+        enc_chunks = self.nodes.encrypt_in_chunks(file_obj=io.BytesIO(self.data), plain_file_key=self.plain_file_key,
+                                                  filesize=len(self.data), chunksize=1024)
+
+        parts = await self.nodes.upload_s3_parts(file_obj=None, s3_urls=s3_urls, chunksize=1024, max_parallel_parts=3, chunks=enc_chunks)
+
+        self.assertEqual([part.partNumber for part in parts], list(range(1, 12)))
+        self.assertEqual(max_uploading, 3)
+        self.assertEqual(self.decrypt(b''.join(uploaded[part_number] for part_number in sorted(uploaded))), self.data)
+
+
+class TestUploadJournal(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.nodes = DRACOONNodes(dracoon_client=client)
+        self.target = tempfile.TemporaryDirectory()
+        self.addCleanup(self.target.cleanup)
+        self.file_path = os.path.join(self.target.name, 'test.bin')
+        with open(self.file_path, 'wb') as file:
+            file.write(os.urandom(1024))
+
+    def test_is_journal_valid_target(self):
+        """ journals of another target (parent or file name) are rejected """
+        upload_channel = CreateFileUploadResponse(uploadUrl='https://dracoon.team/upload', uploadId='upload', token='token')
+        journal = self.nodes.make_upload_journal(upload_channel=upload_channel, file_path=self.file_path, parent_id=1, file_name='test.bin')
+
+        self.assertTrue(self.nodes.is_journal_valid(journal=journal, file_path=self.file_path, parent_id=1, file_name='test.bin'))
+        self.assertFalse(self.nodes.is_journal_valid(journal=journal, file_path=self.file_path, parent_id=2, file_name='test.bin'))
+        self.assertFalse(self.nodes.is_journal_valid(journal=journal, file_path=self.file_path, parent_id=1, file_name='other.bin'))
+
+    async def test_upload_s3_parts_failed_part(self):
+        """ parts uploaded along with a failed part are recorded before the error is raised """
+        recorded = []
+
+        async def upload_s3_part(s3_url: PresignedUrl, chunk: bytes):
+            if s3_url.partNumber == 2:
+                raise httpx.ConnectError('Connection failed')
+            return S3Part(partNumber=s3_url.partNumber, partEtag=str(s3_url.partNumber))
+
+        self.nodes.upload_s3_part = upload_s3_part
+        s3_urls = [PresignedUrl(url=f'https://s3.dracoon.team/{part_number}', partNumber=part_number) for part_number in range(1, 4)]
+
+        with self.assertRaises(httpx.ConnectError):
+            await self.nodes.upload_s3_parts(file_obj=None, s3_urls=s3_urls, max_parallel_parts=3, chunks=[b'1', b'2', b'3'],
+                                             part_callback=recorded.append)
+
+        self.assertEqual(sorted(part.partNumber for part in recorded), [1, 3])
+
+    async def test_upload_s3_parts_cancelled(self):
+        """ pending parts are cancelled and awaited on failure """
+        cancelled = []
+
+        async def upload_s3_part(s3_url: PresignedUrl, chunk: bytes):
+            if s3_url.partNumber == 1:
+                raise httpx.ConnectError('Connection failed')
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(s3_url.partNumber)
+                raise
+
+        self.nodes.upload_s3_part = upload_s3_part
+        s3_urls = [PresignedUrl(url=f'https://s3.dracoon.team/{part_number}', partNumber=part_number) for part_number in range(1, 4)]
+
+        with self.assertRaises(httpx.ConnectError):
+            await self.nodes.upload_s3_parts(file_obj=None, s3_urls=s3_urls, max_parallel_parts=3, chunks=[b'1', b'2', b'3'])
+
+        self.assertEqual(sorted(cancelled), [2, 3])
+
+
+class TestNodeCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache = NodeCache(max_size=5, ttl=60)
+        for node_id, path in enumerate(['/room', '/room/folder', '/room/folder/file', '/room/folder2', '/room2'], start=1):
+            self.cache.set(path, Node(id=node_id, type=NodeType.folder, name=path.split('/')[-1]))
+
+    def test_invalidate_nodes(self):
+        """ a node and all paths below are removed (other paths with the same prefix are kept) """
+        self.cache.invalidate_nodes([2])
+
+        self.assertEqual(sorted(self.cache.entries), ['/room', '/room/folder2', '/room2'])
+        self.assertEqual(self.cache.sorted_paths, ['/room', '/room/folder2', '/room2'])
+        self.assertNotIn(3, self.cache.paths)
+
+        self.cache.invalidate_nodes([1])
+        self.assertEqual(list(self.cache.entries), ['/room2'])
+
+    def test_invalidate_nodes_unknown(self):
+        self.cache.invalidate_nodes([42])
+
+        self.assertEqual((len(self.cache.entries), self.cache.paths, self.cache.sorted_paths), (0, {}, []))
+
+    def test_max_size(self):
+        """ least recently used entries are removed from all indexes """
+        self.cache.get('/room')
+        self.cache.set('/room3', Node(id=6, type=NodeType.room, name='room3'))
+
+        self.assertIsNone(self.cache.get('/room/folder'))
+        self.assertNotIn(2, self.cache.paths)
+        self.assertNotIn('/room/folder', self.cache.sorted_paths)
+        self.assertEqual(self.cache.get('/room').id, 1)
+
+
+class TestWalkNodes(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.nodes = DRACOONNodes(dracoon_client=client)
+        self.nodes.get_nodes = self.get_nodes
+        # parent id: children (room 1 / folder 3 / folder 6 / file 7, room 1 / file 4, file 2)
+        self.tree = {
+            0: [Node(id=1, type=NodeType.room, name='room'), Node(id=2, type=NodeType.file, name='file')],
+            1: [Node(id=3, type=NodeType.folder, name='folder'), Node(id=4, type=NodeType.file, name='file')],
+            3: [Node(id=6, type=NodeType.folder, name='folder')],
+            6: [Node(id=7, type=NodeType.file, name='file')]
+        }
+        self.filters = []
+
+    async def get_nodes(self, parent_id: int = 0, offset: int = 0, filter: str = None, **kwargs) -> NodeList:
+        self.filters.append(filter)
+        items = [node for node in self.tree.get(parent_id, []) if filter is None or node.type != NodeType.file]
+        # one node per page
+        return NodeList(range=Range(offset=offset, limit=1, total=len(items)), items=items[offset:offset + 1])
+
+    async def walk(self, **kwargs) -> List[int]:
+        return sorted([node.id async for node in self.nodes.walk_nodes(**kwargs)])
+
+    async def test_walk_nodes(self):
+        self.assertEqual(await self.walk(), [1, 2, 3, 4, 6, 7])
+        self.assertEqual(set(self.filters), {None})
+
+    async def test_walk_nodes_max_depth(self):
+        self.assertEqual(await self.walk(max_depth=0), [])
+        self.assertEqual(self.filters, [])
+        self.assertEqual(await self.walk(max_depth=1), [1, 2])
+        self.assertEqual(await self.walk(max_depth=2), [1, 2, 3, 4])
+        self.assertEqual(await self.walk(parent_id=1, max_depth=2), [3, 4, 6])
+
+    async def test_walk_nodes_node_types(self):
+        """ files are not requested if not included, folders are still walked """
+        self.assertEqual(await self.walk(node_types=[NodeType.room]), [1])
+        self.assertEqual(set(self.filters), {'type:eq:room:folder'})
+
+        self.filters.clear()
+        self.assertEqual(await self.walk(node_types=[NodeType.folder]), [3, 6])
+        self.assertEqual(await self.walk(node_types=[NodeType.file], max_depth=2), [2, 4])
+        self.assertEqual(self.filters[-1], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from dracoon.client import DRACOONClient, DRACOONConnection
+from dracoon.errors import InvalidArgumentError
+from dracoon.groups import DRACOONGroups
+from dracoon.user import DRACOONUser
+from dracoon.user.models import UserAccount
+from dracoon.user.responses import UserData
+from dracoon.users import DRACOONUsers
+from dracoon.users.models import ProvisioningAction, ProvisioningKey, ProvisionUser
+
+CURRENT_USER_ID = 1
+
+
+def make_user(user_id: int, login: str, email: str = None, last_name: str = 'test') -> dict:
+    return { "id": user_id, "userName": login, "email": email or f'{login}@dracoon.team', "firstName": 'test', "lastName": last_name,
+             "isLocked": False, "avatarUuid": 'uuid', "authData": { "method": 'basic' } }
+
+
+class TestProvisionUsers(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        client = DRACOONClient(base_url='https://dracoon.team')
+        client.connection = DRACOONConnection(datetime.now(), 'access', 28800, 'refresh')
+        client.connected = True
+        self.users = DRACOONUsers(dracoon_client=client)
+        self.users.iter_users = self.iter_users
+        self.users.create_user = self.create_user
+        self.users.update_user = self.update_user
+        self.users.delete_user = self.delete_user
+
+        self.current_users = [make_user(CURRENT_USER_ID, 'admin'), make_user(2, 'user2'), make_user(3, 'user3'), make_user(4, 'user4')]
+        self.group_members = { 10: [2], 11: [] }
+        self.requests = []
+
+        patches = [patch.object(DRACOONGroups, 'iter_group_users', self.iter_group_users),
+                   patch.object(DRACOONGroups, 'add_group_users', self.add_group_users),
+                   patch.object(DRACOONUser, 'get_account_information', self.get_account_information)]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def iter_users(self, filter: str = None, **kwargs):
+        for user in self.current_users:
+            yield user
+
+    async def create_user(self, user, raise_on_err: bool = False) -> UserData:
+        self.requests.append(('create', user.userName))
+        return UserData(**make_user(100 + len(self.requests), user.userName))
+
+    async def update_user(self, user_id: int, user_update, raise_on_err: bool = False) -> None:
+        self.requests.append(('update', user_id))
+
+    async def delete_user(self, user_id: int, raise_on_err: bool = False) -> None:
+        self.requests.append(('delete', user_id))
+
+    async def iter_group_users(self, group_id: int, **kwargs):
+        self.requests.append(('members', group_id))
+        for user_id in self.group_members[group_id]:
+            yield { "userInfo": { "id": user_id } }
+
+    async def add_group_users(self, group_id: int, user_list, raise_on_err: bool = False) -> None:
+        self.requests.append(('add', group_id, sorted(user_list)))
+
+    async def get_account_information(self, **kwargs) -> UserAccount:
+        return UserAccount.model_construct(id=CURRENT_USER_ID)
+
+    def make_user(self, login: str, last_name: str = 'test', group_ids=None) -> ProvisionUser:
+        user = self.users.make_local_user(first_name='test', last_name=last_name, email=f'{login}@dracoon.team', login=login)
+        return ProvisionUser(user=user, groupIds=group_ids)
+
+    async def test_provision_users(self):
+        desired = [self.make_user('user2', group_ids=[10, 11]), self.make_user('user3', last_name='updated'), self.make_user('user5', group_ids=[10])]
+
+        results = await self.users.provision_users(users=desired, key=ProvisioningKey.login)
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([result.action for result in results], [ProvisioningAction.unchanged, ProvisioningAction.update, ProvisioningAction.create])
+        self.assertIn(('update', 3), self.requests)
+        self.assertIn(('create', 'user5'), self.requests)
+        # existing members are not added again
+        self.assertIn(('add', 10, [results[2].user_id]), self.requests)
+        self.assertIn(('add', 11, [2]), self.requests)
+
+    async def test_provision_users_unchanged(self):
+        """ no requests for unchanged users and memberships (besides listing group members) """
+        results = await self.users.provision_users(users=[self.make_user('user2', group_ids=[10])], key=ProvisioningKey.login)
+
+        self.assertEqual(results[0].action, ProvisioningAction.unchanged)
+        self.assertEqual(self.requests, [('members', 10)])
+
+    async def test_provision_users_key_case(self):
+        """ keys only differing in case are not updated """
+        self.current_users.append(make_user(5, 'user5', email='User5@dracoon.team'))
+
+        results = await self.users.provision_users(users=[self.make_user('user5')])
+
+        self.assertEqual(results[0].action, ProvisioningAction.unchanged)
+        self.assertEqual(self.requests, [])
+
+    async def test_provision_users_ambiguous(self):
+        """ users matching several users of the snapshot are not changed """
+        self.current_users.append(make_user(5, 'user5', email='user2@dracoon.team'))
+
+        results = await self.users.provision_users(users=[self.make_user('user2', last_name='updated')])
+
+        self.assertIsInstance(results[0].error, InvalidArgumentError)
+        self.assertEqual(self.requests, [])
+
+    async def test_provision_users_delete_missing(self):
+        """ missing users are deleted – except the current user """
+        with self.assertRaises(InvalidArgumentError):
+            await self.users.provision_users(users=[], delete_missing=True)
+
+        results = await self.users.provision_users(users=[self.make_user('user2')], key=ProvisioningKey.login, filter='userName:cn:user',
+                                                   delete_missing=True)
+
+        self.assertEqual(sorted((result.action.value, result.user_id) for result in results), [('delete', 3), ('delete', 4), ('unchanged', 2)])
+        self.assertNotIn(('delete', CURRENT_USER_ID), self.requests)
+
+    async def test_provision_users_dry_run(self):
+        results = await self.users.provision_users(users=[self.make_user('user6')], filter='userName:cn:user', delete_missing=True, dry_run=True)
+
+        self.assertEqual([result.action for result in results], [ProvisioningAction.create] + [ProvisioningAction.delete] * 3)
+        self.assertEqual(self.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()